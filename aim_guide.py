@@ -0,0 +1,101 @@
+import math
+from engine import BUBBLESIZE, ANGLE_STEP, bubble_position
+
+class AimGuide:
+  """
+  Linia punctata de ochire, cu ricoseurile si celula in care s-ar aseza bula.
+  Traiectoriile sunt pastrate pe unghiuri cuantizate si refolosite pana cand tabla se schimba.
+  Cat timp o bula e in zbor, starea motorului e deja cea de dupa lovitura, deci ghidul e oprit pana la aterizare.
+  """
+  def __init__(self, engine, renderer, step=ANGLE_STEP):
+    """
+    Initializarea unui obiect de tip AimGuide.
+    :param engine: Motorul de joc folosit pentru calculul traiectoriilor.
+    :param renderer: Renderer-ul prin care se deseneaza linia.
+    :param step: Pasul de cuantizare al unghiului, in radiani.
+    """
+    self.engine = engine
+    self.renderer = renderer
+    self.step = step
+    self.cache = dict()
+    self.state = None
+    self.version = None
+    self.last_point = None
+    self.visible = False
+    self.paused = False
+    canvas = renderer.game_canvas
+    self.line_id = canvas.create_line(0, 0, 0, 0, fill='#defe47', width=2, dash=(2, 6), state='hidden', tags=("aim",))
+    bubble_radius = BUBBLESIZE // 2
+    self.marker_id = canvas.create_oval(0, 0, 2 * bubble_radius, 2 * bubble_radius, outline='#defe47', width=2, state='hidden', tags=("aim",))
+
+  def quantize(self, angle):
+    """
+    Rotunjirea unghiului la pasul ghidului, pentru ca lovitura sa fie exact cea previzualizata.
+    :param angle: Unghiul de tragere, in radiani.
+    """
+    return round(angle / self.step) * self.step
+
+  def trajectory(self, angle):
+    """
+    Returneaza traiectoria si celula de asezare pentru un unghi, din cache daca tabla nu s-a schimbat.
+    :param angle: Unghiul de tragere, deja cuantizat.
+    """
+    state = self.engine.state
+    if state is not self.state or state.version != self.version:
+      self.cache.clear()
+      self.state = state
+      self.version = state.version
+    key = round(angle / self.step)
+    if key not in self.cache:
+      self.cache[key] = self.engine.trace_shot(angle)
+    return self.cache[key]
+
+  def update(self, x, y):
+    """
+    Actualizarea ghidului pentru pozitia mouse-ului.
+    :param x: Coordonata X a mouse-ului in canvas.
+    :param y: Coordonata Y a mouse-ului in canvas.
+    """
+    self.last_point = (x, y)
+    if self.paused:
+      return
+    trace = self.trajectory(self.quantize(self.engine.aim_angle(x, y)))
+    if trace is None:
+      self.hide()
+      return
+    path, row, col = trace
+    center_x, center_y = bubble_position(row, col, self.engine.state.first_row)
+    bubble_radius = BUBBLESIZE // 2
+    self.renderer.update_item(self.line_id, coords=[value for point in path for value in point], state='normal')
+    self.renderer.update_item(self.marker_id, coords=(center_x - bubble_radius, center_y - bubble_radius, center_x + bubble_radius, center_y + bubble_radius), state='normal')
+    self.visible = True
+
+  def refresh(self):
+    """
+    Recalcularea ghidului pentru ultima pozitie a mouse-ului (de exemplu, dupa ce o bula s-a asezat).
+    """
+    if self.last_point is not None:
+      self.update(*self.last_point)
+
+  def pause(self):
+    """
+    Ascunderea ghidului pana la resume; pozitia mouse-ului e pastrata in continuare.
+    """
+    self.paused = True
+    self.hide()
+
+  def resume(self):
+    """
+    Reafisarea ghidului, pentru ultima pozitie a mouse-ului, pe tabla desenata acum.
+    """
+    self.paused = False
+    self.refresh()
+
+  def hide(self):
+    """
+    Ascunderea ghidului.
+    """
+    if self.visible:
+      self.renderer.update_item(self.line_id, state='hidden')
+      self.renderer.update_item(self.marker_id, state='hidden')
+      self.visible = False
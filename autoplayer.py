@@ -0,0 +1,246 @@
+import math
+import random
+import time
+from collections import OrderedDict
+from engine import *
+from bitboard import BitBoard
+
+WIN_VALUE = 10000
+DISCOUNT = 0.9
+DANGER_ROWS = 5
+
+key_random = random.Random(0xb0b)
+DROP_KEYS = [key_random.getrandbits(64) for _ in range(64)]
+COLOR_KEYS = [[key_random.getrandbits(64) for _ in range(16)] for _ in range(2)]
+
+def table_from_board(board):
+  """
+  Construirea matricii de bule dintr-o tabla de biti, pentru calculul traiectoriilor.
+  :param board: Tabla de biti.
+  """
+  game_table = initial_matrix(board.rows - 2, board.cols)
+  for color, mask in board.colors.items():
+    for row, col in board.cells(mask):
+      game_table[row][col] = Bubble(row, col, color, board.first_row)
+  return game_table
+
+def apply_shot(board, row, col, color, drop_counter, color_score, drop_shots):
+  """
+  Aplicarea regulilor jocului pe o copie a tablei de biti, pentru o bula asezata in (row, col).
+  Returneaza (tabla noua, contorul de coborare, punctele castigate, statusul jocului).
+  :param board: Tabla de biti a pozitiei curente.
+  :param row: Randul celulei.
+  :param col: Coloana celulei.
+  :param color: Culoarea bulei trase.
+  :param drop_counter: Numarul de lovituri de la ultima coborare a tablei.
+  :param color_score: Punctele fiecarei culori.
+  :param drop_shots: Numarul de lovituri dupa care tabla coboara cu un rand.
+  """
+  board = board.copy()
+  board.add(row, col, color)
+  matches = board.find_color_matches(row, col)
+  points = 0
+  if board.count(matches) >= 3:
+    targets = board.get_target_bubbles(matches)
+    floating = targets & ~matches
+    points = 15 * board.count(matches)
+    for other_color, mask in board.colors.items():
+      points += 3 * color_score.get(other_color, 0) * board.count(floating & mask)
+    board.remove(targets)
+  drop_counter += 1
+  if drop_counter == drop_shots:
+    drop_counter = 0
+    board.drop_bubbles()
+  status = None
+  if board.count() == 0:
+    status = "win"
+  elif board.row_occupied(board.rows - 2):
+    status = "lose"
+  return board, drop_counter, points, status
+
+def evaluate(board):
+  """
+  Evaluarea euristica a unei pozitii: fiecare bula ramasa costa, iar randurile apropiate de linia de jos costa mult.
+  :param board: Tabla de biti evaluata.
+  """
+  if not board.occupied:
+    return WIN_VALUE
+  lowest_row = (board.occupied.bit_length() - 1) // board.cols
+  danger = max(0, lowest_row - (board.rows - 2 - DANGER_ROWS))
+  return -2 * board.count() - 40 * danger * danger
+
+class AutoPlayer:
+  """
+  Jucator automat: cauta, pe o adancime limitata, unghiul de tragere cu cel mai bun rezultat pentru
+  bula curenta si cea urmatoare; dupa ele, culorile necunoscute sunt mediate peste culorile ramase.
+  Pozitiile deja evaluate sunt pastrate intr-un cache LRU, pe cheia Zobrist a tablei.
+  Cautarea e un generator, deci poate fi rulata in bucati scurte, intre cadrele jocului.
+  """
+  def __init__(self, engine, time_budget=0.25, max_depth=2, cache_size=50000, angles=96, step=ANGLE_STEP):
+    """
+    Initializarea unui obiect de tip AutoPlayer.
+    :param engine: Motorul de joc a carui stare se analizeaza.
+    :param time_budget: Timpul maxim de calcul pentru o mutare, in secunde (None pentru nelimitat).
+    :param max_depth: Numarul maxim de lovituri analizate inainte.
+    :param cache_size: Numarul maxim de pozitii pastrate in cache.
+    :param angles: Numarul de unghiuri candidate.
+    :param step: Pasul de cuantizare al unghiurilor, acelasi cu al ghidului de ochire.
+    """
+    self.engine = engine
+    self.time_budget = time_budget
+    self.max_depth = max_depth
+    self.cache_size = cache_size
+    self.cache = OrderedDict()
+    self.angles = sorted({round((-math.pi + 0.1 + index * (math.pi - 0.2) / (angles - 1)) / step) * step for index in range(angles)})
+    self.search = None
+    self.spent = 0
+    self.best_angle = None
+    self.completed_depth = 0
+    self.hits = 0
+    self.nodes = 0
+
+  def reset(self):
+    """
+    Golirea cache-ului, la inceputul unui joc nou. Cheile depind doar de pozitie, deci intrarile raman valabile
+    de la o mutare la alta (si dupa o anulare), dar valorile depind si de punctele culorilor, care difera intre jocuri.
+    """
+    self.cache.clear()
+
+  def start(self):
+    """
+    Pornirea cautarii pentru starea curenta a motorului.
+    """
+    self.search = self.think()
+    self.spent = 0
+    self.best_angle = None
+    self.completed_depth = 0
+
+  def step(self, time_slice):
+    """
+    Rularea cautarii pentru cel mult time_slice secunde.
+    Returneaza True cat timp cautarea nu s-a terminat si bugetul mutarii nu s-a epuizat.
+    :param time_slice: Timpul disponibil in acest apel, in secunde.
+    """
+    if self.search is None:
+      return False
+    start = time.perf_counter()
+    deadline = start + time_slice
+    if self.time_budget is not None:
+      deadline = min(deadline, start + self.time_budget - self.spent)
+    try:
+      while time.perf_counter() < deadline:
+        next(self.search)
+    except StopIteration:
+      self.search = None
+    self.spent += time.perf_counter() - start
+    if self.search is not None and self.time_budget is not None and self.spent >= self.time_budget:
+      self.search.close()
+      self.search = None
+    return self.search is not None
+
+  def choose_angle(self):
+    """
+    Alegerea sincrona a unghiului de tragere, in limita bugetului de timp.
+    """
+    self.start()
+    while self.step(self.time_budget if self.time_budget is not None else 1):
+      pass
+    return self.best_angle
+
+  def think(self):
+    """
+    Generator pentru cautarea cu adancime crescatoare: dupa fiecare adancime terminata, best_angle
+    retine cel mai bun unghi gasit, astfel ca oprirea cautarii in orice moment lasa un raspuns valid.
+    """
+    state = self.engine.state
+    board = state.bitboard.copy() if state.bitboard is not None else BitBoard.from_table(state.game_table, state.first_row)
+    colors = (state.current_color, state.next_bubble_color)
+    moves = yield from self.children(board)
+    if not moves:
+      return
+    for depth in range(1, self.max_depth + 1):
+      best_angle, best_value = None, -math.inf
+      for (row, col), angle in moves:
+        value = yield from self.shot_value(board, row, col, colors, state.drop_counter, depth)
+        if value > best_value:
+          best_angle, best_value = angle, value
+          if depth == 1:
+            self.best_angle = angle
+      self.best_angle = best_angle
+      self.completed_depth = depth
+
+  def children(self, board):
+    """
+    Generator ce returneaza celulele distincte in care poate ajunge bula trasa, cu cate un unghi pentru fiecare.
+    :param board: Tabla de biti a pozitiei.
+    """
+    game_table = table_from_board(board)
+    first_row = board.first_row
+    shooter_row, shooter_col = shooter_cell(board.rows - 2, board.cols)
+    shooter_x, shooter_y = bubble_position(shooter_row, shooter_col, first_row)
+    cells = dict()
+    for angle in self.angles:
+      trajectory = solve_trajectory(shooter_x, shooter_y, angle, first_row, game_table)
+      if trajectory is not None:
+        path, collision_bubble = trajectory
+        cell = landing_cell(game_table, first_row, path[-1][0], path[-1][1], collision_bubble)
+        cells.setdefault(cell, angle)
+      yield
+    return list(cells.items())
+
+  def shot_value(self, board, row, col, colors, drop_counter, depth):
+    """
+    Generator ce returneaza valoarea unei lovituri: punctele imediate plus valoarea pozitiei rezultate.
+    :param board: Tabla de biti a pozitiei.
+    :param row: Randul celulei de asezare.
+    :param col: Coloana celulei de asezare.
+    :param colors: Culorile cunoscute ale bulelor ce urmeaza, prima fiind cea trasa acum.
+    :param drop_counter: Numarul de lovituri de la ultima coborare a tablei.
+    :param depth: Numarul de lovituri analizate, inclusiv aceasta.
+    """
+    child, child_counter, points, status = apply_shot(board, row, col, colors[0], drop_counter, self.engine.state.color_score, self.engine.drop_shots)
+    self.nodes += 1
+    if status == "win":
+      return points + WIN_VALUE
+    if status == "lose":
+      return points - WIN_VALUE
+    value = yield from self.position_value(child, colors[1:], child_counter, depth - 1)
+    return points + DISCOUNT * value
+
+  def position_value(self, board, colors, drop_counter, depth):
+    """
+    Generator ce returneaza valoarea unei pozitii, cautata pe adancimea data sau luata din cache.
+    :param board: Tabla de biti a pozitiei.
+    :param colors: Culorile cunoscute ale bulelor ce urmeaza.
+    :param drop_counter: Numarul de lovituri de la ultima coborare a tablei.
+    :param depth: Numarul de lovituri ramase de analizat.
+    """
+    if depth == 0:
+      return evaluate(board)
+    key = board.key ^ DROP_KEYS[drop_counter]
+    for slot, color in enumerate(colors):
+      key ^= COLOR_KEYS[slot][color]
+    entry = self.cache.get(key)
+    if entry is not None and entry[0] >= depth:
+      self.cache.move_to_end(key)
+      self.hits += 1
+      return entry[1]
+
+    if colors:
+      moves = yield from self.children(board)
+      value = -math.inf
+      for (row, col), _ in moves:
+        value = max(value, (yield from self.shot_value(board, row, col, colors, drop_counter, depth)))
+      if not moves:
+        value = evaluate(board)
+    else:
+      remaining = sorted(board.colors)
+      value = 0
+      for color in remaining:
+        value += (yield from self.position_value(board, (color,), drop_counter, depth)) / len(remaining)
+
+    self.cache[key] = (depth, value)
+    self.cache.move_to_end(key)
+    if len(self.cache) > self.cache_size:
+      self.cache.popitem(last=False)
+    return value
@@ -0,0 +1,275 @@
+import argparse
+import itertools
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from engine import *
+from bitboard import BitBoard
+from levels import Level
+
+SHAPES = ("random", "clusters", "stripes", "single")
+BENCH_ANGLES = [-0.3 - index * (math.pi - 0.6) / 15 for index in range(16)]
+
+def generate_level(rows, fill, colors, shape, seed):
+  """
+  Generarea unei table pentru masuratori. Bulele care nu sunt legate de tavan sau de pereti sunt scoase,
+  ca tabla sa fie una care poate aparea in joc.
+  :param rows: Numarul de randuri completate; tabla are cel putin un rand liber sub ele.
+  :param fill: Proportia de celule ocupate, intre 0 si 1.
+  :param colors: Numarul de culori.
+  :param shape: Forma grupurilor de culori: random, clusters (pete de aceeasi culoare), stripes (randuri) sau single (o singura culoare).
+  :param seed: Seed-ul generatorului.
+  """
+  rng = random.Random(seed)
+  board_rows = max(MAXHEIGHT, rows + 1)
+  cells = [(row, col) for row in range(rows) for col in range(MAXWIDTH) if not (row % 2 == 1 and col == MAXWIDTH - 1)]
+  cells = [cell for cell in cells if rng.random() < fill]
+  centers = [(rng.randrange(rows), rng.randrange(MAXWIDTH), rng.randrange(colors)) for _ in range(max(1, len(cells) // 8))]
+  board = BitBoard(board_rows + 2, MAXWIDTH)
+  for row, col in cells:
+    if shape == "single":
+      color = 0
+    elif shape == "stripes":
+      color = row % colors
+    elif shape == "clusters":
+      color = min(centers, key=lambda center: (center[0] - row) ** 2 + (center[1] - col) ** 2)[2]
+    else:
+      color = rng.randrange(colors)
+    board.add(row, col, color)
+  board.remove(board.get_target_bubbles(0))
+  bubbles = [(row, col, color) for color, mask in board.colors.items() for row, col in board.cells(mask)]
+  return Level(bubbles, set(board.colors) or {0}, 0, seed, board_rows, MAXWIDTH)
+
+def largest_cluster(engine):
+  """
+  Returneaza o bula din cel mai mare grup de bule de aceeasi culoare.
+  :param engine: Motorul cu tabla masurata.
+  """
+  board = BitBoard.from_table(engine.state.game_table, engine.state.first_row)
+  best, best_size, seen = None, 0, 0
+  for bubble in engine.state.bubbles():
+    bit = board.bit(bubble.row, bubble.col)
+    if seen & bit:
+      continue
+    cluster = board.find_color_matches(bubble.row, bubble.col)
+    seen |= cluster
+    if board.count(cluster) > best_size:
+      best, best_size = bubble, board.count(cluster)
+  return best
+
+def fork(engine):
+  """
+  Returneaza un motor nou, cu o copie a starii, ca masuratorile care modifica tabla sa porneasca mereu din aceeasi pozitie.
+  :param engine: Motorul copiat.
+  """
+  copy = Engine(0, drop_shots=engine.drop_shots, bitboard=engine.use_bitboard, score_table=engine.score_table, rows=engine.rows, cols=engine.cols)
+  copy.state = engine.state.copy()
+  return copy
+
+def object_matches(engine, bubble):
+  """
+  Returneaza bulele de aceeasi culoare legate de bula data, calculate pe matricea de bule.
+  :param engine: Motorul cu tabla masurata.
+  :param bubble: Bula de start.
+  """
+  matches = set()
+  engine.find_color_matches(matches, bubble)
+  return matches
+
+def contact_points(engine):
+  """
+  Returneaza punctele de contact ale unor lovituri la unghiuri fixe, pentru masurarea lui new_bubble_position.
+  :param engine: Motorul cu tabla masurata.
+  """
+  shooter_x, shooter_y = engine.shooter_position()
+  points = []
+  for angle in BENCH_ANGLES:
+    trajectory = solve_trajectory(shooter_x, shooter_y, angle, engine.state.first_row, engine.state.game_table)
+    if trajectory is not None:
+      path, collision_bubble = trajectory
+      points.append((path[-1][0], path[-1][1], collision_bubble))
+  return points
+
+def cases(engine):
+  """
+  Returneaza masuratorile pentru o tabla, ca tupluri (nume, pregatire, apel). Pregatirea nu e cronometrata
+  si intoarce argumentele apelului.
+  :param engine: Motorul cu tabla masurata (cu sau fara tabla de biti).
+  """
+  bubble = largest_cluster(engine)
+  board = engine.state.bitboard
+  angles = itertools.cycle(BENCH_ANGLES)
+  if board is not None:
+    yield "find_color_matches", lambda: (board, bubble.row, bubble.col), lambda board, row, col: board.find_color_matches(row, col)
+    match_mask = board.find_color_matches(bubble.row, bubble.col)
+    yield "get_target_bubbles", lambda: (board, match_mask), lambda board, matches: board.get_target_bubbles(matches)
+    def dissolve_setup():
+      copy = fork(engine)
+      return copy, copy.bubbles_in(copy.state.bitboard.get_target_bubbles(match_mask))
+  else:
+    yield "find_color_matches", lambda: (engine, bubble), object_matches
+    def targets_setup():
+      copy = fork(engine)
+      return copy, object_matches(copy, copy.state.game_table[bubble.row][bubble.col])
+    yield "get_target_bubbles", targets_setup, lambda copy, matches: copy.get_target_bubbles(matches)
+    bubbles = engine.state.bubbles()
+    yield "get_neighbor_bubbles", lambda: (engine, bubbles), lambda engine, bubbles: [engine.get_neighbor_bubbles(other) for other in bubbles]
+    points = contact_points(engine)
+    yield "new_bubble_position", lambda: (engine, points), lambda engine, points: [engine.new_bubble_position(*point) for point in points]
+    def dissolve_setup():
+      copy = fork(engine)
+      matches = object_matches(copy, copy.state.game_table[bubble.row][bubble.col])
+      return copy, copy.get_target_bubbles(matches)
+  yield "disolve_bubbles", dissolve_setup, lambda copy, bubbles: copy.disolve_bubbles(bubbles)
+  yield "shot", lambda: (fork(engine), next(angles)), lambda copy, angle: copy.shoot(angle)
+
+def measure(setup, run, iterations):
+  """
+  Cronometrarea unui apel, de mai multe ori. Returneaza duratele, in microsecunde.
+  :param setup: Functia ce pregateste argumentele apelului.
+  :param run: Functia cronometrata.
+  :param iterations: Numarul de repetari.
+  """
+  timings = []
+  for _ in range(iterations):
+    args = setup()
+    start = time.perf_counter()
+    run(*args)
+    timings.append((time.perf_counter() - start) * 1e6)
+  return timings
+
+def run_suite(rows_list, fills, colors_list, shapes, iterations, seed, selected=None):
+  """
+  Rularea tuturor masuratorilor pe toate combinatiile de parametri. Returneaza lista de rezultate.
+  :param rows_list: Numerele de randuri completate.
+  :param fills: Proportiile de celule ocupate.
+  :param colors_list: Numerele de culori.
+  :param shapes: Formele grupurilor de culori.
+  :param iterations: Numarul de repetari ale fiecarei masuratori.
+  :param seed: Seed-ul generatorului de table.
+  :param selected: Numele masuratorilor rulate (None pentru toate).
+  """
+  results = []
+  for rows in rows_list:
+    for fill in fills:
+      for colors in colors_list:
+        for shape in shapes:
+          if shape == "single" and colors != colors_list[0]:
+            continue
+          level = generate_level(rows, fill, colors, shape, seed)
+          for backend in ("object", "bitboard"):
+            engine = Engine(seed, bitboard=backend == "bitboard")
+            engine.load_level(level)
+            if not engine.state.bubbles():
+              continue
+            for name, setup, run in cases(engine):
+              if selected and name not in selected:
+                continue
+              timings = measure(setup, run, iterations)
+              results.append({
+                "benchmark": name,
+                "backend": backend,
+                "rows": rows,
+                "fill": fill,
+                "colors": 1 if shape == "single" else colors,
+                "shape": shape,
+                "bubbles": len(level.bubbles),
+                "iterations": iterations,
+                "median_us": round(statistics.median(timings), 3),
+                "mean_us": round(statistics.fmean(timings), 3),
+                "min_us": round(min(timings), 3),
+              })
+  return results
+
+def result_key(result):
+  """
+  Returneaza cheia dupa care un rezultat e comparat cu cel corespunzator din referinta.
+  :param result: Rezultatul unei masuratori.
+  """
+  return (result["benchmark"], result["backend"], result["rows"], result["fill"], result["colors"], result["shape"])
+
+def compare(results, baseline, threshold):
+  """
+  Compararea rezultatelor cu o rulare de referinta, dupa mediana. Returneaza (linii de raport, numarul de regresii).
+  :param results: Rezultatele curente.
+  :param baseline: Rezultatele de referinta.
+  :param threshold: Cresterea relativa peste care o masuratoare e considerata regresie (de exemplu, 0.1).
+  """
+  reference = {result_key(result): result for result in baseline}
+  lines = []
+  regressions = 0
+  for result in results:
+    old = reference.get(result_key(result))
+    if old is None or not old["median_us"]:
+      continue
+    ratio = result["median_us"] / old["median_us"]
+    flag = ""
+    if ratio > 1 + threshold:
+      flag = "REGRESSION"
+      regressions += 1
+    elif ratio < 1 - threshold:
+      flag = "faster"
+    name = "{} [{}] rows={} fill={} colors={} {}".format(*result_key(result))
+    lines.append(f"{name:<70} {old['median_us']:>10.1f} {result['median_us']:>10.1f} {ratio:>6.2f}x {flag}")
+  return lines, regressions
+
+def parse_list(kind):
+  """
+  Returneaza o functie ce citeste o lista separata prin virgule din linia de comanda.
+  :param kind: Tipul elementelor listei.
+  """
+  return lambda text: [kind(value) for value in text.split(",")]
+
+def main(argv=None):
+  """
+  Functia main a masuratorilor.
+  :param argv: Argumentele din linia de comanda (implicit, sys.argv).
+  """
+  parser = argparse.ArgumentParser(description="Benchmark the BubbleBuster rule engine on generated boards.")
+  parser.add_argument("--rows", type=parse_list(int), default=[7, 13], help="filled rows, comma separated")
+  parser.add_argument("--fill", type=parse_list(float), default=[1.0, 0.7], help="fill ratios, comma separated")
+  parser.add_argument("--colors", type=parse_list(int), default=[2, 4], help="color counts, comma separated")
+  parser.add_argument("--shapes", type=parse_list(str), default=list(SHAPES), help="cluster shapes: " + ", ".join(SHAPES))
+  parser.add_argument("--only", type=parse_list(str), default=None, help="run only these benchmarks")
+  parser.add_argument("-i", "--iterations", type=int, default=200, help="timed calls per benchmark")
+  parser.add_argument("--seed", type=int, default=0, help="seed of the generated boards")
+  parser.add_argument("-o", "--output", default="-", help="file for the JSON results (default: stdout)")
+  parser.add_argument("--save-baseline", default=None, help="also write the results to this baseline file")
+  parser.add_argument("--compare", default=None, help="baseline file to compare against")
+  parser.add_argument("--threshold", type=float, default=0.1, help="relative slowdown reported as a regression")
+  args = parser.parse_args(argv)
+
+  for shape in args.shapes:
+    if shape not in SHAPES:
+      parser.error(f"unknown shape {shape}")
+  if not all(rows >= 1 for rows in args.rows):
+    parser.error("rows must be positive")
+  if not all(1 <= colors <= 15 for colors in args.colors):
+    parser.error("colors must be between 1 and 15")
+  results = run_suite(args.rows, args.fill, args.colors, args.shapes, args.iterations, args.seed, args.only)
+  report = {"python": platform.python_version(), "machine": platform.machine(), "results": results}
+  if args.save_baseline:
+    with open(args.save_baseline, "w") as baseline_file:
+      json.dump(report, baseline_file, indent=1)
+  if args.output == "-":
+    json.dump(report, sys.stdout, indent=1)
+    print()
+  else:
+    with open(args.output, "w") as output:
+      json.dump(report, output, indent=1)
+
+  if args.compare:
+    with open(args.compare) as baseline_file:
+      baseline = json.load(baseline_file)["results"]
+    lines, regressions = compare(results, baseline, args.threshold)
+    print(f"{'benchmark':<70} {'base us':>10} {'now us':>10} {'ratio':>7}", file=sys.stderr)
+    for line in lines:
+      print(line, file=sys.stderr)
+    return 1 if regressions else 0
+  return 0
+
+if __name__ == "__main__":
+  sys.exit(main())
@@ -0,0 +1,241 @@
+import random
+
+ZOBRIST_SEED = 0x5eed
+ZOBRIST_COLORS = 16
+zobrist_tables = dict()
+
+def zobrist_table(cells):
+  """
+  Returneaza cheile Zobrist pentru o tabla cu numarul dat de celule: cate o cheie pe 64 de biti
+  pentru fiecare pereche (celula, culoare), plus doua chei pentru paritatea lui first_row.
+  Cheile sunt generate o singura data, dintr-un seed fix, deci sunt aceleasi in toate procesele.
+  :param cells: Numarul de celule al tablei.
+  """
+  if cells not in zobrist_tables:
+    rng = random.Random(ZOBRIST_SEED + cells)
+    keys = [[rng.getrandbits(64) for _ in range(ZOBRIST_COLORS)] for _ in range(cells)]
+    parity = (rng.getrandbits(64), rng.getrandbits(64))
+    zobrist_tables[cells] = (keys, parity)
+  return zobrist_tables[cells]
+
+class BitBoard:
+  """
+  Reprezentarea tablei hexagonale prin masti de biti: cate un numar intreg pentru fiecare culoare
+  si unul pentru ocupare. Celula (row, col) corespunde bitului row * cols + col.
+  """
+  def __init__(self, rows, cols, first_row=0):
+    """
+    Initializarea unui obiect de tip BitBoard.
+    :param rows: Numarul de randuri al tablei.
+    :param cols: Numarul de coloane al tablei.
+    :param first_row: Numarul de randuri cu care a coborat tabla de joc.
+    """
+    self.rows = rows
+    self.cols = cols
+    self.first_row = first_row
+    self.colors = dict()
+    self.occupied = 0
+    self.zobrist, self.parity_keys = zobrist_table(rows * cols)
+    self.key = self.parity_keys[first_row % 2]
+    self.full = (1 << (rows * cols)) - 1
+    row_mask = (1 << cols) - 1
+    first_col = 0
+    last_col = 0
+    rows_by_parity = [0, 0]
+    for row in range(rows):
+      first_col |= 1 << (row * cols)
+      last_col |= 1 << (row * cols + cols - 1)
+      rows_by_parity[row % 2] |= row_mask << (row * cols)
+    self.row_mask = row_mask
+    self.first_col = first_col
+    self.last_col = last_col
+    self.not_first_col = self.full & ~first_col
+    self.not_last_col = self.full & ~last_col
+    self.rows_by_parity = rows_by_parity
+
+  @classmethod
+  def from_table(cls, game_table, first_row):
+    """
+    Construirea unei table de biti dintr-o matrice de bule.
+    :param game_table: Matricea cu bulele din joc.
+    :param first_row: Numarul de randuri cu care a coborat tabla de joc.
+    """
+    board = cls(len(game_table), len(game_table[0]), first_row)
+    for row in game_table:
+      for bubble in row:
+        if bubble:
+          board.add(bubble.row, bubble.col, bubble.color)
+    return board
+
+  def copy(self):
+    """
+    Returneaza o copie a tablei; mastile sunt numere intregi, deci copierea e ieftina.
+    """
+    board = BitBoard.__new__(BitBoard)
+    board.__dict__.update(self.__dict__)
+    board.colors = dict(self.colors)
+    return board
+
+  def bit(self, row, col):
+    """
+    Returneaza masca celulei (row, col).
+    :param row: Randul celulei.
+    :param col: Coloana celulei.
+    """
+    return 1 << (row * self.cols + col)
+
+  def cells(self, mask):
+    """
+    Returneaza pozitiile (row, col) ale celulelor dintr-o masca.
+    :param mask: Masca de celule.
+    """
+    cells = []
+    while mask:
+      low = mask & -mask
+      cells.append(divmod(low.bit_length() - 1, self.cols))
+      mask ^= low
+    return cells
+
+  def color_at(self, row, col):
+    """
+    Returneaza culoarea bulei din celula (row, col) sau None daca celula e goala.
+    :param row: Randul celulei.
+    :param col: Coloana celulei.
+    """
+    bit = self.bit(row, col)
+    if self.occupied & bit:
+      for color, mask in self.colors.items():
+        if mask & bit:
+          return color
+    return None
+
+  def add(self, row, col, color):
+    """
+    Adaugarea unei bule in tabla.
+    :param row: Randul celulei.
+    :param col: Coloana celulei.
+    :param color: Culoarea bulei.
+    """
+    bit = self.bit(row, col)
+    self.remove(bit)
+    self.colors[color] = self.colors.get(color, 0) | bit
+    self.occupied |= bit
+    self.key ^= self.zobrist[row * self.cols + col][color]
+
+  def remove(self, mask):
+    """
+    Stergerea din tabla a bulelor dintr-o masca.
+    :param mask: Masca bulelor ce se sterg.
+    """
+    if not self.occupied & mask:
+      return
+    self.occupied &= ~mask
+    for color in list(self.colors):
+      removed = self.colors[color] & mask
+      while removed:
+        low = removed & -removed
+        self.key ^= self.zobrist[low.bit_length() - 1][color]
+        removed ^= low
+      self.colors[color] &= ~mask
+      if not self.colors[color]:
+        del self.colors[color]
+
+  def neighbors(self, mask):
+    """
+    Returneaza masca tuturor celulelor vecine cu celulele din masca data.
+    Randurile cu (row + first_row) par au vecinii diagonali la stanga, iar cele impare la dreapta.
+    :param mask: Masca de celule.
+    """
+    cols = self.cols
+    even = mask & self.rows_by_parity[self.first_row % 2]
+    odd = mask & self.rows_by_parity[(self.first_row + 1) % 2]
+    left = mask & self.not_first_col
+    right = mask & self.not_last_col
+    even_left = even & self.not_first_col
+    odd_right = odd & self.not_last_col
+    result = (left >> 1) | (right << 1) | (mask >> cols) | (mask << cols)
+    result |= (even_left >> (cols + 1)) | (even_left << (cols - 1))
+    result |= (odd_right >> (cols - 1)) | (odd_right << (cols + 1))
+    return result & self.full
+
+  def flood(self, seeds, allowed):
+    """
+    Extinderea unei multimi de celule prin vecini, doar in interiorul mastii permise.
+    :param seeds: Masca celulelor de start.
+    :param allowed: Masca celulelor prin care se poate extinde.
+    """
+    region = seeds & allowed
+    frontier = region
+    while frontier:
+      frontier = self.neighbors(frontier) & allowed & ~region
+      region |= frontier
+    return region
+
+  def anchors(self):
+    """
+    Returneaza masca celulelor ce tin bulele legate: randul de sus si marginile randurilor pare.
+    """
+    first_row = self.first_row
+    anchors = self.row_mask << (first_row * self.cols) if first_row < self.rows else 0
+    walls = (self.first_col | self.last_col) & self.rows_by_parity[first_row % 2]
+    return (anchors | walls) & self.full
+
+  def find_color_matches(self, row, col):
+    """
+    Returneaza masca bulelor de aceeasi culoare legate de bula din (row, col), inclusiv ea.
+    :param row: Randul bulei.
+    :param col: Coloana bulei.
+    """
+    bit = self.bit(row, col)
+    for mask in self.colors.values():
+      if mask & bit:
+        return self.flood(bit, mask)
+    return 0
+
+  def get_target_bubbles(self, matches):
+    """
+    Returneaza masca bulelor ce trebuie eliminate: cele potrivite si cele ramase fara legatura cu ancorele.
+    :param matches: Masca bulelor de aceeasi culoare cu bula curenta.
+    """
+    remaining = self.occupied & ~matches
+    safe = self.flood(self.anchors() & remaining, remaining)
+    return self.occupied & ~safe
+
+  def drop_bubbles(self):
+    """
+    Coborarea tuturor bulelor cu un rand. Toate celulele se schimba, deci cheia Zobrist se recalculeaza.
+    """
+    shift = self.cols
+    self.first_row += 1
+    self.occupied = (self.occupied << shift) & self.full
+    for color in list(self.colors):
+      self.colors[color] = (self.colors[color] << shift) & self.full
+      if not self.colors[color]:
+        del self.colors[color]
+    self.key = self.compute_key()
+
+  def compute_key(self):
+    """
+    Calcularea completa a cheii Zobrist a tablei.
+    """
+    key = self.parity_keys[self.first_row % 2]
+    for color, mask in self.colors.items():
+      while mask:
+        low = mask & -mask
+        key ^= self.zobrist[low.bit_length() - 1][color]
+        mask ^= low
+    return key
+
+  def count(self, mask=None):
+    """
+    Returneaza numarul de bule dintr-o masca (implicit, din toata tabla).
+    :param mask: Masca de celule.
+    """
+    return (self.occupied if mask is None else mask).bit_count()
+
+  def row_occupied(self, row):
+    """
+    Verifica daca exista cel putin o bula pe randul dat.
+    :param row: Randul verificat.
+    """
+    return bool(self.occupied & (self.row_mask << (row * self.cols)))
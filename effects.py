@@ -0,0 +1,121 @@
+import itertools
+import math
+
+POP = 0
+FALL = 1
+POP_TICKS = 12
+POP_GROWTH = 0.45
+POP_COLOR = "#ffffff"
+FALL_GRAVITY = 0.4
+
+class Cohort:
+  """
+  Un grup de ovale animate impreuna (bulele sparte sau cele care cad dupa o lovitura), legate printr-un tag comun.
+  """
+  __slots__ = ("kind", "tag", "items", "tick", "duration", "x", "y", "applied")
+
+  def __init__(self, kind, tag, items, tick, duration, x=0, y=0, applied=0):
+    """
+    Initializarea unui obiect de tip Cohort.
+    :param kind: Tipul animatiei (POP sau FALL).
+    :param tag: Tag-ul comun al ovalelor.
+    :param items: Id-urile ovalelor.
+    :param tick: Pasul planificatorului la pornirea animatiei.
+    :param duration: Durata animatiei, in pasi.
+    :param x: Coordonata X a centrului de crestere (POP).
+    :param y: Coordonata Y a centrului de crestere (POP).
+    :param applied: Starea deja desenata: factorul de crestere (POP) sau distanta cazuta (FALL).
+    """
+    self.kind = kind
+    self.tag = tag
+    self.items = items
+    self.tick = tick
+    self.duration = duration
+    self.x = x
+    self.y = y
+    self.applied = applied
+
+class Effects:
+  """
+  Animatiile bulelor sparte (cresc si se albesc) si ale celor ramase fara legatura (cad din zona vizibila).
+  Toate ruleaza intr-o singura animatie a planificatorului. Fiecare grup are un tag propriu, deci un cadru face
+  un singur apel Tk (scale sau move) pe grup, oricate bule ar avea. Pozitia depinde doar de pasul curent,
+  astfel ca, atunci cand planificatorul sare pasi sau amana animatia ca sa ramana in buget, nu se pierde timp.
+  """
+  def __init__(self, scheduler, renderer):
+    """
+    Initializarea unui obiect de tip Effects.
+    :param scheduler: Planificatorul de cadre.
+    :param renderer: Renderer-ul prin care se deseneaza.
+    """
+    self.scheduler = scheduler
+    self.renderer = renderer
+    self.cohorts = []
+    self.counter = itertools.count()
+    self.running = False
+
+  def start(self, cohort, **options):
+    """
+    Pornirea unui grup: ovalele primesc tag-ul grupului (si isi pierd tag-urile tablei), iar animatia comuna e pornita.
+    :param cohort: Grupul pornit.
+    :param options: Optiunile schimbate o data pentru fiecare oval, la pornire.
+    """
+    for item in cohort.items:
+      self.renderer.update_item(item, tags=("effect", cohort.tag), **options)
+    self.cohorts.append(cohort)
+    if not self.running:
+      self.running = True
+      self.scheduler.add(self.animate)
+
+  def pop(self, items, x, y):
+    """
+    Spargerea unor bule: ovalele se albesc si cresc in jurul centrului grupului, apoi dispar.
+    :param items: Id-urile ovalelor.
+    :param x: Coordonata X a centrului grupului.
+    :param y: Coordonata Y a centrului grupului.
+    """
+    if items:
+      self.start(Cohort(POP, f"effect{next(self.counter)}", items, self.scheduler.tick, POP_TICKS, x, y, 1), fill=POP_COLOR)
+
+  def fall(self, items, distance):
+    """
+    Caderea unor bule, accelerata, pana ies din zona vizibila.
+    :param items: Id-urile ovalelor.
+    :param distance: Distanta, in pixeli, dupa care toate ovalele au iesit din zona vizibila.
+    """
+    if items:
+      duration = math.ceil(math.sqrt(2 * max(distance, 0) / FALL_GRAVITY))
+      self.start(Cohort(FALL, f"effect{next(self.counter)}", items, self.scheduler.tick, duration))
+
+  def animate(self, tick):
+    """
+    Desenarea tuturor grupurilor active la pasul curent. Ovalele grupurilor terminate se intorc in bazin.
+    Returneaza True cat timp mai exista grupuri active.
+    :param tick: Pasul curent al planificatorului.
+    """
+    cohorts = []
+    for cohort in self.cohorts:
+      elapsed = min(tick - cohort.tick, cohort.duration)
+      if elapsed >= cohort.duration:
+        self.renderer.release_tag(cohort.tag, cohort.items)
+        continue
+      if cohort.kind == POP:
+        scale = 1 + POP_GROWTH * elapsed / cohort.duration
+        if scale != cohort.applied:
+          self.renderer.scale_tag(cohort.tag, cohort.x, cohort.y, scale / cohort.applied)
+          cohort.applied = scale
+      else:
+        offset = FALL_GRAVITY * elapsed * elapsed / 2
+        if offset != cohort.applied:
+          self.renderer.move_tag(cohort.tag, 0, offset - cohort.applied)
+          cohort.applied = offset
+      cohorts.append(cohort)
+    self.cohorts = cohorts
+    self.running = bool(cohorts)
+    return self.running
+
+  def item_count(self):
+    """
+    Returneaza numarul de ovale animate.
+    """
+    return sum(len(cohort.items) for cohort in self.cohorts)
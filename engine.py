@@ -0,0 +1,874 @@
+import random
+import math
+import heapq
+from collections import deque
+from bitboard import BitBoard
+
+WIDTH = 456
+HEIGHT = 550
+MAXHEIGHT = 14
+MAXWIDTH = 12
+BUBBLESIZE = 38
+ROW_HEIGHT = BUBBLESIZE * 0.85
+SHOOTER_ROW = MAXHEIGHT + 1
+SHOOTER_COL = 5
+BUBBLE_SPEED = 8.5
+ANGLE_STEP = math.radians(0.25)
+DROP_SHOTS = 5
+SCORE_TABLE = (45, 30, 15)
+COLORS = ("#08deea", "#c4ffff", "#fd8090", "#1261d1")
+FLOATING = float('inf')
+
+class Bubble:
+  """
+  Clasa pentru bulele din joc. Foloseste __slots__ si pastreaza centrul bulei in coordonatele tablei,
+  astfel ca geometria nu mai e citita inapoi din canvas.
+  """
+  __slots__ = ("row", "col", "color", "x", "y", "depth")
+
+  def __init__(self, row, col, color, offset=0):
+    """
+    Initializarea unui obiect de tip Bubble.
+    :param row: Randul pe care se afla bula in tabela hexagonala.
+    :param col: Coloana pe care se afla bula in tabela hexagonala.
+    :param color: Indexul culorii bulei in COLORS.
+    :param offset: Numarul de randuri cu care a coborat tabla de joc.
+    """
+    self.row = row
+    self.col = col
+    self.color = color
+    self.depth = FLOATING
+    self.x, self.y = bubble_position(row, col, offset)
+
+  def update_center(self, offset):
+    """
+    Recalcularea centrului bulei, dupa ce tabla a coborat.
+    :param offset: Numarul de randuri cu care a coborat tabla de joc.
+    """
+    self.x, self.y = bubble_position(self.row, self.col, offset)
+
+  def copy(self):
+    """
+    Returneaza o copie a bulei, cu aceeasi geometrie si adancime.
+    """
+    bubble = Bubble.__new__(Bubble)
+    bubble.row = self.row
+    bubble.col = self.col
+    bubble.color = self.color
+    bubble.x = self.x
+    bubble.y = self.y
+    bubble.depth = self.depth
+    return bubble
+
+class ShotResult:
+  """
+  Rezultatul unei lovituri rezolvate de motorul de joc.
+  """
+  def __init__(self, bubble, path):
+    """
+    Initializarea unui obiect de tip ShotResult.
+    :param bubble: Bula trasa, asezata in tabla de joc.
+    :param path: Lista cu punctele (x, y) ale traiectoriei: pozitia de start, ricoseurile si punctul de contact.
+    """
+    self.bubble = bubble
+    self.path = path
+    self.cell = (bubble.row, bubble.col)
+    self.replaced = None
+    self.matches = set()
+    self.target_bubbles = set()
+    self.points = 0
+    self.dropped = False
+    self.status = None
+
+class BoardStats:
+  """
+  Statistici ale tablei, actualizate in O(1) la fiecare bula asezata, stearsa sau coborare:
+  numarul de bule de fiecare culoare, numarul total si cel mai de jos rand ocupat.
+  Numarul de bule de pe fiecare rand e tinut pe randul logic (randul fizic minus coborarile),
+  astfel ca o coborare nu muta nimic.
+  """
+  def __init__(self):
+    """
+    Initializarea unui obiect de tip BoardStats, pentru o tabla goala.
+    """
+    self.color_counts = dict()
+    self.row_counts = dict()
+    self.total = 0
+    self.drops = 0
+    self.lowest_row = -1
+
+  @classmethod
+  def from_table(cls, game_table):
+    """
+    Calcularea statisticilor unei table, printr-o parcurgere completa. Culorile apar in color_counts
+    in ordinea primei lor aparitii, rand cu rand.
+    :param game_table: Matricea de bule.
+    """
+    stats = cls()
+    for row in game_table:
+      for bubble in row:
+        if bubble:
+          stats.add(bubble)
+    return stats
+
+  def add(self, bubble):
+    """
+    Adaugarea unei bule in statistici.
+    :param bubble: Bula asezata in tabla.
+    """
+    self.color_counts[bubble.color] = self.color_counts.get(bubble.color, 0) + 1
+    row = bubble.row - self.drops
+    self.row_counts[row] = self.row_counts.get(row, 0) + 1
+    self.total += 1
+    if bubble.row > self.lowest_row:
+      self.lowest_row = bubble.row
+
+  def remove(self, bubble):
+    """
+    Scoaterea unei bule din statistici. Cand randul cel mai de jos se goleste, se urca pana la primul rand ocupat.
+    :param bubble: Bula stearsa din tabla.
+    """
+    count = self.color_counts[bubble.color] - 1
+    if count:
+      self.color_counts[bubble.color] = count
+    else:
+      del self.color_counts[bubble.color]
+    self.total -= 1
+    row = bubble.row - self.drops
+    count = self.row_counts[row] - 1
+    if count:
+      self.row_counts[row] = count
+      return
+    del self.row_counts[row]
+    if not self.total:
+      self.lowest_row = -1
+      return
+    while self.lowest_row - self.drops not in self.row_counts:
+      self.lowest_row -= 1
+
+  def drop(self):
+    """
+    Coborarea tuturor bulelor cu un rand.
+    """
+    self.drops += 1
+    if self.total:
+      self.lowest_row += 1
+
+  def count(self, color):
+    """
+    Returneaza numarul de bule de o anumita culoare.
+    :param color: Culoarea numarata.
+    """
+    return self.color_counts.get(color, 0)
+
+  def copy(self):
+    """
+    Returneaza o copie independenta a statisticilor.
+    """
+    stats = BoardStats()
+    stats.color_counts = dict(self.color_counts)
+    stats.row_counts = dict(self.row_counts)
+    stats.total = self.total
+    stats.drops = self.drops
+    stats.lowest_row = self.lowest_row
+    return stats
+
+class BoardState:
+  """
+  Starea tablei de joc, fara nicio dependenta de interfata grafica.
+  """
+  def __init__(self, rows=MAXHEIGHT, cols=MAXWIDTH):
+    """
+    Initializarea unui obiect de tip BoardState.
+    :param rows: Randul pe care, daca ajunge o bula, jocul e pierdut.
+    :param cols: Numarul de coloane al tablei.
+    """
+    self.rows = rows
+    self.cols = cols
+    self.game_table = initial_matrix(rows, cols)
+    self.all_colors = set()
+    self.color_score = dict()
+    self.current_color = None
+    self.next_bubble_color = None
+    self.drop_counter = 0
+    self.score = 0
+    self.shots = 0
+    self.clusters = 0
+    self.first_row = 0
+    self.status = None
+    self.version = 0
+    self.seed = None
+    self.bitboard = None
+    self.stats = BoardStats()
+    self.dirty_rows = set()
+
+  def bubbles(self):
+    """
+    Returneaza toate bulele din tabla de joc, rand cu rand.
+    """
+    return [bubble for row in self.game_table for bubble in row if bubble]
+
+  def copy(self):
+    """
+    Returneaza o copie independenta a starii.
+    """
+    state = BoardState(self.rows, self.cols)
+    for bubble in self.bubbles():
+      state.game_table[bubble.row][bubble.col] = bubble.copy()
+    state.all_colors = set(self.all_colors)
+    state.color_score = dict(self.color_score)
+    state.current_color = self.current_color
+    state.next_bubble_color = self.next_bubble_color
+    state.drop_counter = self.drop_counter
+    state.score = self.score
+    state.shots = self.shots
+    state.clusters = self.clusters
+    state.first_row = self.first_row
+    state.status = self.status
+    state.version = self.version
+    state.seed = self.seed
+    if self.bitboard is not None:
+      state.bitboard = self.bitboard.copy()
+    state.stats = self.stats.copy()
+    state.dirty_rows = set(self.dirty_rows)
+    return state
+
+class Engine:
+  """
+  Regulile jocului BubbleBuster, aplicate peste un BoardState, fara canvas.
+  """
+  def __init__(self, seed=None, drop_shots=DROP_SHOTS, bitboard=False, score_table=SCORE_TABLE, rows=MAXHEIGHT, cols=MAXWIDTH):
+    """
+    Initializarea unui obiect de tip Engine.
+    :param seed: Seed-ul generatorului de numere aleatoare (None pentru unul random).
+    :param drop_shots: Numarul de lovituri dupa care tabla coboara cu un rand.
+    :param bitboard: Daca regulile (potriviri si bule fara legatura) se evalueaza pe masti de biti.
+    :param score_table: Punctele pentru culoarea cea mai rara, a doua cea mai rara si restul culorilor.
+    :param rows: Randul pe care, daca ajunge o bula, jocul e pierdut.
+    :param cols: Numarul de coloane al tablei.
+    """
+    self.random = random.Random(seed)
+    self.drop_shots = drop_shots
+    self.score_table = score_table
+    self.use_bitboard = bitboard
+    self.resize(rows, cols)
+
+  def resize(self, rows, cols):
+    """
+    Schimbarea dimensiunilor tablei: se recalculeaza tabelele de vecini si se porneste o stare goala.
+    :param rows: Randul pe care, daca ajunge o bula, jocul e pierdut.
+    :param cols: Numarul de coloane al tablei.
+    """
+    self.rows = rows
+    self.cols = cols
+    self.adjacency = neighbor_tables(rows + 2, cols)
+    self.state = BoardState(rows, cols)
+
+  def copy(self):
+    """
+    Returneaza un motor independent, cu aceleasi setari, o copie a starii si generatorul de culori in aceeasi pozitie,
+    deci loviturile date copiei au exact rezultatul pe care l-ar avea in jocul original. Tabelele de vecini sunt comune.
+    """
+    engine = Engine.__new__(Engine)
+    engine.random = random.Random()
+    engine.random.setstate(self.random.getstate())
+    engine.drop_shots = self.drop_shots
+    engine.score_table = self.score_table
+    engine.use_bitboard = self.use_bitboard
+    engine.rows = self.rows
+    engine.cols = self.cols
+    engine.adjacency = self.adjacency
+    engine.state = self.state.copy()
+    return engine
+
+  def adopt(self, engine):
+    """
+    Preluarea starii si a pozitiei generatorului de culori dintr-o copie a motorului, de exemplu
+    una in care a fost rezolvata o lovitura.
+    :param engine: Copia, obtinuta cu copy.
+    """
+    self.state = engine.state
+    self.random.setstate(engine.random.getstate())
+
+  def create_random_table(self, rows=7, seed=None):
+    """
+    Crearea unei table hexagonale de joc random. Fiecare joc are propriul seed, pastrat in stare,
+    astfel ca jocul poate fi reprodus pornind doar de la seed si de la unghiurile loviturilor.
+    :param rows: Numarul de randuri completate la inceputul jocului.
+    :param seed: Seed-ul jocului (None pentru unul luat din generatorul motorului).
+    """
+    if seed is None:
+      seed = self.random.getrandbits(63)
+    self.random = random.Random(seed)
+    self.state = BoardState(self.rows, self.cols)
+    self.state.seed = seed
+    self.state.all_colors = set(range(len(COLORS)))
+
+    for row in range(rows):
+      for col in range(self.cols):
+        if row % 2 == 1 and col == self.cols - 1:
+          continue
+        else:
+          color = self.random_color()
+          self.state.game_table[row][col] = Bubble(row, col, color, self.state.first_row)
+    self.start_game()
+
+  def load_level(self, level):
+    """
+    Incarcarea unei table de joc dintr-un nivel (de exemplu, dintr-un pachet de niveluri).
+    :param level: Nivelul incarcat, cu dimensiunile tablei, first_row, all_colors, seed si bulele (row, col, color).
+    """
+    if (level.rows, level.cols) != (self.rows, self.cols):
+      self.resize(level.rows, level.cols)
+    self.random = random.Random(level.seed)
+    self.state = BoardState(self.rows, self.cols)
+    self.state.seed = level.seed
+    self.state.first_row = level.first_row
+    self.state.all_colors = set(level.all_colors)
+    for row, col, color in level.bubbles:
+      self.state.game_table[row][col] = Bubble(row, col, color, level.first_row)
+    self.start_game()
+
+  def start_game(self):
+    """
+    Pregatirea unei table noi pentru joc: structurile pentru reguli, statisticile, scorul culorilor si primele doua bule.
+    """
+    self.index_table()
+    self.generate_color_score()
+    self.state.current_color = self.random_color()
+    self.state.next_bubble_color = self.random_color()
+
+  def index_table(self):
+    """
+    Calcularea, pornind de la bulele din tabla, a statisticilor si a structurilor pentru reguli (tabla de biti sau adancimile).
+    """
+    self.state.stats = BoardStats.from_table(self.state.game_table)
+    if self.use_bitboard:
+      self.state.bitboard = BitBoard.from_table(self.state.game_table, self.state.first_row)
+    else:
+      self.compute_depths()
+
+  def random_color(self):
+    """
+    Alegerea unei culori random dintre culorile ramase in joc.
+    """
+    return self.random.choice(sorted(self.state.all_colors))
+
+  def generate_color_score(self):
+    """
+    Generarea scorului bulelor, in functie de numarul de culori.
+    """
+    colors_count = self.state.stats.color_counts
+    sorted_colors = sorted(colors_count.keys(), key=lambda x: colors_count[x])
+    color_score = self.state.color_score
+    rarest_score, rare_score, common_score = self.score_table
+
+    if len(sorted_colors) > 4:
+      color_score[sorted_colors[0]] = rarest_score
+      sorted_colors.pop(0)
+      color_score[sorted_colors[0]] = rare_score
+      sorted_colors.pop(0)
+    elif len(sorted_colors) > 2:
+      color_score[sorted_colors[0]] = rare_score
+      sorted_colors.pop(0)
+    for color in sorted_colors:
+      color_score[color] = common_score
+
+  def shooter_position(self):
+    """
+    Returneaza coordonatele de unde pleaca bula trasa.
+    """
+    row, col = shooter_cell(self.rows, self.cols)
+    return bubble_position(row, col, self.state.first_row)
+
+  def aim_angle(self, x, y):
+    """
+    Calcularea unghiului de tragere catre un punct din canvas.
+    :param x: Coordonata X a punctului tintit.
+    :param y: Coordonata Y a punctului tintit.
+    """
+    shooter_x, shooter_y = self.shooter_position()
+    return math.atan2(y - shooter_y, x - shooter_x)
+
+  def trace_shot(self, angle):
+    """
+    Calcularea analitica a traiectoriei bulei trase, fara a modifica tabla.
+    Returneaza traiectoria si celula in care se va aseza bula, sau None daca unghiul nu urca.
+    :param angle: Unghiul de tragere, in radiani.
+    """
+    shooter_x, shooter_y = self.shooter_position()
+    trajectory = solve_trajectory(shooter_x, shooter_y, angle, self.state.first_row, self.state.game_table)
+    if trajectory is None:
+      return None
+    path, collision_bubble = trajectory
+    x, y = path[-1]
+    row, col = self.new_bubble_position(x, y, collision_bubble)
+    return path, row, col
+
+  def shoot(self, angle):
+    """
+    Tragerea bulei curente si rezolvarea completa a loviturii.
+    :param angle: Unghiul de tragere, in radiani.
+    """
+    trace = self.trace_shot(angle)
+    if trace is None:
+      return None
+    path, row, col = trace
+    return self.place_bubble(row, col, path)
+
+  def place_bubble(self, row, col, path=None):
+    """
+    Asezarea bulei curente in tabla si aplicarea regulilor jocului.
+    :param row: Randul pe care se aseaza bula.
+    :param col: Coloana pe care se aseaza bula.
+    :param path: Traiectoria bulei, pastrata pentru animatie.
+    """
+    state = self.state
+    board = state.bitboard
+    bubble, replaced = self.put_bubble(row, col, state.current_color)
+    result = ShotResult(bubble, path or [])
+    result.replaced = replaced
+
+    if board is not None:
+      match_mask = board.find_color_matches(row, col)
+      matches = self.bubbles_in(match_mask)
+    else:
+      matches = set()
+      self.find_color_matches(matches, bubble)
+    if len(matches) >= 3:
+      if board is not None:
+        target_bubbles = self.bubbles_in(board.get_target_bubbles(match_mask))
+      else:
+        target_bubbles = self.get_target_bubbles(matches)
+      result.points = self.update_score(matches, target_bubbles)
+      self.disolve_bubbles(target_bubbles)
+      state.clusters += 1
+      result.matches = matches
+      result.target_bubbles = target_bubbles
+    self.update_next_bubbles()
+    state.shots += 1
+    state.drop_counter += 1
+    if state.drop_counter == self.drop_shots:
+      state.drop_counter = 0
+      self.drop_bubbles()
+      result.dropped = True
+    state.version += 1
+    result.status = self.check_game_status()
+    return result
+
+  def put_bubble(self, row, col, color):
+    """
+    Punerea unei bule in tabla, fara aplicarea regulilor: se actualizeaza adancimea, statisticile si tabla de biti.
+    Returneaza (bula noua, bula inlocuita sau None).
+    :param row: Randul celulei.
+    :param col: Coloana celulei.
+    :param color: Culoarea bulei.
+    """
+    state = self.state
+    bubble = Bubble(row, col, color, state.first_row)
+    if state.bitboard is None:
+      self.attach_bubble(bubble)
+    replaced = state.game_table[row][col]
+    state.game_table[row][col] = bubble
+    state.dirty_rows.add(row - state.first_row)
+    if replaced:
+      state.stats.remove(replaced)
+    state.stats.add(bubble)
+    if state.bitboard is not None:
+      state.bitboard.add(row, col, color)
+    return bubble, replaced
+
+  def attach_garbage(self, garbage):
+    """
+    Lipirea unor bule de gunoi (trimise de adversar, in modul versus): fiecare se opreste acolo unde s-ar opri
+    o bula trasa drept in sus din dreptul coloanei sale, pe tabla dinainte de lipire, deci bulele unui rand
+    nu se opresc una in alta. Bulele nu declanseaza potriviri. Returneaza bulele lipite.
+    :param garbage: Lista de tupluri (coloana, culoare).
+    """
+    state = self.state
+    _, shooter_y = self.shooter_position()
+    cells = dict()
+    for col, color in garbage:
+      x, _ = bubble_position(0, col, 0)
+      path, collision_bubble = solve_trajectory(x, shooter_y, -math.pi / 2, state.first_row, state.game_table)
+      cells.setdefault(self.new_bubble_position(path[-1][0], path[-1][1], collision_bubble), color)
+    bubbles = [self.put_bubble(row, col, color)[0] for (row, col), color in cells.items()]
+    state.version += 1
+    return bubbles
+
+  def bubbles_in(self, mask):
+    """
+    Returneaza bulele din tabla aflate in celulele unei masti de biti.
+    :param mask: Masca de celule din tabla de biti.
+    """
+    game_table = self.state.game_table
+    return {game_table[row][col] for row, col in self.state.bitboard.cells(mask)}
+
+  def find_color_matches(self, matches, bubble, visited=None):
+    """
+    Functie de gasire a bulelor de aceeasi culoare cu care bula curenta a interactionat.
+    :param matches: Set in care pastram bulele de aceeasi culoare cu bula curenta, inclusiv pe ea.
+    :param bubble: Bula pe care o verificam, impreuna cu vecinii sai.
+    :param visited: Set in care punem pozitiile bulelor, pentru a nu repeta procesul degeaba pentru aceeasi bula de doua sau mai multe ori.
+    """
+    if visited is None:
+      visited = set()
+    stack = [bubble]
+    while stack:
+      bubble = stack.pop()
+      if (bubble.row, bubble.col) in visited:
+        continue
+      visited.add((bubble.row, bubble.col))
+      matches.add(bubble)
+      for neighbor in self.get_neighbor_bubbles(bubble):
+        if neighbor.color == bubble.color and (neighbor.row, neighbor.col) not in visited:
+          stack.append(neighbor)
+
+  def is_anchor(self, bubble):
+    """
+    Verifica daca bula e tinuta direct de tavan sau de peretii laterali.
+    :param bubble: Bula verificata.
+    """
+    first_row = self.state.first_row
+    return (bubble.row == first_row) or ((bubble.row + first_row) % 2 == 0 and (bubble.col == 0 or bubble.col == self.cols - 1))
+
+  def compute_depths(self):
+    """
+    Calcularea adancimii fiecarei bule (distanta pana la cea mai apropiata ancora), printr-o parcurgere completa.
+    Fiecare bula care nu e ancora are astfel un vecin cu adancime mai mica, care o sustine.
+    """
+    queue = deque()
+    for bubble in self.state.bubbles():
+      if self.is_anchor(bubble):
+        bubble.depth = 0
+        queue.append(bubble)
+      else:
+        bubble.depth = FLOATING
+    while queue:
+      bubble = queue.popleft()
+      for neighbor in self.get_neighbor_bubbles(bubble):
+        if neighbor.depth > bubble.depth + 1:
+          neighbor.depth = bubble.depth + 1
+          queue.append(neighbor)
+
+  def attach_bubble(self, bubble):
+    """
+    Calcularea adancimii unei bule noi, din vecinii sai, inainte de a o pune in tabla.
+    :param bubble: Bula ce se ataseaza.
+    """
+    if self.is_anchor(bubble):
+      bubble.depth = 0
+      return
+    depth = min((neighbor.depth for neighbor in self.get_neighbor_bubbles(bubble)), default=FLOATING) + 1
+    replaced = self.state.game_table[bubble.row][bubble.col]
+    if replaced:
+      depth = min(depth, replaced.depth)
+    bubble.depth = depth
+
+  def get_target_bubbles(self, matches):
+    """
+    Determinarea bulelor ce trebuie eliminate pe langa cele de aceeasi culoare cu bula curenta.
+    Se verifica doar regiunea din jurul bulelor potrivite: o bula ramane legata daca mai are un vecin
+    cu adancime mai mica; cele care isi pierd sustinerea primesc o adancime noua de la marginea regiunii,
+    iar cele care nu mai pot fi legate de nicio ancora cad.
+    :param matches: Set in care pastram bulele de aceeasi culoare cu bula curenta, inclusiv pe ea.
+    """
+    orphans = set()
+    stack = [neighbor for bubble in matches for neighbor in self.get_neighbor_bubbles(bubble) if neighbor not in matches]
+    while stack:
+      bubble = stack.pop()
+      if bubble in orphans or self.is_anchor(bubble):
+        continue
+      neighbors = self.get_neighbor_bubbles(bubble)
+      if any(neighbor.depth < bubble.depth and neighbor not in matches and neighbor not in orphans for neighbor in neighbors):
+        continue
+      orphans.add(bubble)
+      stack.extend(neighbor for neighbor in neighbors if neighbor.depth > bubble.depth and neighbor not in matches)
+
+    heap = []
+    for index, bubble in enumerate(orphans):
+      depth = min((neighbor.depth for neighbor in self.get_neighbor_bubbles(bubble) if neighbor not in orphans and neighbor not in matches), default=FLOATING)
+      if depth < FLOATING:
+        heapq.heappush(heap, (depth + 1, index, bubble))
+    counter = len(orphans)
+    while heap:
+      depth, _, bubble = heapq.heappop(heap)
+      if bubble not in orphans:
+        continue
+      orphans.remove(bubble)
+      bubble.depth = depth
+      for neighbor in self.get_neighbor_bubbles(bubble):
+        if neighbor in orphans:
+          counter += 1
+          heapq.heappush(heap, (depth + 1, counter, neighbor))
+    return matches | orphans
+
+  def get_neighbor_bubbles(self, bubble):
+    """
+    Determinarea vecinilor unei bule, din tabelele de vecini precalculate pentru paritatea randului.
+    :param bubble: Bula pentru care determinam vecinii.
+    """
+    game_table = self.state.game_table
+    row = bubble.row
+    cells = self.adjacency[(row + self.state.first_row) % 2][row][bubble.col]
+    return [game_table[other_row][other_col] for other_row, other_col in cells if game_table[other_row][other_col]]
+
+  def disolve_bubbles(self, bubbles):
+    """
+    Stergerea din tabla de joc a bulelor. O culoare iese din joc cand statisticile nu mai au nicio bula de acea culoare.
+    :param bubbles: Lista cu bulele care se vor sterge din tabla de joc.
+    """
+    state = self.state
+    board = state.bitboard
+    mask = 0
+    for bubble in bubbles:
+      state.game_table[bubble.row][bubble.col] = None
+      state.dirty_rows.add(bubble.row - state.first_row)
+      state.stats.remove(bubble)
+      if board is not None:
+        mask |= board.bit(bubble.row, bubble.col)
+    if board is not None:
+      board.remove(mask)
+    for color in {bubble.color for bubble in bubbles}:
+      if state.next_bubble_color != color and not state.stats.count(color):
+        state.all_colors.discard(color)
+
+  def new_bubble_position(self, bubble_center_x, bubble_center_y, collision_bubble):
+    """
+    Calcularea randului si coloanei din tabla de joc a bulei care a fost trase.
+    :param bubble_center_x: Coordonata X a centrului bulei trase in momentul coliziunii.
+    :param bubble_center_y: Coordonata Y a centrului bulei trase in momentul coliziunii.
+    :param collision_bubble: Bula lovita sau None daca bula trasa a atins tavanul.
+    """
+    return landing_cell(self.state.game_table, self.state.first_row, bubble_center_x, bubble_center_y, collision_bubble)
+
+  def update_next_bubbles(self):
+    """
+    Actualizarea bulei curente si a celei care urmeaza.
+    """
+    self.state.current_color = self.state.next_bubble_color
+    self.state.next_bubble_color = self.random_color()
+
+  def update_score(self, matches, target_bubbles):
+    """
+    Actualizarea scorului in functie de bulele ce au fost distruse.
+    Returneaza punctele castigate.
+    :param matches: Bulele alaturi de care bula curenta a declansat distrugerea.
+    :param target_bubbles: Bulele care depindeau de cele ce au declansat distrugerea.
+    """
+    new_score = 15 * len(matches)
+    for bubble in target_bubbles - matches:
+      new_score += 3 * self.state.color_score[bubble.color]
+    self.state.score += new_score
+    return new_score
+
+  def drop_bubbles(self):
+    """
+    Scaderea cu un rand a intregii tabele, pentru a ingreuna jocul.
+    """
+    self.state.first_row += 1
+    self.update_table()
+
+  def update_table(self):
+    """
+    Actualizarea tabelei curente, astfel incat matricea sa mute cu un rand in jos bulele.
+    Ancorele raman aceleasi bule, deci adancimile nu se schimba.
+    """
+    game_table = self.state.game_table
+    if self.state.bitboard is not None:
+      self.state.bitboard.drop_bubbles()
+    self.state.stats.drop()
+    bubbles = self.state.bubbles()
+    for bubble in bubbles:
+      game_table[bubble.row][bubble.col] = None
+
+    first_row = self.state.first_row
+    for bubble in bubbles:
+      bubble.row += 1
+      bubble.update_center(first_row)
+      game_table[bubble.row][bubble.col] = bubble
+
+  def check_game_status(self):
+    """
+    Verificarea statutului jocului: "win", "lose" sau None daca jocul continua.
+    Foloseste doar statisticile tablei, deci nu parcurge bulele.
+    """
+    state = self.state
+    if state.status:
+      return state.status
+    if state.stats.total == 0:
+      state.status = "win"
+    elif state.stats.lowest_row >= self.rows:
+      state.status = "lose"
+    return state.status
+
+def solve_trajectory(x, y, angle, first_row, rows):
+  """
+  Rezolvarea analitica a traiectoriei unui cerc care se deplaseaza in linie dreapta si ricoseaza din pereti.
+  Pentru fiecare segment se calculeaza momentul primului contact cu o bula (distanta dintre centre egala cu
+  BUBBLESIZE) sau cu tavanul, astfel ca rezultatul nu depinde de viteza sau de numarul de cadre.
+  Returneaza (traiectoria, bula lovita) sau None daca unghiul nu urca.
+  :param x: Coordonata X de start a centrului bulei.
+  :param y: Coordonata Y de start a centrului bulei.
+  :param angle: Unghiul de tragere, in radiani.
+  :param first_row: Numarul de randuri cu care a coborat tabla de joc.
+  :param rows: Matricea tablei: pe fiecare rand, bulele (cu centrul in x, y) sau None.
+  """
+  direction_x = math.cos(angle)
+  direction_y = math.sin(angle)
+  if direction_y >= 0:
+    return None
+
+  bubble_radius = BUBBLESIZE / 2
+  stop_y = ROW_HEIGHT * first_row + BUBBLESIZE
+  min_x, max_x = bubble_radius, len(rows[0]) * BUBBLESIZE - bubble_radius
+  contact = BUBBLESIZE * BUBBLESIZE
+  path = [(x, y)]
+  while True:
+    ceiling_time = max((stop_y - y) / direction_y, 0)
+    if direction_x > 0:
+      wall_time = max((max_x - x) / direction_x, 0)
+    elif direction_x < 0:
+      wall_time = max((min_x - x) / direction_x, 0)
+    else:
+      wall_time = float('inf')
+    end_time = min(ceiling_time, wall_time)
+
+    end_y = y + direction_y * end_time
+    first = max(int((end_y - BUBBLESIZE - bubble_radius) / ROW_HEIGHT), 0)
+    last = min(int((y + BUBBLESIZE - bubble_radius) / ROW_HEIGHT) + 1, len(rows) - 1)
+    hit_time = end_time
+    collision_bubble = None
+    for row in range(first, last + 1):
+      for bubble in rows[row]:
+        if bubble is None:
+          continue
+        offset_x = x - bubble.x
+        offset_y = y - bubble.y
+        projection = offset_x * direction_x + offset_y * direction_y
+        distance = offset_x * offset_x + offset_y * offset_y - contact
+        if distance <= 0:
+          time = 0
+        elif projection >= 0:
+          continue
+        else:
+          discriminant = projection * projection - distance
+          if discriminant < 0:
+            continue
+          time = -projection - math.sqrt(discriminant)
+        if time < hit_time or (collision_bubble is None and time == hit_time):
+          hit_time = time
+          collision_bubble = bubble
+
+    if collision_bubble is not None or ceiling_time <= wall_time:
+      path.append((x + direction_x * hit_time, y + direction_y * hit_time))
+      return path, collision_bubble
+    x, y = x + direction_x * wall_time, y + direction_y * wall_time
+    path.append((x, y))
+    direction_x *= (-1)
+
+def point_on_path(path, distance):
+  """
+  Returneaza punctul aflat la distanta data de la inceputul traiectoriei.
+  :param path: Lista cu punctele traiectoriei.
+  :param distance: Distanta parcursa pe traiectorie.
+  """
+  for (x1, y1), (x2, y2) in zip(path, path[1:]):
+    length = math.hypot(x2 - x1, y2 - y1)
+    if distance <= length:
+      ratio = distance / length if length else 0
+      return x1 + (x2 - x1) * ratio, y1 + (y2 - y1) * ratio
+    distance -= length
+  return path[-1]
+
+def path_length(path):
+  """
+  Returneaza lungimea totala a traiectoriei.
+  :param path: Lista cu punctele traiectoriei.
+  """
+  return sum(math.hypot(x2 - x1, y2 - y1) for (x1, y1), (x2, y2) in zip(path, path[1:]))
+
+def landing_cell(game_table, first_row, bubble_center_x, bubble_center_y, collision_bubble):
+  """
+  Calcularea randului si coloanei in care se aseaza bula trasa: celula libera vecina cu bula lovita,
+  cea mai apropiata de punctul de contact, sau celula de pe primul rand daca bula a atins tavanul.
+  :param game_table: Matricea cu bulele din joc.
+  :param first_row: Numarul de randuri cu care a coborat tabla de joc.
+  :param bubble_center_x: Coordonata X a centrului bulei trase in momentul coliziunii.
+  :param bubble_center_y: Coordonata Y a centrului bulei trase in momentul coliziunii.
+  :param collision_bubble: Bula lovita sau None daca bula trasa a atins tavanul.
+  """
+  max_row, cols = len(game_table) - 2, len(game_table[0])
+  if collision_bubble:
+    row, col = collision_bubble.row, collision_bubble.col
+    final_row, final_col = row, col
+    if (row + first_row) % 2 == 1:
+      directions = [(0, 1), (1, 0), (0, -1), (-1, 1), (-1, 0), (1, 1)]
+    else:
+      directions = [(0, 1), (1, 0), (0, -1), (-1, -1), (-1, 0), (1, -1)]
+    min_distance = float('inf')
+    for direction in directions:
+      new_row, new_col = row + direction[0], col + direction[1]
+      if not((first_row + new_row) % 2 == 1 and new_col == cols - 1):
+        if 0 <= new_row <= max_row and 0 <= new_col < cols and game_table[new_row][new_col] is None:
+          new_center_x, new_center_y = bubble_position(new_row, new_col, first_row)
+          distance = math.sqrt((bubble_center_x - new_center_x)**2 + (bubble_center_y - new_center_y)**2)
+          if distance < min_distance:
+            min_distance = distance
+            final_row, final_col = new_row, new_col
+  else:
+    final_row = first_row
+    final_col = int(bubble_center_x / BUBBLESIZE)
+  return final_row, final_col
+
+def bubble_position(row, col, offset):
+  """
+  Calculeaza coordonatele X si Y ale centrului unei celule din tabela hexagonala.
+  :param row: Randul celulei.
+  :param col: Coloana celulei.
+  :param offset: Numarul de randuri cu care a coborat tabla de joc.
+  """
+  bubble_radius = BUBBLESIZE / 2
+  x = BUBBLESIZE * col + bubble_radius
+  if (row + offset) % 2 == 1:
+    x += bubble_radius
+  y = BUBBLESIZE * row * 0.85 + bubble_radius
+  return x, y
+
+def initial_matrix(rows=MAXHEIGHT, cols=MAXWIDTH):
+  """
+  Initializarea matricii ce reprezinta tabela cu valori None. Sub randul pierzator mai e un rand,
+  in care poate ajunge bula trasa.
+  :param rows: Randul pe care, daca ajunge o bula, jocul e pierdut.
+  :param cols: Numarul de coloane al tablei.
+  """
+  return [[None for _ in range(cols)] for _ in range(rows + 2)]
+
+def neighbor_tables(rows, cols):
+  """
+  Precalcularea vecinilor fiecarei celule, pentru cele doua paritati ale randului: pe randurile cu
+  (row + first_row) par vecinii diagonali sunt la stanga, iar pe cele impare la dreapta.
+  Returneaza tables[paritate][row][col], o lista de celule (row, col).
+  :param rows: Numarul de randuri al matricii.
+  :param cols: Numarul de coloane al matricii.
+  """
+  tables = []
+  for parity in (0, 1):
+    diagonal = -1 if parity == 0 else 1
+    table = []
+    for row in range(rows):
+      cells = []
+      for col in range(cols):
+        candidates = [(row, col - 1), (row, col + 1), (row - 1, col), (row + 1, col), (row - 1, col + diagonal), (row + 1, col + diagonal)]
+        cells.append([(other_row, other_col) for other_row, other_col in candidates if 0 <= other_row < rows and 0 <= other_col < cols])
+      table.append(cells)
+    tables.append(table)
+  return tables
+
+def shooter_cell(rows, cols):
+  """
+  Returneaza celula (row, col) din care pleaca bula trasa: sub randul pierzator, la mijlocul tablei.
+  :param rows: Randul pe care, daca ajunge o bula, jocul e pierdut.
+  :param cols: Numarul de coloane al tablei.
+  """
+  return rows + 1, cols // 2 - 1
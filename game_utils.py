@@ -1,90 +1,91 @@
+import time
 import tkinter as tk
 from tkinter import ttk
-import random
-import math
-from collections import Counter
-
-WIDTH = 456
-HEIGHT = 550
-MAXHEIGHT = 14
-MAXWIDTH = 12
-BUBBLESIZE = 38
-
-class Bubble:
-  """
-  Clasa pentru bulele din joc.
-  """
-  def __init__(self, row, col, color):
-    """
-    Initializarea unui obiect de tip Bubble.
-    :param row: Randul pe care se afla bula in tabela hexagonala.
-    :param col: Coloana pe care se afla bula in tabela hexagonala.
-    :param color: Culoarea bulei.
-    """
-    self.row = row
-    self.col = col
-    self.color = color
-
-  def draw(self, game_canvas, offset):
-    """
-    Deseneaza bula respectiva in canvas.
-    :param game_canvas: Canvas-ul pe care desenam bulele.
-    :param offset: Numarul de randuri cu care a coborat tabla de joc.
-    """
-    self.x, self.y = self.bubble_position(self.row, self.col, offset)
-    bubble_radius = BUBBLESIZE // 2
-    self.bubble_id = game_canvas.create_oval(self.x - bubble_radius, self.y - bubble_radius, self.x + bubble_radius, self.y + bubble_radius, fill = self.color, tag="bubble")
-
-  def get_bubble_id(self):
-    """
-    Returneaza id-ul bulei.
-    """
-    return self.bubble_id
-  
-  def destroy(self, game_canvas):
-    """
-    Distruge bula respectiva.
-    :param game_canvas: Canvas-ul in care a fost desenata bula pe care o eliminam.
-    """
-    game_canvas.delete(self.get_bubble_id())
-
-  def bubble_position(self, row, col, offset):
-    """
-    Calculeaza coordonatele X si Y ale bulei in canvas.
-    :param row: Randul pe care se afla bula in tabela hexagonala.
-    :param col: Coloana pe care se afla bula in tabela hexagonala.
-    :param offset: Numarul de randuri cu care a coborat tabla de joc.
-    """
-    bubble_radius = BUBBLESIZE / 2
-    x = BUBBLESIZE * col + bubble_radius
-    if (row + offset) % 2 == 1:
-      x += bubble_radius
-    y = BUBBLESIZE * row * 0.85 + bubble_radius
-    return x, y
+from engine import *
+from scheduler import FrameScheduler
+from renderer import BoardRenderer
+from aim_guide import AimGuide
+from effects import Effects
+from autoplayer import AutoPlayer
+from replay import ReplayWriter, UNDO
+from history import History, UNDO_MEMORY
+from instrumentation import Profiler, ENGINE_METHODS
+from shot_worker import ShotWorker
+
+THINK_SLICE = 0.004
+SCROLL_ROWS = 3
 
 class Game:
   """
   Clasa pentru jocul BubbleBuster
   """
-  def __init__(self, window):
+  def __init__(self, window, seed=None, record=None, level=None, profile=False, rows=MAXHEIGHT, cols=MAXWIDTH, scores=None, undo_memory=UNDO_MEMORY):
     """
     Initializarea unui obiect de tip Game.
     :param window: Fereastra in care va avea loc jocul.
+    :param seed: Seed-ul primului joc (None pentru unul random).
+    :param record: Fisierul in care se inregistreaza fiecare joc nou (None pentru fara inregistrare).
+    :param level: Nivelul cu care incepe fiecare joc (None pentru o tabla random).
+    :param profile: Daca instrumentarea e pornita de la inceput, nu doar cat timp overlay-ul e afisat.
+    :param rows: Randul pe care, daca ajunge o bula, jocul e pierdut.
+    :param cols: Numarul de coloane al tablei.
+    :param scores: Clasamentul in care se salveaza jocurile (obiect de tip ScoreStore sau None).
+    :param undo_memory: Memoria maxima a istoricului pentru anulare, in octeti.
     """
     self.window = window
-    self.game_table = initial_matrix()
-    self.all_colors = set()
-    self.color_score = dict()
+    self.scores = scores
+    self.scores_version = None
+    self.leaderboard_text = None
+    self.started_at = None
+    self.game_recorded = False
+    self.used_autoplay = False
+    self.engine = Engine(seed, rows=rows, cols=cols)
+    self.worker = ShotWorker()
+    self.history = History(self.engine, undo_memory)
+    self.scrubber = None
+    self.shot = None
+    self.shot_job = None
+    self.shot_angle = None
+    self.seed = seed
+    self.record = record
+    self.level = level
+    self.recorder = None
+    self.versus = None
+    self.replay_events = None
+    self.replay_index = 0
+    self.replay_pending = False
+    self.replay_tick = 0
+    self.speed = 1
+    self.scheduler = FrameScheduler(window)
+    self.scheduler.on_frame_end(self.render)
+    self.profiler = Profiler()
+    self.scheduler.on_frame_end(self.profiler.end_frame)
+    self.profile = profile
+    self.overlay_id = None
+    self.overlay_timer = None
+    if profile:
+      self.profiler.enable(self)
+    self.renderer = None
+    self.aim_guide = None
+    self.effects = None
+    self.autoplayer = AutoPlayer(self.engine)
+    self.autoplay = False
+    self.thinking = False
     self.shooting = False
-    self.last_shake = False
+    self.shooting_event = None
     self.is_shaking = False
-    self.drop_counter = 0
-    self.score = 0
-    self.first_row = 0
-    self.loop_id = None
+    self.shake_id = None
+    self.shake_offset = 0
     self.game_over = False
     self.menu_components()
 
+  @property
+  def state(self):
+    """
+    Starea curenta a tablei de joc, tinuta de motor.
+    """
+    return self.engine.state
+
   def menu_components(self):
     """
     Creara paginii de meniu.
@@ -100,54 +101,94 @@ class Game:
     style = ttk.Style()
     style.theme_use('alt')
     style.configure('TButton', font=('Arial', 16, 'bold'), width=20, padding=5, foreground='#7700a6', background='#defe47')
-    
+
     play_button = ttk.Button(menu_frame, text='Play', style='TButton', command=lambda: self.play_game())
     play_button.pack(pady=20)
 
     exit_button = ttk.Button(menu_frame, text='Exit', style='TButton', command=self.window.destroy)
     exit_button.pack(pady=10)
 
+    if self.scores is not None:
+      self.leaderboard_text = tk.StringVar()
+      self.scores_version = None
+      leaderboard_label = tk.Label(self.window, textvariable=self.leaderboard_text, font=('Courier', 12, 'bold'), bg='#7700a6', fg='#defe47', justify=tk.LEFT)
+      leaderboard_label.pack(pady=10)
+      self.update_leaderboard()
+
+  def update_leaderboard(self):
+    """
+    Afisarea clasamentului din instantaneul deja citit de firul bazei de date; textul se schimba doar cand
+    instantaneul e nou. Cat timp meniul e afisat, verificarea se repeta de 4 ori pe secunda.
+    """
+    if self.renderer is not None or self.leaderboard_text is None:
+      return
+    if self.scores.version != self.scores_version:
+      self.scores_version = self.scores.version
+      snapshot = self.scores.snapshot
+      lines = ["Top scores"]
+      for place, game in enumerate(snapshot["top"], 1):
+        lines.append(f"{place:>2}. {game['score']:>6}  {game['shots']:>3} shots  {game['status']}{' (auto)' if game['autoplay'] else ''}")
+      if not snapshot["top"]:
+        lines.append("  no games yet")
+      session = snapshot["session"]
+      lines.append(f"This session: {session['games']} games, best {session['best']}, {session['clusters']} clusters")
+      self.leaderboard_text.set("\n".join(lines))
+    self.scheduler.call_later(250, self.update_leaderboard)
+
   def play_game(self):
     """
     Crearea unui nou joc, apasand pe butonul 'Play' din meniu.
     """
+    if self.level is not None and (self.level.rows, self.level.cols) != (self.engine.rows, self.engine.cols):
+      self.engine.resize(self.level.rows, self.level.cols)
     self.game_gui()
     self.create_random_table()
+    self.history.reset()
+    self.autoplayer.reset()
+    self.update_scrubber()
+    self.started_at = time.perf_counter()
+    self.game_recorded = False
+    self.used_autoplay = False
+    if self.record:
+      self.recorder = ReplayWriter(self.record, self.engine, self.scheduler.tick, self.level)
     self.game_loop()
+    self.render()
 
   def create_random_table(self):
     """
-    Crearea unei table hexagonale de joc random.
+    Crearea unei table hexagonale de joc random sau incarcarea nivelului ales.
     """
-    self.all_colors = {"#08deea", "#c4ffff", "#fd8090", "#1261d1"}
-    self.game_table = initial_matrix()
-
-    for row in range(7):
-      for col in range(MAXWIDTH):
-        if row % 2 == 1 and col == MAXWIDTH - 1:
-          continue
-        else:
-          color = random.choice(list(self.all_colors))
-          self.game_table[row][col] = Bubble(row, col, color)
-
-    self.generate_color_score()
+    if self.level is not None:
+      self.engine.load_level(self.level)
+    else:
+      self.engine.create_random_table(seed=self.seed)
+    self.seed = None
+    self.draw_current_bubble()
+    self.renderer.view_bottom()
     self.draw_table()
-    self.current_color = random.choice(list(self.all_colors))
-    self.current_bubble = Bubble(15, 5, self.current_color)
-    self.current_bubble.draw(self.game_canvas, self.first_row)
-    self.next_bubble_color = random.choice(list(self.all_colors))
-    self.next_bubble_canvas.create_oval(0, 0, 20, 20, fill = self.next_bubble_color)
 
   def draw_table(self):
     """
     Desenarea tablei de joc.
     """
-    for row in range(MAXHEIGHT):
-      for col in range(MAXWIDTH):
-        bubble = self.game_table[row][col]
-        if bubble:
-          bubble.draw(self.game_canvas, self.first_row)
-  
+    self.renderer.draw_table(self.state)
+
+  def draw_current_bubble(self):
+    """
+    Desenarea bulei ce urmeaza sa fie trasa si a celei de dupa ea.
+    """
+    row, col = shooter_cell(self.engine.rows, self.engine.cols)
+    self.current_bubble = Bubble(row, col, self.state.current_color, self.state.first_row)
+    self.renderer.draw_shooter(self.current_bubble)
+    self.renderer.set_next_color(self.state.next_bubble_color)
+
+  def render(self):
+    """
+    Trimiterea catre canvas a modificarilor de desen adunate in cadrul curent.
+    """
+    if self.renderer is not None:
+      self.renderer.flush()
+
   def game_gui(self):
     """
     Crearea interfetei de joc.
@@ -167,35 +208,37 @@ class Game:
     menu_button = tk.Button(top_frame, text='Go back', fg='#7700a6', bg='#defe47', command=lambda: self.go_to_menu())
     menu_button.place(relx=0.97, rely=0.25, anchor=tk.NE)
 
-    self.game_canvas = tk.Canvas(self.window, width=456, height=550, bg='#092067', highlightbackground='#fe00fe', highlightthickness=1)
+    width = self.engine.cols * BUBBLESIZE
+    world_height = HEIGHT + (self.engine.rows - MAXHEIGHT) * ROW_HEIGHT
+    view_height = min(HEIGHT, world_height)
+    self.game_canvas = tk.Canvas(self.window, width=width, height=view_height, bg='#092067', highlightbackground='#fe00fe', highlightthickness=1,
+                                 scrollregion=(0, 0, width, world_height), yscrollincrement=1)
     self.game_canvas.pack(pady=10)
-    line_y = (MAXHEIGHT - 2) * BUBBLESIZE + BUBBLESIZE // 2
-    self.game_canvas.create_line(70, line_y, 386, line_y, width = 3, fill = '#7700a6')
+    line_y = world_height - HEIGHT + (MAXHEIGHT - 2) * BUBBLESIZE + BUBBLESIZE // 2
+    self.game_canvas.create_line(70, line_y, width - 70, line_y, width = 3, fill = '#7700a6')
     self.game_canvas.bind("<Button-1>", self.start_shooting)
+    self.game_canvas.bind("<Motion>", self.aim)
+    self.game_canvas.bind("<MouseWheel>", self.scroll_view)
+    self.game_canvas.bind("<Button-4>", self.scroll_view)
+    self.game_canvas.bind("<Button-5>", self.scroll_view)
+    self.window.bind("<KeyPress-a>", self.toggle_autoplay)
+    self.window.bind("<F3>", self.toggle_overlay)
+    self.profiler.watch_canvas(self.game_canvas)
+    self.renderer = BoardRenderer(self.game_canvas, self.next_bubble_canvas, width, world_height, view_height)
+    self.aim_guide = AimGuide(self.engine, self.renderer)
+    self.effects = Effects(self.scheduler, self.renderer)
 
     self.score_text = tk.StringVar()
-    self.score_text.set(f"Score: {self.score}")
+    self.score_text.set(f"Score: {self.state.score}")
     score_label = tk.Label(self.window, textvariable=self.score_text, font=('Arial', 16, 'bold'), bg='#7700a6', fg='#defe47')
     score_label.pack()
 
-  def generate_color_score(self):
-    """
-    Generarea scorului bulelor, in functie de numarul de culori.
-    """
-    colors_count = Counter(bubble.color for row in self.game_table for bubble in row if bubble)
-    sorted_colors = sorted(colors_count.keys(), key=lambda x: colors_count[x])
+    self.scrubber = tk.Scale(self.window, from_=0, to=0, orient=tk.HORIZONTAL, showvalue=False, length=width, command=self.scrub,
+                             bg='#7700a6', troughcolor='#092067', highlightthickness=0, sliderlength=16)
+    self.scrubber.pack(pady=5)
+    self.window.bind("<KeyPress-u>", self.undo)
+    self.window.bind("<Control-z>", self.undo)
 
-    if len(sorted_colors) > 4:
-      self.color_score[sorted_colors[0]] = 45
-      sorted_colors.pop(0)
-      self.color_score[sorted_colors[0]] = 30
-      sorted_colors.pop(0)
-    elif len(sorted_colors) > 2:
-      self.color_score[sorted_colors[0]] = 30
-      sorted_colors.pop(0)
-    for index, color in enumerate(sorted_colors, start=2):
-      self.color_score[color] = 15
-    
   def go_to_menu(self):
     """
     Trimiterea jucatorului catre meniul principal si resetarea jocului.
@@ -205,16 +248,36 @@ class Game:
 
   def reset_game(self):
     """
-    Resetarea statutului din joc si a tuturor variabilelor.
-    """
-    self.window.after_cancel(self.loop_id)
+    Resetarea statutului din joc si a tuturor variabilelor. Un joc inceput si neterminat e salvat ca abandonat.
+    """
+    if self.renderer is not None and not self.game_over and self.state.shots:
+      self.record_score("quit")
+    self.scheduler.clear()
+    self.overlay_id = None
+    self.overlay_timer = None
+    if self.recorder is not None:
+      self.recorder.close()
+      self.recorder = None
+    if self.versus is not None:
+      self.versus.end("lose")
+      self.versus = None
+    self.replay_events = None
+    self.replay_pending = False
+    self.speed = 1
+    self.renderer = None
+    self.aim_guide = None
+    self.effects = None
+    self.scrubber = None
+    self.autoplay = False
+    self.thinking = False
     self.shooting = False
-    self.score = 0
-    self.game_table.clear()
-    self.first_row = 0
-    self.drop_counter = 0
+    self.shooting_event = None
+    self.shot = None
+    self.shot_job = None
+    self.engine.state = BoardState(self.engine.rows, self.engine.cols)
     self.is_shaking = False
-    self.last_shake = False
+    self.shake_id = None
+    self.shake_offset = 0
     self.game_over = False
 
     widgets = ['game_canvas', 'next_bubble_canvas', 'message_label']
@@ -226,38 +289,226 @@ class Game:
   def start_shooting(self, event):
     """
     Functie apelata atunci cand se apasa click pentru a trage o bula.
+    Daca o bula e deja in zbor, click-ul e pastrat si tras dupa ce aceasta se aseaza.
     :param event: Event-ul pentru click/Locul unde s-a apasat click.
     """
-    self.shooting = True
-    self.shooting_event = event
+    self.shooting_event = self.board_point(event)
+    if not self.shooting:
+      self.game_loop()
+
+  def aim(self, event):
+    """
+    Functie apelata la miscarea mouse-ului: actualizarea ghidului de ochire.
+    :param event: Event-ul de miscare a mouse-ului.
+    """
+    if self.game_over or self.aim_guide is None:
+      return
+    self.aim_guide.update(*self.board_point(event))
+    self.render()
+
+  def board_point(self, event):
+    """
+    Returneaza punctul din tabla corespunzator unui event, tinand cont de derularea canvas-ului.
+    :param event: Event-ul de mouse.
+    """
+    return self.game_canvas.canvasx(event.x), self.game_canvas.canvasy(event.y)
+
+  def scroll_view(self, event):
+    """
+    Derularea tablei cu rotita mouse-ului, cat timp nicio bula nu e in zbor.
+    :param event: Event-ul rotitei (delta pe Windows/macOS, butoanele 4 si 5 pe X11).
+    """
+    if self.renderer is None or self.shooting:
+      return
+    direction = -1 if event.num == 4 or getattr(event, "delta", 0) > 0 else 1
+    self.renderer.set_view(self.renderer.view_top + direction * SCROLL_ROWS * ROW_HEIGHT)
+    self.render()
 
   def game_loop(self):
     """
-    Functie ce reprezinta o bucla a jocului.
+    Avansarea jocului intre lovituri. Nu ruleaza periodic: e apelata la pornirea jocului,
+    la un click si dupa ce o bula s-a asezat.
     """
     if self.game_over:
       return
-    
-    if self.drop_counter == 3 and not self.is_shaking:
+
+    self.check_game_status()
+    if self.game_over:
+      return
+    drop_counter = self.state.drop_counter
+    if drop_counter == self.engine.drop_shots - 2 and not self.is_shaking:
       self.is_shaking = True
       self.shake_canvas_right(1)
-    elif self.drop_counter == 4 and not self.is_shaking:
+    elif drop_counter == self.engine.drop_shots - 1 and not self.is_shaking:
       self.is_shaking = True
       self.shake_canvas_right(2)
-    elif self.drop_counter == 5 and not self.is_shaking:
-      self.drop_counter = 0
-      self.drop_bubbles()
-      
-    self.check_game_status()
-    if self.shooting:
-      self.shooting = False
-      self.shoot_bubble()
+
+    if self.replay_events is not None:
+      self.shooting_event = None
+      if not self.shooting and not self.replay_pending and self.replay_index < len(self.replay_events):
+        self.replay_pending = True
+        ticks = self.replay_events[self.replay_index][0] / self.speed
+        delay = max(0, self.replay_tick + ticks - self.scheduler.tick) * self.scheduler.timestep
+        self.scheduler.call_later(delay, self.replay_shot)
+    elif self.autoplay:
+      self.shooting_event = None
+      if not self.shooting and not self.thinking:
+        self.thinking = True
+        self.autoplayer.start()
+        self.scheduler.add(self.think)
+    elif self.shooting_event is not None and not self.shooting:
+      point = self.shooting_event
+      self.shooting_event = None
+      self.shoot_bubble(point)
+
+  def play_replay(self, replay, speed=1):
+    """
+    Pornirea unui joc inregistrat, redesenat in ritmul inregistrarii inmultit cu speed.
+    :param replay: Jocul inregistrat (obiect de tip Replay).
+    :param speed: De cate ori mai repede decat in inregistrare ruleaza jocul.
+    """
+    self.seed = replay.seed
+    self.level = replay.level
+    if (replay.rows, replay.cols) != (self.engine.rows, self.engine.cols):
+      self.engine.resize(replay.rows, replay.cols)
+    self.engine.drop_shots = replay.drop_shots
+    self.engine.score_table = replay.score_table
+    self.play_game()
+    self.replay_events = replay.events
+    self.replay_index = 0
+    self.replay_tick = self.scheduler.tick
+    self.speed = speed
+    self.game_loop()
+
+  def replay_shot(self):
+    """
+    Tragerea urmatoarei lovituri (sau aplicarea urmatoarei anulari) din jocul inregistrat.
+    """
+    self.replay_pending = False
+    if self.replay_events is None or self.game_over:
+      return
+    _, kind, value = self.replay_events[self.replay_index]
+    self.replay_index += 1
+    self.replay_tick = self.scheduler.tick
+    if kind == UNDO:
+      self.rewind(self.history.position - value)
+    else:
+      self.shoot_angle(value)
+    if not self.shooting:
+      self.game_loop()
+
+  def toggle_overlay(self, event=None):
+    """
+    Afisarea sau ascunderea overlay-ului de depanare (tasta F3). Instrumentarea ruleaza doar cat timp
+    overlay-ul e afisat, daca jocul nu a fost pornit cu profilare.
+    :param event: Event-ul tastei apasate.
+    """
+    if self.renderer is None:
+      return
+    if self.overlay_id is None:
+      self.profiler.enable(self)
+      self.overlay_id = self.game_canvas.create_text(6, 6, anchor=tk.NW, fill='#defe47', font=('Courier', 9), tags=("debug",))
+      self.update_overlay()
     else:
-      for id in self.game_canvas.find_withtag("bubble"):
-        bubble_id = int(id)
-        if bubble_id != self.current_bubble.get_bubble_id() and not any(bubble.get_bubble_id() == bubble_id for row in self.game_table for bubble in row if bubble):
-          self.game_canvas.delete(id)
-      self.loop_id = self.window.after(10, self.game_loop)
+      self.scheduler.cancel(self.overlay_timer)
+      self.game_canvas.delete(self.overlay_id)
+      self.overlay_id = None
+      self.overlay_timer = None
+      if not self.profile:
+        self.profiler.disable()
+
+  def update_overlay(self):
+    """
+    Actualizarea textului din overlay-ul de depanare, de 4 ori pe secunda.
+    """
+    if self.overlay_id is None:
+      return
+    self.renderer.update_item(self.overlay_id, text=self.profiler.overlay_text())
+    self.overlay_timer = self.scheduler.call_later(250, self.update_overlay)
+
+  def toggle_autoplay(self, event=None):
+    """
+    Pornirea sau oprirea jucatorului automat (tasta 'a').
+    :param event: Event-ul tastei apasate.
+    """
+    if self.renderer is None or self.game_over or self.replay_events is not None:
+      return
+    self.autoplay = not self.autoplay
+    if self.autoplay:
+      self.used_autoplay = True
+      self.game_loop()
+
+  def can_rewind(self):
+    """
+    Verifica daca jucatorul poate anula sau derula: doar intre lovituri, fara jucatorul automat,
+    in afara meciurilor versus si a reluarilor.
+    """
+    return (self.renderer is not None and not self.game_over and not self.shooting and not self.autoplay
+            and self.versus is None and self.replay_events is None)
+
+  def undo(self, event=None):
+    """
+    Anularea ultimei lovituri (tasta 'u' sau Ctrl+Z).
+    :param event: Event-ul tastei apasate.
+    """
+    if self.can_rewind() and self.history.can_undo():
+      self.rewind(self.history.position - 1)
+
+  def scrub(self, value):
+    """
+    Derularea jocului la starea aleasa pe bara de derulare. Starile de dupa ea sunt pastrate
+    pana la urmatoarea lovitura, deci bara poate fi mutata si inainte.
+    :param value: Indexul starii, ca text.
+    """
+    position = int(float(value))
+    if position == self.history.position:
+      return
+    if not self.can_rewind():
+      self.update_scrubber()
+      return
+    self.rewind(position)
+
+  def rewind(self, position):
+    """
+    Refacerea starii cu indexul dat din istoric si redesenarea tablei.
+    :param position: Indexul starii.
+    """
+    self.stop_shaking()
+    self.history.seek(position)
+    self.renderer.remove_bubble(self.current_bubble)
+    self.renderer.redraw(self.state)
+    self.draw_current_bubble()
+    self.score_text.set(f"Score: {self.state.score}")
+    self.renderer.view_bottom()
+    self.aim_guide.refresh()
+    self.update_scrubber()
+    self.render()
+    self.game_loop()
+
+  def update_scrubber(self):
+    """
+    Potrivirea barei de derulare cu istoricul: capetele sunt cea mai veche si cea mai noua stare, cursorul e starea curenta.
+    """
+    if self.scrubber is not None:
+      self.scrubber.configure(from_=self.history.first, to=max(self.history.last, self.history.first))
+      self.scrubber.set(self.history.position)
+
+  def think(self, tick):
+    """
+    Rularea cautarii jucatorului automat cate putin in fiecare cadru, astfel ca animatiile nu pierd cadre.
+    Cand cautarea se termina, bula e trasa la unghiul ales.
+    Returneaza True cat timp cautarea continua.
+    :param tick: Pasul curent al planificatorului.
+    """
+    if not self.autoplay or self.game_over:
+      self.thinking = False
+      return False
+    if self.autoplayer.step(THINK_SLICE):
+      return True
+    self.thinking = False
+    if self.autoplayer.best_angle is not None:
+      self.shoot_angle(self.autoplayer.best_angle)
+    return False
 
   def check_game_status(self):
     """
@@ -265,16 +516,27 @@ class Game:
     """
     if self.game_over:
       return
-    counter = sum(1 for row in self.game_table for bubble in row if bubble)
-    if counter == 0:
-      self.show_message("win")
+    status = self.engine.check_game_status()
+    if status:
+      self.show_message(status)
       self.game_over = True
-    else:
-      for col in range(MAXWIDTH):
-        if self.game_table[14][col]:
-          self.show_message("lose")
-          self.game_over = True
-          break
+      if self.recorder is not None:
+        self.recorder.close(self.state)
+        self.recorder = None
+      if self.versus is not None:
+        self.versus.end(status)
+      self.record_score(status)
+
+  def record_score(self, status):
+    """
+    Trimiterea jocului curent catre clasament. Scrierea are loc pe firul bazei de date.
+    :param status: Rezultatul jocului ("win", "lose" sau "quit").
+    """
+    if self.scores is None or self.game_recorded or self.replay_events is not None or self.started_at is None:
+      return
+    self.game_recorded = True
+    state = self.state
+    self.scores.record(status, state.score, state.shots, state.clusters, time.perf_counter() - self.started_at, state.seed, self.used_autoplay)
 
   def show_message(self, text):
     """
@@ -282,6 +544,7 @@ class Game:
     :parama text: Mesajul corespunzator statusului jocului.
     """
     self.stop_shaking()
+    self.aim_guide.hide()
     self.message_label = tk.Label(self.window, text=text, font=('Arial', 30, 'bold'), bg='#7700a6', fg='#defe47', width=100, height = 2)
     self.message_label.place(relx = 0.5, rely = 0.5, anchor=tk.CENTER)
 
@@ -289,265 +552,149 @@ class Game:
     """
     Oprirea starii de shake care anunta caderea cu un nivel a bulelor.
     """
-    self.last_shake = True
     self.is_shaking = False
+    self.scheduler.cancel(self.shake_id)
+    self.shake_id = None
+    if self.shake_offset:
+      self.renderer.move_tag("board", -self.shake_offset, 0)
+      self.shake_offset = 0
 
   def shake_canvas_right(self, offset):
     """
     Mutarea in dreapta a bulelor(pentru efectul de shake).
     :param offset: Valoarea cu care sa se mute bulele la dreapta.
     """
-    self.game_canvas.move("bubble", offset, 0)   
-    self.shake_id = self.game_canvas.after(50, lambda: self.shake_canvas_left(offset))
-  
+    self.renderer.move_tag("board", offset, 0)
+    self.shake_offset = offset
+    self.shake_id = self.scheduler.call_later(50, self.shake_canvas_left, offset)
+
   def shake_canvas_left(self, offset):
     """
     Mutarea in stanga a bulelor(pentru efectul de shake).
     :param offset: Valoarea cu care sa se mute bulele la stanga.
     """
-    self.game_canvas.move("bubble", offset * (-1), 0)
-    if self.last_shake:
-      self.last_shake = False
-    else:
-      self.shake_id1 = self.game_canvas.after(50, lambda: self.shake_canvas_right(offset))
-      
+    self.renderer.move_tag("board", offset * (-1), 0)
+    self.shake_offset = 0
+    self.shake_id = self.scheduler.call_later(50, self.shake_canvas_right, offset)
+
   def drop_bubbles(self):
     """
-    Scaderea cu un rand a intregii tabele, pentru a ingreuna jocul.
+    Desenarea coborarii cu un rand a intregii tabele, dupa ce motorul a mutat bulele.
     """
-    self.first_row += 1
-    self.update_table()
-    if self.first_row > 0:
-      self.game_canvas.create_rectangle(0, 0, WIDTH, self.first_row * BUBBLESIZE * 0.85, fill = 'gray')
-    self.window.update()
+    self.renderer.drop_table(self.state.first_row)
 
-  def update_table(self):
+  def shoot_bubble(self, point):
     """
-    Actualizarea tabelei curente, astfel incat matricea sa mute cu un rand in jos bulele.
+    Functie de declansare a tragerii bulei curente.
+    Lovitura e rezolvata in intregime, pe firul de lucru, inainte ca bula sa porneasca.
+    :param point: Punctul din tabla (x, y) unde s-a apasat click.
     """
-    bubbles = [bubble for row in self.game_table for bubble in row if bubble]
-    for bubble in bubbles:
-      self.game_table[bubble.row][bubble.col] = None
+    self.shoot_angle(self.aim_guide.quantize(self.engine.aim_angle(*point)))
 
-    for bubble in bubbles:
-      bubble.row += 1
-      self.game_table[bubble.row][bubble.col] = bubble
-      self.game_canvas.move(bubble.get_bubble_id(), 0, BUBBLESIZE * 0.85)
-
-  def shoot_bubble(self):
+  def shoot_angle(self, angle):
     """
-    Functie de declansare a tragerii bulei curente.
+    Tragerea bulei curente la un unghi dat si pornirea animatiei. Lovitura e trimisa firului de lucru;
+    pana la primirea rezultatului, bula asteapta pe loc, iar celelalte animatii ruleaza in continuare.
+    :param angle: Unghiul de tragere, in radiani.
     """
-    bubble_center_x, bubble_center_y = self.calculate_center(self.current_bubble)
-    angle = math.atan2(self.shooting_event.y - bubble_center_y, self.shooting_event.x - bubble_center_x)
-    bubble_direction_x = 8.5 * math.cos(angle)
-    bubble_direction_y = 8.5 * math.sin(angle)
-
-    self.game_canvas.after(10, self.move_bubble, bubble_direction_x, bubble_direction_y)
-
-  def move_bubble(self, bubble_direction_x, bubble_direction_y):
-    """
-    Mutarea bulei si verificarea daca aceasta s-a intersecat cu alte bule.
-    :param bubble_direction_x: Directia bulei pe axa X.
-    :param bubble_direction_y:  Directia bulei pe axa Y.
-    """
-    self.game_canvas.move(self.current_bubble.get_bubble_id(), bubble_direction_x, bubble_direction_y)
-    bubble_center_x, bubble_center_y = self.calculate_center(self.current_bubble)
-    self.collision_bubble = None
-    for row in self.game_table:
-      for bubble in row:
-        if bubble is None:  continue
-        
-        other_center_x, other_center_y = self.calculate_center(bubble)
-        if math.sqrt((other_center_x - bubble_center_x)**2  + (other_center_y - bubble_center_y)**2) < BUBBLESIZE:
-          self.collision_bubble = bubble
-    
-    x1, y1, x2, y2 = self.game_canvas.coords(self.current_bubble.get_bubble_id())
-    if self.collision_bubble is None and y1 <= BUBBLESIZE * self.first_row * 0.85 + BUBBLESIZE / 2:
-      self.handle_collision()
-    elif self.collision_bubble is None:
-      if x1 <= 0 or x2 >= WIDTH:
-        bubble_direction_x *= (-1)
-      self.window.after(10, self.move_bubble, bubble_direction_x, bubble_direction_y)
-    else:
-      self.handle_collision()
-  
+    self.shot = None
+    self.aim_guide.pause()
+    self.shot_job = self.worker.submit(self.engine, angle, ENGINE_METHODS if self.profiler.enabled else ())
+    self.shot_angle = angle
+    self.shooting = True
+    self.shot_tick = self.scheduler.tick
+    self.scheduler.add(self.move_bubble)
+
+  def receive_shot(self, tick):
+    """
+    Preluarea loviturii rezolvate de firul de lucru, daca e gata: motorul trece la starea copiei, iar desenul
+    e legat de bulele ei. Returneaza True daca bula poate porni.
+    :param tick: Pasul curent al planificatorului.
+    """
+    result = self.worker.poll(self.shot_job)
+    if result is None:
+      return False
+    self.shot_job = None
+    engine, shot, cells, seconds, timings = result
+    if self.profiler.enabled:
+      self.profiler.histogram("resolve_shot").record(seconds * 1e6)
+      self.profiler.record_timings(timings)
+    if shot is None:
+      self.shooting = False
+      self.aim_guide.resume()
+      self.game_loop()
+      return False
+    # Un rezultat primit de la adversar (versus) cat timp lovitura se rezolva nu se pierde.
+    status = self.state.status
+    self.engine.adopt(engine)
+    if status and self.state.status is None:
+      self.state.status = status
+    self.renderer.rebind(self.state, cells)
+    self.shot = shot
+    undone = self.history.record()
+    self.update_scrubber()
+    if self.recorder is not None:
+      if undone:
+        self.recorder.undo(self.shot_tick, undone)
+      self.recorder.shot(self.shot_tick, self.shot_angle)
+    if self.versus is not None:
+      self.versus.shot(shot)
+    self.renderer.begin_shot(shot)
+    self.shot_length = path_length(shot.path)
+    self.shot_tick = max(self.shot_tick, tick - 1)
+    return True
+
+  def move_bubble(self, tick):
+    """
+    Mutarea bulei de-a lungul traiectoriei calculate de motor. Pozitia depinde doar de pasul curent,
+    astfel ca un cadru intarziat nu incetineste bula.
+    Returneaza True cat timp bula e in zbor.
+    :param tick: Pasul curent al planificatorului.
+    """
+    if self.shot is None and not self.receive_shot(tick):
+      return self.shooting
+    distance = min((tick - self.shot_tick) * BUBBLE_SPEED * self.speed, self.shot_length)
+    x, y = point_on_path(self.shot.path, distance)
+    if y - BUBBLESIZE < self.renderer.view_top:
+      self.renderer.set_view(y - self.renderer.view_height / 3)
+    self.renderer.move_bubble(self.current_bubble, x, y)
+    if distance < self.shot_length:
+      return True
+    self.handle_collision()
+    return False
+
   def handle_collision(self):
     """
-    Functie de handle in caz de coliziune.
-    :param bubble_direction_x: Directia bulei pe axa X.
-    :param bubble_direction_y:  Directia bulei pe axa Y.
-    """
-    self.current_bubble.row, self.current_bubble.col = self.new_bubble_position()
-    self.current_bubble.destroy(self.game_canvas)
-    self.current_bubble.draw(self.game_canvas, self.first_row)
-    self.game_table[self.current_bubble.row][self.current_bubble.col] = self.current_bubble
-
-    matches = set()
-    self.find_color_matches(matches, self.current_bubble)  
-    if len(matches) >= 3:
-      target_bubbles = self.get_target_bubbles(matches)
-      self.update_score(matches, target_bubbles)
-      self.disolve_bubbles(target_bubbles)
-    self.update_next_bubbles()
-    self.drop_counter += 1
+    Functie de handle in caz de coliziune: desenarea rezultatului loviturii rezolvate de motor.
+    Bulele sparte si cele ramase fara legatura sunt date animatiilor, care le intorc ovalele in bazin la final,
+    deci nu raman obiecte orfane in canvas.
+    """
+    shot = self.shot
     if self.is_shaking:
       self.stop_shaking()
-    self.loop_id = self.window.after(50, self.game_loop)
-  
-  def find_color_matches(self, matches, bubble, visited=None):
-    """
-    Functie de gasire a bulelor de aceeasi culoare cu care bula curenta a interactionat.
-    :param matches: Set in care pastram bulele de aceeasi culoare cu bula curenta, inclusiv pe ea.
-    :param bubble: Bula pe care o verificam, impreuna cu vecinii sai.
-    :param visited: Set in care punem id-urile bulelor, pentru a nu repeta procesul degeaba pentru aceeasi bula de doua sau mai multe ori.
-    """
-    if visited is None:
-      visited = set()
-    if bubble.get_bubble_id() in visited:
-      return
-    visited.add(bubble.get_bubble_id())
-    matches.add(bubble)
-    neighbor_bubbles = self.get_neighbor_bubbles(bubble)
-
-    for neighbor in neighbor_bubbles:
-      if neighbor.color == bubble.color:
-        self.find_color_matches(matches, neighbor, visited)
-
-  def get_target_bubbles(self, matches, safe_bubbles = None):
-    """
-    Determinarea bulelor ce trebuie eliminate pe langa cele de aceeasi culoare cu bula curenta.
-    :param matches: Set in care pastram bulele de aceeasi culoare cu bula curenta, inclusiv pe ea.
-    :param safe_bubbles: Dictionar in care pastram bulele ce nu trebuie eliminate.
-    """
-    if safe_bubbles is None:
-      safe_bubbles = dict()
-    for row in self.game_table:
-      for bubble in row:
-        if bubble:
-          if (bubble.row == self.first_row) or ((bubble.row + self.first_row) % 2 == 0 and (bubble.col == 0 or bubble.col == 11)):
-            self.get_safe_neighbors(bubble, matches, safe_bubbles)
-    target_bubbles = [bubble for row in self.game_table for bubble in row if bubble and bubble not in safe_bubbles.values()]
-    return set(target_bubbles)
-
-  def get_safe_neighbors(self, bubble, matches, safe_bubbles):
-    """
-    Functie recursiva de aflare a bulelor ce nu trebuie eliminate.
-    :param bubble: Bula pentru care cautam vecinii care nu trebuie eliminati.
-    :param matches:  Set in care pastram bulele de aceeasi culoare cu bula curenta, inclusiv pe ea.
-    :param safe_bubbles:  Dictionar in care pastram bulele ce nu trebuie eliminate.
-    """
-    if bubble not in matches and (bubble.row, bubble.col) not in safe_bubbles:
-      safe_bubbles[(bubble.row, bubble.col)] = bubble
-      neighbors = self.get_neighbor_bubbles(bubble)
-      for neighbor in neighbors:
-        self.get_safe_neighbors(neighbor, matches, safe_bubbles)
-
-  def get_neighbor_bubbles(self, bubble):
-    """
-    Determinarea vecinilor unei bule.
-    :param bubble: Bula pentru care determinam vecinii.
-    """
-    neighbors = []
-    row, col = bubble.row, bubble.col
-    if not col == 0 and self.game_table[row][col - 1]:
-      neighbors.append(self.game_table[row][col - 1])
-    if not col == MAXWIDTH - 1 and self.game_table[row][col + 1]:
-      neighbors.append(self.game_table[row][col + 1])
-    if not row == 0 and self.game_table[row - 1][col]:
-      neighbors.append(self.game_table[row - 1][col])
-    if row <= MAXHEIGHT and self.game_table[row + 1][col]:
-      neighbors.append(self.game_table[row + 1][col])
-    if (row + self.first_row) % 2 == 0:
-      if not row == 0 and not col == 0 and self.game_table[row - 1][col - 1]:
-        neighbors.append(self.game_table[row - 1][col - 1])
-      if row <= MAXHEIGHT and not col == 0 and self.game_table[row + 1][col - 1]:
-        neighbors.append(self.game_table[row + 1][col - 1])
+    if shot.replaced:
+      self.renderer.remove_bubble(shot.replaced)
+    if shot.matches:
+      centers = [self.renderer.position(bubble, on_board=False) for bubble in shot.matches]
+      popped = [self.renderer.detach(bubble) for bubble in shot.matches | {self.current_bubble}]
+      self.effects.pop([item for item in popped if item is not None],
+                       sum(x for x, _ in centers) / len(centers), sum(y for _, y in centers) / len(centers))
+      falling = shot.target_bubbles - shot.matches
+      top = min((self.renderer.position(bubble, on_board=False)[1] for bubble in falling), default=0)
+      falling = [self.renderer.detach(bubble) for bubble in falling]
+      self.effects.fall([item for item in falling if item is not None], self.renderer.view_top + self.renderer.view_height + BUBBLESIZE - top)
+      if self.profiler.enabled:
+        self.profiler.histogram("effect_items").record(self.effects.item_count())
     else:
-      if not row == 0 and not col == MAXWIDTH - 1 and self.game_table[row - 1][col + 1]:
-        neighbors.append(self.game_table[row - 1][col + 1])
-      if row <= MAXHEIGHT and not col == MAXWIDTH - 1 and self.game_table[row + 1][col + 1]:
-        neighbors.append(self.game_table[row + 1][col + 1])
-    return neighbors
-
-  def disolve_bubbles(self, bubbles):
-    """
-    Stergerea din tabla de joc a bulelor.
-    :param bubbles: Lista cu bulele care se vor sterge din tabla de joc.
-    """
-    for bubble in bubbles:
-      bubble.destroy(self.game_canvas)
-      self.game_table[bubble.row][bubble.col] = None
-      color = bubble.color
-      if self.next_bubble_color is not color and not any(bubble.color == color for row in self.game_table for bubble in row if bubble):
-        self.all_colors.remove(bubble.color)
-
-  def new_bubble_position(self):
-    """
-    Calcularea randului si coloanei din tabla de joc a bulei care a fost trase.
-    """
-    bubble_center_x, bubble_center_y = self.calculate_center(self.current_bubble)
-    if self.collision_bubble:
-      collision_center_x, collision_center_y = self.calculate_center(self.collision_bubble)
-      row = int(collision_center_y / (BUBBLESIZE * 0.85))
-      col = int(collision_center_x / BUBBLESIZE)
-      if (self.first_row + row) % 2 == 1:
-        col -= 1 if collision_center_x % BUBBLESIZE < BUBBLESIZE / 2 else 0
-      final_row, final_col = row, col
-      if (row + self.first_row) % 2 == 1:
-        directions = [(0, 1), (1, 0), (0, -1), (-1, 1), (-1, 0), (1, 1)]
-      else:
-        directions = [(0, 1), (1, 0), (0, -1), (-1, -1), (-1, 0), (1, -1)]
-      min_distance = float('inf')
-      for direction in directions:
-        new_row, new_col = row + direction[0], col + direction[1]
-        if not((self.first_row + new_row) % 2 == 1 and new_col == 11):
-          if 0 <= new_row <= MAXHEIGHT and 0 <= new_col < MAXWIDTH and self.game_table[new_row][new_col] is None:
-            new_center_x = (new_col * BUBBLESIZE) + BUBBLESIZE / 2 + (BUBBLESIZE /2 if (new_row + self.first_row) %  2 == 1 else 0)
-            new_center_y = (new_row * BUBBLESIZE * 0.85) + BUBBLESIZE / 2
-            distance = math.sqrt((bubble_center_x - new_center_x)**2 + (bubble_center_y - new_center_y)**2)
-            if distance < min_distance:
-              min_distance = distance
-              final_row, final_col = new_row, new_col
-    else:
-      final_row = self.first_row
-      final_col = int(bubble_center_x / BUBBLESIZE)
-    return final_row, final_col
-
-  def update_next_bubbles(self):
-    """
-    Actualizarea bulei curente si a celei care urmeaza.
-    """
-    self.current_color =  self.next_bubble_color
-    self.next_bubble_color = random.choice(list(self.all_colors))
-    self.next_bubble_canvas.create_oval(0, 0, 20, 20, fill = self.next_bubble_color)
-    self.current_bubble = Bubble(15, 5, self.current_color)
-    self.current_bubble.draw(self.game_canvas, self.first_row)
-
-  def update_score(self, matches, target_bubbles):
-    """
-    Actualizarea scorului in functie de bulele ce au fost distruse.
-    :param matches: Bulele alaturi de care bula curenta a declansat distrugerea.
-    :param target_bubbles: Bulele care depindeau de cele ce au declansat distrugerea.
-    """
-    new_score = 15 * len(matches)
-    for bubble in list(target_bubbles - matches):
-      new_score += 3 * self.color_score[bubble.color]   
-    self.score += new_score
-    self.score_text.set(f"Score: {self.score}")
-
-  def calculate_center(self, bubble):
-    """
-    Functie de calculare a centrului bulei date ca parametru.
-    :param bubble: Bula pentru care calculam coordonatele centrului.
-    """
-    bubble_coords = self.game_canvas.coords(bubble.get_bubble_id())
-    bubble_center_x = (bubble_coords[0] + bubble_coords[2]) / 2
-    bubble_center_y = (bubble_coords[1] + bubble_coords[3]) / 2
-    return bubble_center_x, bubble_center_y
-  
-def initial_matrix():
-  """
-  Initializarea matricii ce reprezinta tabela cu valori None.
-  """
-  return [[None for _ in range(MAXWIDTH)] for _ in range(MAXHEIGHT + 2)]
\ No newline at end of file
+      self.renderer.remove_bubble(self.current_bubble)
+    self.score_text.set(f"Score: {self.state.score}")
+    if shot.dropped:
+      self.drop_bubbles()
+    self.renderer.end_shot()
+    if shot.bubble not in shot.target_bubbles:
+      self.renderer.draw_bubble(shot.bubble)
+    self.draw_current_bubble()
+    self.renderer.view_bottom()
+    self.aim_guide.resume()
+    self.shooting = False
+    self.scheduler.call_later(50, self.game_loop)
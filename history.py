@@ -0,0 +1,190 @@
+import sys
+from engine import BoardState, Bubble
+
+UNDO_MEMORY = 2 * 1024 * 1024
+
+def sizeof(value):
+  """
+  Returneaza dimensiunea aproximativa, in octeti, a unei valori, cu tot cu tuplurile si numerele din ea.
+  :param value: Valoarea masurata.
+  """
+  size = sys.getsizeof(value)
+  if isinstance(value, (tuple, frozenset)):
+    size += sum(sizeof(item) for item in value if item is not None)
+  return size
+
+class Snapshot:
+  """
+  Starea jocului dupa o lovitura, imutabila. Randurile sunt tupluri de culori, pe randul logic (randul fizic minus
+  coborarile), astfel ca o coborare nu schimba niciun rand. Randurile neschimbate fata de instantaneul anterior,
+  culorile si generatorul de culori (care se schimba doar o data la cateva sute de lovituri) sunt aceleasi obiecte.
+  """
+  __slots__ = ("rows", "first_row", "drop_counter", "score", "shots", "clusters", "current_color", "next_bubble_color",
+               "colors", "status", "seed", "version", "random_key", "random_rest", "size")
+
+class History:
+  """
+  Istoricul starilor unui joc, pentru anulare si derulare. Fiecare instantaneu are un index absolut; intoarcerea la
+  oricare dintre ele dureaza la fel, oricat de lung e istoricul. Cand memoria estimata depaseste limita, cele mai vechi
+  instantanee sunt sterse.
+  """
+  def __init__(self, engine, limit=UNDO_MEMORY):
+    """
+    Initializarea unui obiect de tip History.
+    :param engine: Motorul jocului.
+    :param limit: Memoria maxima a istoricului, in octeti (None pentru fara limita).
+    """
+    self.engine = engine
+    self.limit = limit
+    self.snapshots = dict()
+    self.first = 0
+    self.last = -1
+    self.position = -1
+    self.memory = 0
+
+  def reset(self):
+    """
+    Stergerea istoricului si salvarea starii de inceput a jocului.
+    """
+    self.snapshots = dict()
+    self.first = 0
+    self.last = -1
+    self.position = -1
+    self.memory = 0
+    self.record()
+
+  def record(self):
+    """
+    Salvarea starii curente dupa starea la care s-a ajuns. Starile de dupa ea (ramase dupa o anulare) sunt sterse.
+    Returneaza numarul de stari sterse astfel, adica numarul de lovituri anulate inainte de cea noua.
+    """
+    previous = self.snapshots.get(self.position)
+    undone = self.last - self.position
+    for index in range(self.position + 1, self.last + 1):
+      self.memory -= self.snapshots.pop(index).size
+    snapshot = self.capture(previous)
+    self.position = self.last = self.position + 1
+    self.snapshots[self.position] = snapshot
+    self.memory += snapshot.size
+    while self.limit is not None and self.memory > self.limit and self.first < self.position:
+      self.evict()
+    return undone
+
+  def capture(self, previous):
+    """
+    Crearea instantaneului starii curente. Se construiesc doar randurile modificate de la instantaneul anterior.
+    :param previous: Instantaneul anterior (None pentru primul).
+    """
+    state = self.engine.state
+    first_row = state.first_row
+    game_table = state.game_table
+    dirty = state.dirty_rows
+    snapshot = Snapshot()
+    snapshot.size = sys.getsizeof(snapshot)
+    rows = []
+    for row in range(len(game_table) - first_row):
+      if previous is not None and row not in dirty and row < len(previous.rows):
+        rows.append(previous.rows[row])
+        continue
+      colors = tuple(bubble.color if bubble else None for bubble in game_table[row + first_row])
+      rows.append(colors)
+      snapshot.size += sizeof(colors)
+    dirty.clear()
+    snapshot.rows = tuple(rows)
+    snapshot.size += sys.getsizeof(snapshot.rows)
+
+    colors = (frozenset(state.all_colors), tuple(sorted(state.color_score.items())))
+    if previous is not None and previous.colors == colors:
+      colors = previous.colors
+    else:
+      snapshot.size += sizeof(colors)
+    snapshot.colors = colors
+
+    version, internal, gauss = self.engine.random.getstate()
+    key = internal[:-1]
+    if previous is not None and previous.random_key == key:
+      key = previous.random_key
+    else:
+      snapshot.size += sizeof(key)
+    snapshot.random_key = key
+    snapshot.random_rest = (version, internal[-1], gauss)
+
+    snapshot.first_row = first_row
+    snapshot.drop_counter = state.drop_counter
+    snapshot.score = state.score
+    snapshot.shots = state.shots
+    snapshot.clusters = state.clusters
+    snapshot.current_color = state.current_color
+    snapshot.next_bubble_color = state.next_bubble_color
+    snapshot.status = state.status
+    snapshot.seed = state.seed
+    snapshot.version = state.version
+    return snapshot
+
+  def evict(self):
+    """
+    Stergerea celui mai vechi instantaneu. Partile pe care le imparte cu urmatorul sunt trecute in memoria acestuia.
+    """
+    oldest = self.snapshots.pop(self.first)
+    self.first += 1
+    self.memory -= oldest.size
+    successor = self.snapshots[self.first]
+    shared = 0
+    for row, colors in enumerate(successor.rows[:len(oldest.rows)]):
+      if colors is oldest.rows[row]:
+        shared += sizeof(colors)
+    if successor.colors is oldest.colors:
+      shared += sizeof(successor.colors)
+    if successor.random_key is oldest.random_key:
+      shared += sizeof(successor.random_key)
+    successor.size += shared
+    self.memory += shared
+
+  def can_undo(self, steps=1):
+    """
+    Verifica daca istoricul mai are steps stari inaintea celei curente.
+    :param steps: Numarul de lovituri anulate.
+    """
+    return self.position - steps >= self.first
+
+  def undo(self, steps=1):
+    """
+    Anularea ultimelor lovituri. Starile anulate raman in istoric pana la urmatoarea lovitura, deci pot fi refacute cu seek.
+    :param steps: Numarul de lovituri anulate.
+    """
+    self.seek(self.position - steps)
+
+  def seek(self, position):
+    """
+    Refacerea starii cu indexul dat: o stare noua, cu bulele, statisticile si generatorul de culori din instantaneu.
+    :param position: Indexul starii, intre first si last.
+    """
+    if not self.first <= position <= self.last:
+      raise IndexError(f"no state {position} in the history ({self.first}-{self.last})")
+    snapshot = self.snapshots[position]
+    engine = self.engine
+    state = BoardState(engine.rows, engine.cols)
+    first_row = snapshot.first_row
+    for row, colors in enumerate(snapshot.rows):
+      table_row = state.game_table[row + first_row]
+      for col, color in enumerate(colors):
+        if color is not None:
+          table_row[col] = Bubble(row + first_row, col, color, first_row)
+    all_colors, color_score = snapshot.colors
+    state.all_colors = set(all_colors)
+    state.color_score = dict(color_score)
+    state.first_row = first_row
+    state.drop_counter = snapshot.drop_counter
+    state.score = snapshot.score
+    state.shots = snapshot.shots
+    state.clusters = snapshot.clusters
+    state.current_color = snapshot.current_color
+    state.next_bubble_color = snapshot.next_bubble_color
+    state.status = snapshot.status
+    state.seed = snapshot.seed
+    state.version = snapshot.version
+    engine.state = state
+    engine.index_table()
+    version, position_in_key, gauss = snapshot.random_rest
+    engine.random.setstate((version, snapshot.random_key + (position_in_key,), gauss))
+    self.position = position
@@ -0,0 +1,240 @@
+import csv
+import json
+import time
+
+CANVAS_CALLS = ("create_oval", "create_line", "create_rectangle", "create_text", "coords", "itemconfig", "itemconfigure", "move", "scale", "yview_moveto", "delete", "find_all", "find_withtag")
+ENGINE_METHODS = ("trace_shot", "place_bubble", "get_target_bubbles", "find_color_matches")
+
+def time_calls(target, methods):
+  """
+  Masurarea apelurilor unor metode ale unui obiect, fara histograme comune, deci si dintr-un alt fir
+  (de exemplu, pe copia motorului in care se rezolva o lovitura). Apelurile recursive sunt masurate o singura data.
+  Returneaza un dictionar cu lista de durate (in microsecunde) pentru fiecare metoda, completat pe masura ce sunt apelate.
+  :param target: Obiectul ale carui metode se masoara.
+  :param methods: Numele metodelor.
+  """
+  timings = dict()
+  def wrap(method):
+    original = getattr(target, method)
+    durations = timings.setdefault(method, [])
+    active = [False]
+    def timed(*args, **kwargs):
+      if active[0]:
+        return original(*args, **kwargs)
+      active[0] = True
+      start = time.perf_counter()
+      try:
+        return original(*args, **kwargs)
+      finally:
+        durations.append((time.perf_counter() - start) * 1e6)
+        active[0] = False
+    setattr(target, method, timed)
+  for method in methods:
+    wrap(method)
+  return timings
+
+class Histogram:
+  """
+  Histograma de durate cu intervale logaritmice: intervalul k contine duratele intre 2^(k-1) si 2^k microsecunde.
+  """
+  def __init__(self):
+    """
+    Initializarea unui obiect de tip Histogram.
+    """
+    self.buckets = [0] * 32
+    self.count = 0
+    self.total = 0
+    self.max = 0
+
+  def record(self, value):
+    """
+    Adaugarea unei valori in histograma.
+    :param value: Valoarea adaugata (o durata, in microsecunde, sau un numar de apeluri).
+    """
+    self.buckets[min(int(value).bit_length(), 31)] += 1
+    self.count += 1
+    self.total += value
+    self.max = max(self.max, value)
+
+  def percentile(self, fraction):
+    """
+    Returneaza limita de sus a intervalului in care se afla percentila ceruta.
+    :param fraction: Percentila, intre 0 si 1.
+    """
+    if not self.count:
+      return 0
+    remaining = fraction * self.count
+    for index, count in enumerate(self.buckets):
+      remaining -= count
+      if remaining <= 0:
+        return round(min(1 << index, self.max), 2) if index else 0
+    return self.max
+
+  def summary(self):
+    """
+    Returneaza statisticile histogramei, ca dictionar.
+    """
+    return {
+      "count": self.count,
+      "mean": round(self.total / self.count, 2) if self.count else 0,
+      "p50": self.percentile(0.5),
+      "p95": self.percentile(0.95),
+      "p99": self.percentile(0.99),
+      "max": round(self.max, 2),
+      "buckets": {1 << index if index else 0: count for index, count in enumerate(self.buckets) if count},
+    }
+
+class Profiler:
+  """
+  Instrumentarea optionala a jocului: metodele masurate sunt inlocuite pe instanta doar cat timp
+  profiler-ul e pornit, deci cand e oprit nu exista niciun cost.
+  Masoara durata apelurilor (in microsecunde), apelurile Tcl facute de canvas in fiecare cadru
+  si numarul de obiecte din canvas.
+  """
+  def __init__(self):
+    """
+    Initializarea unui obiect de tip Profiler.
+    """
+    self.enabled = False
+    self.histograms = dict()
+    self.wrapped = []
+    self.canvas = None
+    self.frame_calls = 0
+    self.item_count = 0
+    self.max_item_count = 0
+    self.started = None
+
+  def histogram(self, name):
+    """
+    Returneaza histograma cu numele dat, creand-o daca nu exista.
+    :param name: Numele histogramei.
+    """
+    if name not in self.histograms:
+      self.histograms[name] = Histogram()
+    return self.histograms[name]
+
+  def wrap(self, target, method, name, tcl_call=False):
+    """
+    Inlocuirea unei metode a unui obiect cu una care ii masoara durata. Apelurile recursive
+    sunt masurate o singura data, la nivelul cel mai de sus.
+    :param target: Obiectul a carui metoda se masoara.
+    :param method: Numele metodei.
+    :param name: Numele histogramei.
+    :param tcl_call: Daca fiecare apel e o comunicare cu Tcl, numarata pe cadru.
+    """
+    original = getattr(target, method)
+    histogram = self.histogram(name)
+    active = [False]
+    def timed(*args, **kwargs):
+      if tcl_call:
+        self.frame_calls += 1
+      if active[0]:
+        return original(*args, **kwargs)
+      active[0] = True
+      start = time.perf_counter()
+      try:
+        return original(*args, **kwargs)
+      finally:
+        histogram.record((time.perf_counter() - start) * 1e6)
+        active[0] = False
+    setattr(target, method, timed)
+    self.wrapped.append((target, method))
+
+  def enable(self, game):
+    """
+    Pornirea instrumentarii pentru un joc.
+    :param game: Jocul instrumentat.
+    """
+    if self.enabled:
+      return
+    self.enabled = True
+    self.started = self.started or time.perf_counter()
+    for method in ("game_loop", "move_bubble", "handle_collision"):
+      self.wrap(game, method, method)
+    for method in ENGINE_METHODS:
+      self.wrap(game.engine, method, method)
+    self.wrap(game.scheduler, "run_frame", "frame")
+    if getattr(game, "game_canvas", None) is not None:
+      self.watch_canvas(game.game_canvas)
+
+  def watch_canvas(self, canvas):
+    """
+    Instrumentarea apelurilor de desen ale unui canvas (de exemplu, dupa ce jocul si-a creat unul nou).
+    :param canvas: Canvas-ul instrumentat.
+    """
+    if not self.enabled or canvas is self.canvas:
+      return
+    self.wrapped = [(target, method) for target, method in self.wrapped if target is not self.canvas]
+    self.canvas = canvas
+    for method in CANVAS_CALLS:
+      self.wrap(canvas, method, "canvas." + method, tcl_call=True)
+
+  def record_timings(self, timings):
+    """
+    Adaugarea in histograme a duratelor masurate cu time_calls.
+    :param timings: Dictionarul returnat de time_calls.
+    """
+    for name, durations in timings.items():
+      histogram = self.histogram(name)
+      for duration in durations:
+        histogram.record(duration)
+
+  def disable(self):
+    """
+    Oprirea instrumentarii: metodele originale sunt puse inapoi. Statisticile raman pentru export.
+    """
+    for target, method in self.wrapped:
+      if method in vars(target):
+        delattr(target, method)
+    self.wrapped = []
+    self.canvas = None
+    self.enabled = False
+
+  def end_frame(self):
+    """
+    Inregistrarea statisticilor unui cadru; apelata de planificator la sfarsitul fiecarui cadru.
+    """
+    if not self.enabled:
+      return
+    self.histogram("tcl_calls_per_frame").record(self.frame_calls)
+    self.frame_calls = 0
+    if self.canvas is not None:
+      self.item_count = len(type(self.canvas).find_all(self.canvas))
+      self.max_item_count = max(self.max_item_count, self.item_count)
+
+  def report(self):
+    """
+    Returneaza toate statisticile, ca dictionar.
+    """
+    return {
+      "seconds": round(time.perf_counter() - self.started, 3) if self.started else 0,
+      "canvas_items": self.item_count,
+      "max_canvas_items": self.max_item_count,
+      "histograms": {name: histogram.summary() for name, histogram in sorted(self.histograms.items())},
+    }
+
+  def overlay_text(self):
+    """
+    Returneaza textul afisat in overlay-ul de depanare.
+    """
+    lines = [f"items {self.item_count} (max {self.max_item_count})"]
+    for name, histogram in sorted(self.histograms.items()):
+      if histogram.count and not name.startswith("canvas."):
+        lines.append(f"{name}: n={histogram.count} p50={round(histogram.percentile(0.5))} p95={round(histogram.percentile(0.95))} max={round(histogram.max)}")
+    return "\n".join(lines)
+
+  def export(self, path):
+    """
+    Scrierea statisticilor intr-un fisier JSON sau, daca extensia e .csv, intr-un tabel CSV.
+    :param path: Fisierul in care se scriu statisticile.
+    """
+    report = self.report()
+    if path.endswith(".csv"):
+      with open(path, "w", newline="") as output:
+        writer = csv.writer(output)
+        writer.writerow(["name", "count", "mean", "p50", "p95", "p99", "max"])
+        for name, summary in report["histograms"].items():
+          writer.writerow([name] + [summary[key] for key in ("count", "mean", "p50", "p95", "p99", "max")])
+    else:
+      with open(path, "w") as output:
+        json.dump(report, output, indent=2)
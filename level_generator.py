@@ -0,0 +1,270 @@
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+from multiprocessing import Pool
+from engine import *
+from autoplayer import evaluate
+from levels import Level, write_pack
+
+GENERATOR_VERSION = 1
+DEFAULT_CACHE = ".level_cache"
+
+def generate_candidate(seed, rows, colors, difficulty, board_rows=MAXHEIGHT, cols=MAXWIDTH):
+  """
+  Generarea unei table candidate. La dificultate mica, culorile se grupeaza in pete mari (o celula
+  copiaza des culoarea vecinului din stanga sau de deasupra); la dificultate mare, culorile sunt amestecate.
+  :param seed: Seed-ul candidatului; e folosit si ca seed al culorilor bulelor trase.
+  :param rows: Numarul de randuri completate.
+  :param colors: Numarul de culori (cel mult cate sunt in COLORS).
+  :param difficulty: Dificultatea, intre 0 si 1.
+  :param board_rows: Randul pe care, daca ajunge o bula, jocul e pierdut.
+  :param cols: Numarul de coloane al tablei.
+  """
+  rng = random.Random(seed)
+  palette = rng.sample(range(len(COLORS)), colors)
+  grid = dict()
+  for row in range(rows):
+    for col in range(cols):
+      if row % 2 == 1 and col == cols - 1:
+        continue
+      neighbors = [grid[cell] for cell in ((row, col - 1), (row - 1, col)) if cell in grid]
+      if neighbors and rng.random() < (1 - difficulty) * 0.85:
+        grid[(row, col)] = rng.choice(neighbors)
+      else:
+        grid[(row, col)] = rng.choice(palette)
+  bubbles = [(row, col, color) for (row, col), color in grid.items()]
+  return Level(bubbles, {color for _, _, color in bubbles}, 0, seed, board_rows, cols)
+
+def landing_moves(engine, angles):
+  """
+  Returneaza celulele distincte in care poate ajunge bula curenta, cu cate un unghi pentru fiecare.
+  :param engine: Motorul pozitiei.
+  :param angles: Unghiurile incercate.
+  """
+  moves = dict()
+  for angle in angles:
+    trace = engine.trace_shot(angle)
+    if trace is not None:
+      moves.setdefault(trace[1:], angle)
+  return moves
+
+def solve(level, max_shots, beam_width, angles, drop_shots=DROP_SHOTS):
+  """
+  Cautarea, pe fascicul, a unei serii de lovituri care curata tabla in cel mult max_shots lovituri, cu regulile
+  motorului (inclusiv coborarea tablei la fiecare drop_shots lovituri si culorile trase din seed-ul nivelului).
+  Returneaza unghiurile loviturilor gasite, care dovedesc ca nivelul poate fi terminat, sau None.
+  :param level: Nivelul verificat.
+  :param max_shots: Numarul maxim de lovituri.
+  :param beam_width: Numarul de pozitii pastrate dupa fiecare lovitura.
+  :param angles: Unghiurile incercate la fiecare lovitura.
+  :param drop_shots: Numarul de lovituri dupa care tabla coboara cu un rand.
+  """
+  engine = Engine(drop_shots=drop_shots, bitboard=True, rows=level.rows, cols=level.cols)
+  engine.load_level(level)
+  if engine.check_game_status() == "win":
+    return []
+  beam = [(engine, [])]
+  for _ in range(max_shots):
+    candidates = []
+    seen = set()
+    for engine, shots in beam:
+      for (row, col), angle in landing_moves(engine, angles).items():
+        child = engine.copy()
+        child.place_bubble(row, col)
+        state = child.state
+        if state.status == "win":
+          return shots + [angle]
+        if state.status == "lose":
+          continue
+        key = (state.bitboard.key, state.current_color, state.next_bubble_color, state.drop_counter)
+        if key in seen:
+          continue
+        seen.add(key)
+        candidates.append((evaluate(state.bitboard), len(candidates), child, shots + [angle]))
+    if not candidates:
+      return None
+    candidates.sort(key=lambda candidate: (-candidate[0], candidate[1]))
+    beam = [(child, shots) for _, _, child, shots in candidates[:beam_width]]
+  return None
+
+def check_candidate(job):
+  """
+  Generarea si verificarea unui candidat, intr-un proces din bazin. Returneaza rezultatul ca dictionar.
+  :param job: Tuplu (seed, configuratia generatorului).
+  """
+  seed, config = job
+  start = time.perf_counter()
+  level = generate_candidate(seed, config["rows"], config["colors"], config["difficulty"], config["board_rows"], config["cols"])
+  angles = [-math.pi + 0.1 + index * (math.pi - 0.2) / (config["angles"] - 1) for index in range(config["angles"])]
+  solution = solve(level, config["max_shots"], config["beam"], angles, config["drop_shots"])
+  return {
+    "seed": seed,
+    "solution": solution,
+    "seconds": round(time.perf_counter() - start, 4),
+  }
+
+def accepted(result, config):
+  """
+  Verifica daca un candidat rezolvat are dificultatea ceruta: o solutie de cel putin min_shots lovituri.
+  :param result: Rezultatul verificarii candidatului.
+  :param config: Configuratia generatorului.
+  """
+  return result["solution"] is not None and len(result["solution"]) >= config["min_shots"]
+
+class CandidateCache:
+  """
+  Cache pe disc al candidatilor verificati: un fisier JSON lines pentru fiecare configuratie, cu seed-ul
+  si solutia fiecarui candidat. Nivelul se reface din seed, deci nu e salvat.
+  """
+  def __init__(self, directory, config):
+    """
+    Initializarea unui obiect de tip CandidateCache si citirea rezultatelor deja salvate.
+    :param directory: Directorul cache-ului.
+    :param config: Configuratia generatorului; orice schimbare a ei foloseste alt fisier.
+    """
+    os.makedirs(directory, exist_ok=True)
+    key = hashlib.sha1(json.dumps(config, sort_keys=True).encode()).hexdigest()[:16]
+    self.path = os.path.join(directory, f"candidates-{key}.jsonl")
+    self.results = dict()
+    if os.path.exists(self.path):
+      with open(self.path) as cache_file:
+        for line in cache_file:
+          try:
+            result = json.loads(line)
+          except ValueError:
+            continue
+          self.results[result["seed"]] = result
+    self.file = open(self.path, "a")
+
+  def add(self, result):
+    """
+    Salvarea rezultatului unui candidat.
+    :param result: Rezultatul verificarii.
+    """
+    self.results[result["seed"]] = result
+    self.file.write(json.dumps(result) + "\n")
+    self.file.flush()
+
+  def close(self):
+    """
+    Inchiderea fisierului cache-ului.
+    """
+    self.file.close()
+
+def generate(config, count, first_seed, max_candidates, processes=None, cache_dir=DEFAULT_CACHE):
+  """
+  Generarea a count niveluri acceptate, verificand candidatii in paralel, in ordinea seed-urilor.
+  Candidatii deja verificati sunt luati din cache. Returneaza (nivelurile acceptate, cu solutiile lor, statistici).
+  :param config: Configuratia generatorului.
+  :param count: Numarul de niveluri cerute.
+  :param first_seed: Seed-ul primului candidat.
+  :param max_candidates: Numarul maxim de candidati verificati.
+  :param processes: Numarul de procese (None pentru toate nucleele).
+  :param cache_dir: Directorul cache-ului.
+  """
+  cache = CandidateCache(cache_dir, config)
+  seeds = range(first_seed, first_seed + max_candidates)
+  found = dict()
+  cached = 0
+  checked = 0
+  start = time.perf_counter()
+  try:
+    missing = []
+    for seed in seeds:
+      if seed in cache.results:
+        cached += 1
+        if accepted(cache.results[seed], config):
+          found[seed] = cache.results[seed]
+          if len(found) >= count:
+            break
+      else:
+        missing.append(seed)
+    if len(found) < count and missing:
+      with Pool(processes) as pool:
+        for result in pool.imap(check_candidate, ((seed, config) for seed in missing), chunksize=1):
+          cache.add(result)
+          checked += 1
+          if accepted(result, config):
+            found[result["seed"]] = result
+            if len(found) >= count:
+              pool.terminate()
+              break
+  finally:
+    cache.close()
+  levels = []
+  for seed in sorted(found)[:count]:
+    level = generate_candidate(seed, config["rows"], config["colors"], config["difficulty"], config["board_rows"], config["cols"])
+    levels.append((level, found[seed]["solution"]))
+  stats = {
+    "levels": len(levels),
+    "checked": checked,
+    "cached": cached,
+    "seconds": round(time.perf_counter() - start, 3),
+    "cache": cache.path,
+  }
+  return levels, stats
+
+def main(argv=None):
+  """
+  Functia main a generatorului de niveluri.
+  :param argv: Argumentele din linia de comanda (implicit, sys.argv).
+  """
+  parser = argparse.ArgumentParser(description="Generate BubbleBuster levels that are proven clearable, into a level pack.")
+  parser.add_argument("pack", help="output level pack")
+  parser.add_argument("-n", "--levels", type=int, default=100, help="number of levels")
+  parser.add_argument("--seed", type=int, default=0, help="seed of the first candidate; candidate i uses seed + i")
+  parser.add_argument("--colors", type=int, default=3, help="colors per level")
+  parser.add_argument("--rows", type=int, default=6, help="filled rows per level")
+  parser.add_argument("--difficulty", type=float, default=0.5, help="0 for large single-color clusters, 1 for fully mixed colors")
+  parser.add_argument("--max-shots", type=int, default=30, help="a level must be clearable within this many shots")
+  parser.add_argument("--min-shots", type=int, default=1, help="reject levels clearable in fewer shots")
+  parser.add_argument("--beam", type=int, default=6, help="positions kept per shot by the solver")
+  parser.add_argument("--angles", type=int, default=48, help="angles tried per shot by the solver")
+  parser.add_argument("--drop-shots", type=int, default=DROP_SHOTS, help="shots between two drops of the table")
+  parser.add_argument("--board-rows", type=int, default=MAXHEIGHT, help="row at which a level is lost")
+  parser.add_argument("--cols", type=int, default=MAXWIDTH, help="columns of the board")
+  parser.add_argument("--max-candidates", type=int, default=None, help="stop after checking this many candidates (default: 50 per level)")
+  parser.add_argument("-j", "--processes", type=int, default=None, help="worker processes (default: all cores)")
+  parser.add_argument("--cache", default=DEFAULT_CACHE, help="directory of the candidate cache")
+  parser.add_argument("--solutions", default=None, help="also write the solution of each level to this JSON file")
+  args = parser.parse_args(argv)
+
+  if not 1 <= args.colors <= len(COLORS):
+    parser.error(f"colors must be between 1 and {len(COLORS)}")
+  if not 0 <= args.difficulty <= 1:
+    parser.error("difficulty must be between 0 and 1")
+  if not 1 <= args.rows < args.board_rows:
+    parser.error("rows must be positive and above the losing row")
+  config = {
+    "version": GENERATOR_VERSION,
+    "colors": args.colors,
+    "rows": args.rows,
+    "difficulty": args.difficulty,
+    "max_shots": args.max_shots,
+    "min_shots": args.min_shots,
+    "beam": args.beam,
+    "angles": args.angles,
+    "drop_shots": args.drop_shots,
+    "board_rows": args.board_rows,
+    "cols": args.cols,
+  }
+  max_candidates = args.max_candidates or 50 * args.levels
+  levels, stats = generate(config, args.levels, args.seed, max_candidates, args.processes, args.cache)
+  write_pack(args.pack, [level for level, _ in levels])
+  if args.solutions:
+    with open(args.solutions, "w") as solutions_file:
+      json.dump([{"seed": level.seed, "shots": len(solution), "angles": solution} for level, solution in levels], solutions_file)
+  if levels:
+    shots = [len(solution) for _, solution in levels]
+    stats["shots_min"] = min(shots)
+    stats["shots_mean"] = round(sum(shots) / len(shots), 2)
+    stats["shots_max"] = max(shots)
+  print(json.dumps(stats))
+  return 0 if len(levels) == args.levels else 1
+
+if __name__ == "__main__":
+  sys.exit(main())
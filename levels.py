@@ -0,0 +1,177 @@
+import argparse
+import mmap
+import struct
+import sys
+from engine import *
+
+MAGIC = b"BBLP"
+VERSION = 1
+HEADER = struct.Struct("<4sB3xI")
+OFFSET = struct.Struct("<I")
+RECORD = struct.Struct("<HHHHHQ")
+
+class Level:
+  """
+  O tabla de start: dimensiunile tablei, bulele (row, col, color), culorile din joc, first_row si seed-ul pentru bulele trase.
+  """
+  def __init__(self, bubbles, all_colors, first_row=0, seed=0, rows=MAXHEIGHT, cols=MAXWIDTH):
+    """
+    Initializarea unui obiect de tip Level.
+    :param bubbles: Lista de tupluri (row, col, color), culoarea fiind indexul ei in COLORS.
+    :param all_colors: Culorile cu care incepe jocul.
+    :param first_row: Numarul de randuri cu care e coborata tabla la start.
+    :param seed: Seed-ul generatorului pentru culorile bulelor trase.
+    :param rows: Randul pe care, daca ajunge o bula, jocul e pierdut.
+    :param cols: Numarul de coloane al tablei.
+    """
+    self.rows = rows
+    self.cols = cols
+    self.bubbles = bubbles
+    self.all_colors = set(all_colors)
+    self.first_row = first_row
+    self.seed = seed
+
+  @classmethod
+  def from_state(cls, state):
+    """
+    Crearea unui nivel din starea unui joc.
+    :param state: Starea tablei de joc.
+    """
+    bubbles = [(bubble.row, bubble.col, bubble.color) for bubble in state.bubbles()]
+    return cls(bubbles, state.all_colors, state.first_row, state.seed or 0, state.rows, state.cols)
+
+def pack_level(level):
+  """
+  Codificarea unui nivel: antetul inregistrarii (cu dimensiunile tablei), apoi cate 4 biti pe celula
+  (0 pentru celula goala, culoarea + 1 altfel), doar pentru randurile pana la ultima bula.
+  :param level: Nivelul codificat.
+  """
+  cols = level.cols
+  used_rows = max((row + 1 for row, _, _ in level.bubbles), default=0)
+  cells = bytearray(used_rows * cols)
+  for row, col, color in level.bubbles:
+    if color >= 15:
+      raise ValueError("level packs support at most 15 colors")
+    cells[row * cols + col] = color + 1
+  if len(cells) % 2:
+    cells.append(0)
+  packed = bytes(cells[index] | cells[index + 1] << 4 for index in range(0, len(cells), 2))
+  colors_mask = sum(1 << color for color in level.all_colors)
+  return RECORD.pack(level.rows, cols, level.first_row, colors_mask, used_rows, level.seed) + packed
+
+def unpack_level(data, offset):
+  """
+  Decodificarea unui nivel aflat la pozitia data.
+  :param data: Octetii pachetului (de obicei, un mmap).
+  :param offset: Pozitia inregistrarii in pachet.
+  """
+  rows, cols, first_row, colors_mask, used_rows, seed = RECORD.unpack_from(data, offset)
+  start = offset + RECORD.size
+  packed = data[start:start + (used_rows * cols + 1) // 2]
+  bubbles = []
+  for index in range(used_rows * cols):
+    value = packed[index >> 1] >> (4 * (index & 1)) & 0xf
+    if value:
+      bubbles.append((index // cols, index % cols, value - 1))
+  all_colors = [color for color in range(16) if colors_mask >> color & 1]
+  return Level(bubbles, all_colors, first_row, seed, rows, cols)
+
+def write_pack(path, levels):
+  """
+  Scrierea unui pachet de niveluri: antet fix, indexul cu pozitia fiecarui nivel, apoi nivelurile.
+  :param path: Fisierul pachetului.
+  :param levels: Nivelurile scrise.
+  """
+  records = [pack_level(level) for level in levels]
+  offset = HEADER.size + OFFSET.size * len(records)
+  with open(path, "wb") as pack_file:
+    pack_file.write(HEADER.pack(MAGIC, VERSION, len(records)))
+    for record in records:
+      pack_file.write(OFFSET.pack(offset))
+      offset += len(record)
+    for record in records:
+      pack_file.write(record)
+
+class LevelPack:
+  """
+  Pachet de niveluri deschis cu mmap: doar antetul e citit la deschidere, iar fiecare nivel e
+  decodificat la cerere, deci deschiderea nu depinde de numarul de niveluri.
+  """
+  def __init__(self, path):
+    """
+    Deschiderea unui pachet de niveluri.
+    :param path: Fisierul pachetului.
+    """
+    self.file = open(path, "rb")
+    self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, version, self.count = HEADER.unpack_from(self.data)
+    if magic != MAGIC or version != VERSION:
+      self.close()
+      raise ValueError(f"{path} is not a BubbleBuster level pack")
+
+  def __len__(self):
+    """
+    Returneaza numarul de niveluri din pachet.
+    """
+    return self.count
+
+  def __getitem__(self, index):
+    """
+    Citirea unui nivel din pachet.
+    :param index: Indexul nivelului.
+    """
+    if index < 0:
+      index += self.count
+    if not 0 <= index < self.count:
+      raise IndexError("level index out of range")
+    offset, = OFFSET.unpack_from(self.data, HEADER.size + OFFSET.size * index)
+    return unpack_level(self.data, offset)
+
+  def close(self):
+    """
+    Inchiderea pachetului.
+    """
+    self.data.close()
+    self.file.close()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exc_info):
+    self.close()
+
+def main(argv=None):
+  """
+  Functia main pentru crearea si inspectarea pachetelor de niveluri.
+  :param argv: Argumentele din linia de comanda (implicit, sys.argv).
+  """
+  parser = argparse.ArgumentParser(description="Build or inspect BubbleBuster level packs.")
+  commands = parser.add_subparsers(dest="command", required=True)
+  build = commands.add_parser("build", help="write a pack of random boards")
+  build.add_argument("pack", help="output file")
+  build.add_argument("-n", "--levels", type=int, default=1000, help="number of levels")
+  build.add_argument("--seed", type=int, default=0, help="seed of the first level; level i uses seed + i")
+  build.add_argument("--rows", type=int, default=7, help="filled rows per level")
+  build.add_argument("--board-rows", type=int, default=MAXHEIGHT, help="row at which a level is lost")
+  build.add_argument("--cols", type=int, default=MAXWIDTH, help="columns of the board")
+  info = commands.add_parser("info", help="describe a pack")
+  info.add_argument("pack", help="level pack file")
+  info.add_argument("--level", type=int, default=None, help="also print this level")
+  args = parser.parse_args(argv)
+
+  if args.command == "build":
+    def levels():
+      engine = Engine(rows=args.board_rows, cols=args.cols)
+      for index in range(args.levels):
+        engine.create_random_table(rows=args.rows, seed=args.seed + index)
+        yield Level.from_state(engine.state)
+    write_pack(args.pack, levels())
+  else:
+    with LevelPack(args.pack) as pack:
+      print(f"{len(pack)} levels")
+      if args.level is not None:
+        level = pack[args.level]
+        print(f"{level.rows} rows, {level.cols} columns, first_row {level.first_row}, colors {sorted(level.all_colors)}, seed {level.seed}, bubbles {len(level.bubbles)}")
+
+if __name__ == "__main__":
+  main()
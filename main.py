@@ -1,16 +1,53 @@
+import argparse
 import tkinter as tk
 from game_utils import *
+from replay import Replay
+from levels import LevelPack
+from scores import ScoreStore, DEFAULT_PATH
+from history import UNDO_MEMORY
 
-def main():
+def main(argv=None):
   """
-  Functia main a programului.  
+  Functia main a programului.
+  :param argv: Argumentele din linia de comanda (implicit, sys.argv).
   """
+  parser = argparse.ArgumentParser(description="Play BubbleBuster.")
+  parser.add_argument("--seed", type=int, default=None, help="seed of the first game")
+  parser.add_argument("--record", default=None, help="record every new game to this replay file")
+  parser.add_argument("--replay", default=None, help="re-render a recorded game")
+  parser.add_argument("--speed", type=float, default=1, help="replay speed multiplier")
+  parser.add_argument("--profile", default=None, help="instrument the game and write the statistics to this JSON or CSV file on exit")
+  parser.add_argument("--levels", default=None, help="level pack to play from")
+  parser.add_argument("--level", type=int, default=0, help="index of the level in the pack")
+  parser.add_argument("--rows", type=int, default=MAXHEIGHT, help="row at which a game is lost; taller boards scroll")
+  parser.add_argument("--cols", type=int, default=MAXWIDTH, help="columns of the board")
+  parser.add_argument("--scores", default=DEFAULT_PATH, help="SQLite file for the leaderboard and session stats")
+  parser.add_argument("--no-scores", action="store_true", help="do not keep a leaderboard")
+  parser.add_argument("--undo-memory", type=int, default=UNDO_MEMORY // 1024, help="memory cap of the undo history, in KiB; the oldest states are dropped first")
+  args = parser.parse_args(argv)
+
+  level = None
+  if args.levels:
+    with LevelPack(args.levels) as pack:
+      level = pack[args.level]
+
   window = tk.Tk()
   window.title("BubbleBuster")
   window.geometry("600x700+500+50")
   window.configure(bg='#7700a6')
-  game = Game(window)
+  scores = None if args.no_scores else ScoreStore(args.scores)
+  game = Game(window, seed=args.seed, record=args.record, level=level, profile=bool(args.profile), rows=args.rows, cols=args.cols, scores=scores,
+              undo_memory=args.undo_memory * 1024)
+  if args.replay:
+    game.play_replay(Replay.load(args.replay), speed=args.speed)
   window.mainloop()
+  game.worker.close()
+  if scores is not None:
+    if game.renderer is not None and not game.game_over and game.state.shots:
+      game.record_score("quit")
+    scores.close()
+  if args.profile:
+    game.profiler.export(args.profile)
 
 if __name__ == "__main__":
   main()
@@ -0,0 +1,324 @@
+import math
+from engine import BUBBLESIZE, WIDTH, HEIGHT, ROW_HEIGHT, COLORS
+
+class BoardRenderer:
+  """
+  Desenarea tablei de joc in mod retinut: obiectele din canvas sunt refolosite dintr-un bazin,
+  iar modificarile dintr-un cadru sunt adunate si trimise o singura data, la flush.
+  Canvas-ul arata doar o fereastra din tabla; doar bulele din randurile vizibile au obiecte in canvas.
+  """
+  def __init__(self, game_canvas, next_bubble_canvas, width=WIDTH, world_height=HEIGHT, view_height=HEIGHT):
+    """
+    Initializarea unui obiect de tip BoardRenderer.
+    :param game_canvas: Canvas-ul pe care desenam bulele.
+    :param next_bubble_canvas: Canvas-ul in care afisam bula urmatoare.
+    :param width: Latimea tablei, in pixeli.
+    :param world_height: Inaltimea intregii table, in pixeli.
+    :param view_height: Inaltimea zonei vizibile din canvas, in pixeli.
+    """
+    self.game_canvas = game_canvas
+    self.next_bubble_canvas = next_bubble_canvas
+    self.width = width
+    self.world_height = world_height
+    self.view_height = min(view_height, world_height)
+    self.view_top = 0
+    self.board_dx = 0
+    self.drop_lag = 0
+    self.landing = None
+    self.state = None
+    self.shooter = None
+    self.items = dict()
+    self.pool = []
+    self.operations = []
+    self.next_bubble_id = None
+    self.ceiling_id = None
+
+  def acquire(self, x, y, color, tags):
+    """
+    Obtinerea unui oval din bazin (sau crearea unuia nou daca bazinul e gol), mutat si colorat.
+    Un oval nou e creat ascuns, ca unul din bazin, deci mutarile de tag-uri adunate inainte nu il ating.
+    Returneaza id-ul ovalului.
+    :param x: Coordonata X a centrului.
+    :param y: Coordonata Y a centrului.
+    :param color: Culoarea ovalului.
+    :param tags: Tag-urile ovalului.
+    """
+    bubble_radius = BUBBLESIZE // 2
+    coords = (x - bubble_radius, y - bubble_radius, x + bubble_radius, y + bubble_radius)
+    if self.pool:
+      item = self.pool.pop()
+    else:
+      item = self.game_canvas.create_oval(0, 0, 0, 0, state='hidden', tags=("pool",))
+    self.update_item(item, coords=coords, fill=color, tags=tags, state='normal')
+    return item
+
+  def release(self, item):
+    """
+    Ascunderea unui oval si intoarcerea lui in bazin.
+    :param item: Id-ul ovalului.
+    """
+    self.update_item(item, state='hidden', tags=("pool",))
+    self.pool.append(item)
+
+  def release_tag(self, tag, items):
+    """
+    Ascunderea tuturor ovalelor cu un anumit tag si intoarcerea lor in bazin, printr-un singur apel Tk.
+    :param tag: Tag-ul ovalelor.
+    :param items: Id-urile ovalelor.
+    """
+    self.operations.append(("config", tag, {"state": "hidden", "tags": ("pool",)}))
+    self.pool.extend(items)
+
+  def update_item(self, item, coords=None, **options):
+    """
+    Adaugarea unei modificari pentru un obiect din canvas. Modificarile consecutive ale aceluiasi
+    obiect se combina, astfel ca la flush se face cel mult un apel coords si unul itemconfig per obiect.
+    :param item: Id-ul obiectului.
+    :param coords: Noile coordonate ale obiectului.
+    :param options: Optiunile trimise cu itemconfig.
+    """
+    if not self.operations or self.operations[-1][0] != "items":
+      self.operations.append(("items", dict()))
+    changes = self.operations[-1][1].setdefault(item, [None, dict()])
+    if coords is not None:
+      changes[0] = coords
+    changes[1].update(options)
+
+  def move_tag(self, tag, dx, dy):
+    """
+    Adaugarea unei mutari pentru toate obiectele cu un anumit tag (un singur apel Tk).
+    :param tag: Tag-ul obiectelor mutate.
+    :param dx: Deplasarea pe axa X.
+    :param dy: Deplasarea pe axa Y.
+    """
+    if tag == "board":
+      self.board_dx += dx
+    self.operations.append(("move", tag, dx, dy))
+
+  def scale_tag(self, tag, x, y, factor):
+    """
+    Adaugarea unei scalari, fata de punctul (x, y), pentru toate obiectele cu un anumit tag (un singur apel Tk).
+    :param tag: Tag-ul obiectelor scalate.
+    :param x: Coordonata X a punctului fix.
+    :param y: Coordonata Y a punctului fix.
+    :param factor: Factorul de scalare, pe ambele axe.
+    """
+    self.operations.append(("scale", tag, x, y, factor))
+
+  def flush(self):
+    """
+    Trimiterea catre canvas a tuturor modificarilor adunate, in ordinea in care au fost facute.
+    """
+    operations = self.operations
+    self.operations = []
+    for operation in operations:
+      if operation[0] == "move":
+        self.game_canvas.move(operation[1], operation[2], operation[3])
+        continue
+      if operation[0] == "view":
+        self.game_canvas.yview_moveto(operation[1])
+        continue
+      if operation[0] == "scale":
+        self.game_canvas.scale(operation[1], operation[2], operation[3], operation[4], operation[4])
+        continue
+      if operation[0] == "config":
+        self.game_canvas.itemconfig(operation[1], **operation[2])
+        continue
+      for item, (coords, options) in operation[1].items():
+        if coords is not None:
+          self.game_canvas.coords(item, *coords)
+        if options:
+          self.game_canvas.itemconfig(item, **options)
+
+  def visible(self, bubble):
+    """
+    Verifica daca o bula se afla, macar partial, in zona vizibila.
+    :param bubble: Bula verificata.
+    """
+    bubble_radius = BUBBLESIZE / 2
+    y = bubble.y - self.drop_lag
+    return y + bubble_radius >= self.view_top and y - bubble_radius <= self.view_top + self.view_height
+
+  def draw_bubble(self, bubble):
+    """
+    Desenarea unei bule din tabla de joc, in centrul pastrat de bula. Bulele din afara zonei vizibile
+    si cele deja desenate sunt ignorate.
+    :param bubble: Bula desenata.
+    """
+    if bubble in self.items or bubble is self.landing or not self.visible(bubble):
+      return
+    self.items[bubble] = self.acquire(*self.position(bubble), COLORS[bubble.color], ("bubble", "board"))
+
+  def draw_table(self, state):
+    """
+    Desenarea bulelor din randurile vizibile ale tablei de joc.
+    :param state: Starea tablei de joc.
+    """
+    self.state = state
+    self.sync()
+
+  def sync(self):
+    """
+    Potrivirea obiectelor din canvas cu zona vizibila: bulele iesite din ea isi intorc ovalul in bazin,
+    iar cele din randurile intrate in ea sunt desenate.
+    """
+    if self.state is None:
+      return
+    for bubble in list(self.items):
+      if bubble is not self.shooter and not self.visible(bubble):
+        self.release(self.items.pop(bubble))
+    game_table = self.state.game_table
+    top = self.view_top + self.drop_lag
+    first = max(int((top - BUBBLESIZE) / ROW_HEIGHT), 0)
+    last = min(math.ceil((top + self.view_height) / ROW_HEIGHT), len(game_table) - 1)
+    for row in range(first, last + 1):
+      for bubble in game_table[row]:
+        if bubble is not None:
+          self.draw_bubble(bubble)
+
+  def rebind(self, state, cells):
+    """
+    Trecerea la o stare noua, ale carei bule sunt copii ale celor desenate: fiecare oval ramane pe loc
+    si e legat de copia bulei sale. Se parcurg doar bulele desenate.
+    :param state: Starea noua.
+    :param cells: Bulele starii noi, dupa celula (rand, coloana) a bulei copiate.
+    """
+    items = dict()
+    for bubble, item in self.items.items():
+      if bubble is not self.shooter:
+        bubble = cells[(bubble.row, bubble.col)]
+      items[bubble] = item
+    self.items = items
+    self.state = state
+
+  def set_view(self, top):
+    """
+    Derularea zonei vizibile, astfel incat sa inceapa la coordonata Y data.
+    :param top: Coordonata Y a marginii de sus a zonei vizibile.
+    """
+    top = min(max(top, 0), self.world_height - self.view_height)
+    if top == self.view_top:
+      return
+    self.view_top = top
+    self.operations.append(("view", top / self.world_height))
+    self.sync()
+
+  def view_bottom(self):
+    """
+    Derularea zonei vizibile pana jos, unde se afla bula ce urmeaza sa fie trasa.
+    """
+    self.set_view(self.world_height - self.view_height)
+
+  def remove_bubble(self, bubble):
+    """
+    Stergerea desenului unei bule.
+    :param bubble: Bula stearsa.
+    """
+    item = self.items.pop(bubble, None)
+    if item is not None:
+      self.release(item)
+
+  def detach(self, bubble):
+    """
+    Desprinderea ovalului unei bule sterse din tabla, pentru o animatie. Ovalul nu se intoarce in bazin;
+    cine il primeste il elibereaza cu release. Returneaza id-ul ovalului sau None daca bula nu era desenata.
+    :param bubble: Bula stearsa.
+    """
+    return self.items.pop(bubble, None)
+
+  def position(self, bubble, on_board=True):
+    """
+    Returneaza centrul la care e desenata (sau ar fi desenata) o bula.
+    :param bubble: Bula desenata.
+    :param on_board: Daca bula e inca in tabla. Bulele scoase de lovitura curenta au fost sterse inainte de coborare,
+      deci centrul lor nu a coborat si nu li se aplica intarzierea coborarii.
+    """
+    if not on_board:
+      return bubble.x + self.board_dx, bubble.y
+    return bubble.x + self.board_dx, bubble.y - self.drop_lag
+
+  def draw_shooter(self, bubble):
+    """
+    Desenarea bulei ce urmeaza sa fie trasa.
+    :param bubble: Bula ce va fi trasa.
+    """
+    self.shooter = bubble
+    self.items[bubble] = self.acquire(bubble.x, bubble.y, COLORS[bubble.color], ("bubble", "shooter"))
+
+  def move_bubble(self, bubble, x, y):
+    """
+    Mutarea desenului unei bule, cu centrul in punctul dat.
+    :param bubble: Bula mutata.
+    :param x: Coordonata X a centrului.
+    :param y: Coordonata Y a centrului.
+    """
+    bubble_radius = BUBBLESIZE // 2
+    self.update_item(self.items[bubble], coords=(x - bubble_radius, y - bubble_radius, x + bubble_radius, y + bubble_radius))
+
+  def begin_shot(self, shot):
+    """
+    Motorul a rezolvat deja lovitura, dar desenul o arata abia dupa animatie: pana atunci bula asezata
+    nu e desenata, iar daca tabla a coborat, bulele desenate din stare sunt puse cu un rand mai sus.
+    :param shot: Lovitura rezolvata de motor.
+    """
+    self.landing = shot.bubble
+    if shot.dropped:
+      self.drop_lag = ROW_HEIGHT
+
+  def end_shot(self):
+    """
+    Sfarsitul animatiei loviturii: bula asezata poate fi desenata.
+    """
+    self.landing = None
+
+  def drop_table(self, first_row):
+    """
+    Coborarea desenului tablei cu un rand, printr-o singura mutare a tag-ului, si extinderea zonei gri de sus.
+    Randurile care intra astfel in zona vizibila sunt desenate.
+    :param first_row: Numarul de randuri cu care a coborat tabla de joc.
+    """
+    self.move_tag("board", 0, ROW_HEIGHT)
+    self.drop_lag = 0
+    self.set_ceiling(first_row)
+    self.sync()
+
+  def set_ceiling(self, first_row):
+    """
+    Desenarea zonei gri de sus, pe inaltimea randurilor cu care a coborat tabla.
+    :param first_row: Numarul de randuri cu care a coborat tabla de joc.
+    """
+    if self.ceiling_id is None:
+      if first_row:
+        self.ceiling_id = self.game_canvas.create_rectangle(0, 0, self.width, first_row * ROW_HEIGHT, fill = 'gray')
+    else:
+      self.update_item(self.ceiling_id, coords=(0, 0, self.width, first_row * ROW_HEIGHT))
+
+  def redraw(self, state):
+    """
+    Desenarea de la zero a unei stari fara legatura cu cea desenata (de exemplu, dupa o anulare):
+    toate bulele tablei isi intorc ovalul in bazin, apoi randurile vizibile sunt desenate din nou.
+    :param state: Starea noua.
+    """
+    for bubble in list(self.items):
+      if bubble is not self.shooter:
+        self.release(self.items.pop(bubble))
+    self.drop_lag = 0
+    self.landing = None
+    self.set_ceiling(state.first_row)
+    self.draw_table(state)
+
+  def set_next_color(self, color):
+    """
+    Afisarea culorii bulei urmatoare, refolosind acelasi oval.
+    :param color: Indexul culorii bulei urmatoare in COLORS.
+    """
+    if self.next_bubble_id is None:
+      self.next_bubble_id = self.next_bubble_canvas.create_oval(0, 0, 20, 20, fill = COLORS[color])
+    else:
+      self.next_bubble_canvas.itemconfig(self.next_bubble_id, fill = COLORS[color])
+
+  def item_count(self):
+    """
+    Returneaza numarul de obiecte din canvas-ul de joc.
+    """
+    return len(self.game_canvas.find_all())
@@ -0,0 +1,223 @@
+import argparse
+import json
+import struct
+import sys
+import time
+from engine import *
+from history import History
+from levels import pack_level, unpack_level
+
+MAGIC = b"BBRP"
+VERSION = 1
+HEADER = struct.Struct("<4sBQB3HHH")
+SHOT = 0
+END = 1
+LEVEL = 2
+UNDO = 3
+
+def write_varint(output, value):
+  """
+  Scrierea unui numar natural in format varint (7 biti pe octet, bitul mare marcheaza continuarea).
+  :param output: Lista de octeti in care se scrie.
+  :param value: Numarul scris.
+  """
+  while value >= 0x80:
+    output.append((value & 0x7f) | 0x80)
+    value >>= 7
+  output.append(value)
+
+def read_varint(data, position):
+  """
+  Citirea unui numar in format varint. Returneaza (numarul, pozitia de dupa el).
+  :param data: Octetii cititi.
+  :param position: Pozitia de start.
+  """
+  value = 0
+  shift = 0
+  while True:
+    byte = data[position]
+    position += 1
+    value |= (byte & 0x7f) << shift
+    if byte < 0x80:
+      return value, position
+    shift += 7
+
+class ReplayWriter:
+  """
+  Inregistrarea unui joc: seed-ul, setarile motorului si dimensiunile tablei in antet, apoi pentru fiecare lovitura
+  numarul de pasi ai planificatorului de la lovitura anterioara si unghiul, ca index al pasului de cuantizare.
+  O lovitura ocupa de obicei 3-4 octeti. Jocurile pornite dintr-un nivel contin si nivelul, codificat ca in pachete.
+  O anulare e scrisa inaintea loviturii care o confirma, cu numarul de lovituri anulate.
+  """
+  def __init__(self, path, engine, tick=0, level=None):
+    """
+    Initializarea unui obiect de tip ReplayWriter si scrierea antetului.
+    :param path: Fisierul in care se scrie inregistrarea.
+    :param engine: Motorul jocului inregistrat, dupa crearea tablei.
+    :param tick: Pasul planificatorului la inceputul jocului.
+    :param level: Nivelul din care a pornit jocul (None pentru o tabla random).
+    """
+    self.file = open(path, "wb")
+    self.last_tick = tick
+    self.file.write(HEADER.pack(MAGIC, VERSION, engine.state.seed, engine.drop_shots, *engine.score_table, engine.rows, engine.cols))
+    if level is not None:
+      record = pack_level(level)
+      self.record(LEVEL, tick, len(record))
+      self.file.write(record)
+    self.file.flush()
+
+  def record(self, kind, tick, value):
+    """
+    Scrierea unui eveniment: tipul si distanta in pasi sunt impachetate in primul varint, valoarea in al doilea.
+    :param kind: Tipul evenimentului (SHOT, END, LEVEL sau UNDO).
+    :param tick: Pasul planificatorului la momentul evenimentului.
+    :param value: Valoarea evenimentului.
+    """
+    output = bytearray()
+    write_varint(output, max(0, tick - self.last_tick) << 2 | kind)
+    write_varint(output, value)
+    self.last_tick = max(tick, self.last_tick)
+    self.file.write(output)
+    self.file.flush()
+
+  def shot(self, tick, angle):
+    """
+    Inregistrarea unei lovituri. Unghiurile trase in sus sunt negative, deci se scrie minus indexul lor.
+    :param tick: Pasul planificatorului la momentul loviturii.
+    :param angle: Unghiul de tragere, deja cuantizat.
+    """
+    self.record(SHOT, tick, -round(angle / ANGLE_STEP))
+
+  def undo(self, tick, steps):
+    """
+    Inregistrarea anularii ultimelor lovituri.
+    :param tick: Pasul planificatorului la momentul anularii.
+    :param steps: Numarul de lovituri anulate.
+    """
+    self.record(UNDO, tick, steps)
+
+  def close(self, state=None):
+    """
+    Inchiderea inregistrarii. Daca jocul s-a terminat, se scrie scorul final, folosit la verificarea reluarii.
+    :param state: Starea finala a jocului.
+    """
+    if self.file.closed:
+      return
+    if state is not None:
+      self.record(END, self.last_tick, state.score)
+    self.file.close()
+
+class Replay:
+  """
+  Un joc inregistrat, citit dintr-un fisier.
+  """
+  def __init__(self, seed, drop_shots, score_table, events, score=None, level=None, rows=MAXHEIGHT, cols=MAXWIDTH):
+    """
+    Initializarea unui obiect de tip Replay.
+    :param seed: Seed-ul jocului.
+    :param drop_shots: Numarul de lovituri dupa care tabla coboara cu un rand.
+    :param score_table: Tabla de scor a motorului.
+    :param events: Lista de lovituri si anulari, ca tupluri (pasi de la evenimentul anterior, SHOT sau UNDO,
+      unghiul loviturii sau numarul de lovituri anulate).
+    :param score: Scorul final inregistrat sau None daca jocul nu s-a terminat.
+    :param level: Nivelul din care a pornit jocul (None pentru o tabla random).
+    :param rows: Randul pe care, daca ajunge o bula, jocul e pierdut.
+    :param cols: Numarul de coloane al tablei.
+    """
+    self.seed = seed
+    self.rows = rows
+    self.cols = cols
+    self.drop_shots = drop_shots
+    self.score_table = score_table
+    self.events = events
+    self.score = score
+    self.level = level
+
+  @classmethod
+  def load(cls, path):
+    """
+    Citirea unei inregistrari dintr-un fisier.
+    :param path: Fisierul citit.
+    """
+    with open(path, "rb") as replay_file:
+      data = replay_file.read()
+    magic, version, seed, drop_shots, *score_table, rows, cols = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+      raise ValueError(f"{path} is not a BubbleBuster replay")
+    events = []
+    score = None
+    level = None
+    position = HEADER.size
+    while position < len(data):
+      head, position = read_varint(data, position)
+      value, position = read_varint(data, position)
+      if head & 3 == SHOT:
+        events.append((head >> 2, SHOT, -value * ANGLE_STEP))
+      elif head & 3 == UNDO:
+        events.append((head >> 2, UNDO, value))
+      elif head & 3 == END:
+        score = value
+      elif head & 3 == LEVEL:
+        level = unpack_level(data, position)
+        position += value
+    return cls(seed, drop_shots, tuple(score_table), events, score, level, rows, cols)
+
+  def engine(self):
+    """
+    Crearea unui motor cu setarile si tabla initiala ale jocului inregistrat.
+    """
+    engine = Engine(drop_shots=self.drop_shots, bitboard=True, score_table=self.score_table, rows=self.rows, cols=self.cols)
+    if self.level is not None:
+      engine.load_level(self.level)
+    else:
+      engine.create_random_table(seed=self.seed)
+    return engine
+
+  def run(self):
+    """
+    Rularea completa a jocului, fara interfata grafica si fara pauze intre lovituri. Returneaza motorul.
+    """
+    engine = self.engine()
+    history = None
+    if any(kind == UNDO for _, kind, _ in self.events):
+      history = History(engine, limit=None)
+      history.reset()
+    for _, kind, value in self.events:
+      if kind == UNDO:
+        history.undo(value)
+        continue
+      engine.shoot(value)
+      if history is not None:
+        history.record()
+    return engine
+
+def main(argv=None):
+  """
+  Functia main a reluarii fara interfata grafica.
+  :param argv: Argumentele din linia de comanda (implicit, sys.argv).
+  """
+  parser = argparse.ArgumentParser(description="Fast-forward a recorded BubbleBuster game headless.")
+  parser.add_argument("replay", help="replay file written with --record")
+  args = parser.parse_args(argv)
+
+  replay = Replay.load(args.replay)
+  start = time.perf_counter()
+  engine = replay.run()
+  elapsed = time.perf_counter() - start
+  state = engine.state
+  result = {
+    "seed": replay.seed,
+    "status": state.status,
+    "score": state.score,
+    "shots": state.shots,
+    "first_row": state.first_row,
+    "seconds": round(elapsed, 6),
+    "shots_per_second": round(state.shots / elapsed, 2) if elapsed else None,
+  }
+  if replay.score is not None:
+    result["matches_recording"] = replay.score == state.score
+  print(json.dumps(result))
+  return 0 if result.get("matches_recording", True) else 1
+
+if __name__ == "__main__":
+  sys.exit(main())
@@ -0,0 +1,146 @@
+import time
+import heapq
+import itertools
+
+class FrameScheduler:
+  """
+  Planificator de cadre cu pas fix de timp, peste bucla de evenimente Tk.
+  Cat timp nu exista animatii sau timere, nu se programeaza niciun apel, deci jocul nu consuma CPU.
+  """
+  def __init__(self, widget, timestep=10, frame_budget=8, max_catchup=5):
+    """
+    Initializarea unui obiect de tip FrameScheduler.
+    :param widget: Widget-ul Tk prin care se programeaza cadrele (cu after).
+    :param timestep: Durata unui pas fix de timp, in milisecunde.
+    :param frame_budget: Timpul maxim, in milisecunde, pe care il pot folosi animatiile intr-un cadru.
+    :param max_catchup: Numarul maxim de pasi recuperati intr-un cadru; restul sunt sariti.
+    """
+    self.widget = widget
+    self.timestep = timestep
+    self.frame_budget = frame_budget
+    self.max_catchup = max_catchup
+    self.animations = []
+    self.frame_end = []
+    self.timers = []
+    self.cancelled = set()
+    self.counter = itertools.count()
+    self.tick = 0
+    self.origin = time.perf_counter()
+    self.after_id = None
+    self.frames = 0
+    self.dropped_ticks = 0
+    self.over_budget = 0
+
+  def add(self, animation):
+    """
+    Adaugarea unei animatii. Animatia e apelata o data pe cadru cu pasul curent si
+    ramane activa cat timp returneaza True. Daca era programat doar un timer, urmatorul cadru e adus
+    la un pas de acum, iar timpul asteptat pana aici nu e recuperat ca pasi.
+    :param animation: Functia apelata la fiecare cadru.
+    """
+    first = not self.animations
+    self.animations.append(animation)
+    if first and self.after_id is not None:
+      self.origin = time.perf_counter() - self.tick * self.timestep / 1000
+      self.reschedule()
+    else:
+      self.wake()
+
+  def on_frame_end(self, callback):
+    """
+    Inregistrarea unei functii apelate la sfarsitul fiecarui cadru (de exemplu, trimiterea desenului).
+    :param callback: Functia apelata.
+    """
+    self.frame_end.append(callback)
+
+  def call_later(self, delay, callback, *args):
+    """
+    Programarea unui apel dupa un numar de milisecunde, masurat in pasi ai planificatorului.
+    Returneaza id-ul timer-ului.
+    :param delay: Intarzierea, in milisecunde.
+    :param callback: Functia apelata.
+    :param args: Argumentele functiei.
+    """
+    self.wake()
+    timer_id = next(self.counter)
+    due = self.tick + max(1, round(delay / self.timestep))
+    heapq.heappush(self.timers, (due, timer_id, callback, args))
+    self.reschedule()
+    return timer_id
+
+  def cancel(self, timer_id):
+    """
+    Anularea unui timer.
+    :param timer_id: Id-ul returnat de call_later.
+    """
+    if timer_id is not None:
+      self.cancelled.add(timer_id)
+
+  def clear(self):
+    """
+    Oprirea tuturor animatiilor si a timerelor.
+    """
+    self.animations.clear()
+    self.timers.clear()
+    self.cancelled.clear()
+    if self.after_id is not None:
+      self.widget.after_cancel(self.after_id)
+      self.after_id = None
+
+  def wake(self):
+    """
+    Trezirea planificatorului dupa o perioada fara cadre; pasii nu se recupereaza pentru timpul dormit.
+    """
+    if self.after_id is None:
+      self.origin = time.perf_counter() - self.tick * self.timestep / 1000
+      self.reschedule()
+
+  def reschedule(self):
+    """
+    Programarea urmatorului cadru: imediat dupa un pas daca exista animatii,
+    la momentul primului timer daca exista doar timere, sau deloc.
+    """
+    if self.after_id is not None:
+      self.widget.after_cancel(self.after_id)
+      self.after_id = None
+    if self.animations:
+      delay = self.timestep
+    elif self.timers:
+      delay = max(self.timers[0][0] - self.tick, 1) * self.timestep
+    else:
+      return
+    self.after_id = self.widget.after(delay, self.run_frame)
+
+  def run_frame(self):
+    """
+    Rularea unui cadru: avansarea pasilor de timp, declansarea timerelor scadente si apelarea animatiilor.
+    """
+    self.after_id = None
+    self.frames += 1
+    target = int((time.perf_counter() - self.origin) * 1000 / self.timestep)
+    if target - self.tick > self.max_catchup:
+      self.dropped_ticks += target - self.tick - self.max_catchup
+      self.origin += (target - self.tick - self.max_catchup) * self.timestep / 1000
+      target = self.tick + self.max_catchup
+    self.tick = max(target, self.tick + 1)
+
+    while self.timers and self.timers[0][0] <= self.tick:
+      _, timer_id, callback, args = heapq.heappop(self.timers)
+      if timer_id in self.cancelled:
+        self.cancelled.discard(timer_id)
+        continue
+      callback(*args)
+
+    start = time.perf_counter()
+    animations = self.animations
+    self.animations = []
+    for index, animation in enumerate(animations):
+      if (time.perf_counter() - start) * 1000 > self.frame_budget:
+        self.over_budget += 1
+        self.animations.extend(animations[index:])
+        break
+      if animation(self.tick):
+        self.animations.append(animation)
+    for callback in self.frame_end:
+      callback()
+    self.reschedule()
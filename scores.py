@@ -0,0 +1,133 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".bubblebuster_scores.db")
+TOP_SCORES = 10
+BATCH_WINDOW = 0.5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+  id INTEGER PRIMARY KEY,
+  started_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS games (
+  id INTEGER PRIMARY KEY,
+  session_id INTEGER NOT NULL REFERENCES sessions(id),
+  finished_at REAL NOT NULL,
+  status TEXT NOT NULL,
+  score INTEGER NOT NULL,
+  shots INTEGER NOT NULL,
+  clusters INTEGER NOT NULL,
+  duration REAL NOT NULL,
+  seed INTEGER,
+  autoplay INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS games_by_score ON games(score DESC);
+CREATE INDEX IF NOT EXISTS games_by_session ON games(session_id);
+"""
+
+class ScoreStore:
+  """
+  Clasamentul si statisticile sesiunilor, intr-o baza SQLite in mod WAL. Toate operatiile cu baza de date
+  ruleaza intr-un fir separat: jocurile terminate sunt puse intr-o coada si scrise in loturi, intr-o singura
+  tranzactie, iar dupa fiecare lot firul recalculeaza un instantaneu (clasamentul si statisticile sesiunii).
+  Firul Tk doar pune jocuri in coada si citeste ultimul instantaneu, deci nu asteapta niciodata discul.
+  """
+  def __init__(self, path=DEFAULT_PATH, top_scores=TOP_SCORES, batch_window=BATCH_WINDOW):
+    """
+    Initializarea unui obiect de tip ScoreStore si pornirea firului de scriere.
+    :param path: Fisierul bazei de date.
+    :param top_scores: Numarul de scoruri din clasament.
+    :param batch_window: Cat asteapta firul, dupa primul joc dintr-un lot, alte jocuri de scris in acelasi lot (secunde).
+    """
+    self.path = path
+    self.top_scores = top_scores
+    self.batch_window = batch_window
+    self.queue = queue.Queue()
+    self.snapshot = {"top": [], "session": {"games": 0, "best": 0, "shots": 0, "clusters": 0, "seconds": 0}, "games": 0}
+    self.version = 0
+    self.error = None
+    self.thread = threading.Thread(target=self.run, daemon=True)
+    self.thread.start()
+
+  def record(self, status, score, shots, clusters, duration, seed=None, autoplay=False):
+    """
+    Adaugarea unui joc terminat in coada de scriere. Nu face nicio operatie cu discul.
+    :param status: Rezultatul jocului ("win", "lose" sau "quit").
+    :param score: Scorul final.
+    :param shots: Numarul de lovituri.
+    :param clusters: Numarul de lovituri care au spart un grup de bule.
+    :param duration: Durata jocului, in secunde.
+    :param seed: Seed-ul jocului.
+    :param autoplay: Daca jocul a fost jucat (si) de jucatorul automat.
+    """
+    self.queue.put((time.time(), status, score, shots, clusters, round(duration, 3), seed, int(autoplay)))
+
+  def close(self, timeout=2):
+    """
+    Scrierea jocurilor ramase in coada si oprirea firului.
+    :param timeout: Timpul maxim de asteptare, in secunde.
+    """
+    self.queue.put(None)
+    self.thread.join(timeout)
+
+  def run(self):
+    """
+    Bucla firului de scriere: deschide baza, porneste o sesiune, apoi scrie loturile pana la close.
+    """
+    try:
+      connection = sqlite3.connect(self.path)
+      connection.execute("PRAGMA journal_mode=WAL")
+      connection.execute("PRAGMA synchronous=NORMAL")
+      connection.executescript(SCHEMA)
+      with connection:
+        self.session_id = connection.execute("INSERT INTO sessions (started_at) VALUES (?)", (time.time(),)).lastrowid
+      self.refresh(connection)
+    except sqlite3.Error as error:
+      self.error = error
+      return
+    running = True
+    while running:
+      batch = [self.queue.get()]
+      deadline = time.monotonic() + self.batch_window
+      while batch[-1] is not None:
+        try:
+          batch.append(self.queue.get(timeout=max(0, deadline - time.monotonic())))
+        except queue.Empty:
+          break
+      if batch[-1] is None:
+        running = False
+        batch.pop()
+      if not batch:
+        continue
+      try:
+        with connection:
+          connection.executemany(
+            "INSERT INTO games (session_id, finished_at, status, score, shots, clusters, duration, seed, autoplay) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(self.session_id,) + game for game in batch])
+        self.refresh(connection)
+      except sqlite3.Error as error:
+        self.error = error
+    connection.close()
+
+  def refresh(self, connection):
+    """
+    Recalcularea instantaneului citit de interfata. Instantaneul e inlocuit dintr-o data, nu modificat pe loc.
+    :param connection: Conexiunea firului de scriere.
+    """
+    top = [{"score": score, "shots": shots, "status": status, "autoplay": bool(autoplay)}
+           for score, shots, status, autoplay in connection.execute(
+             "SELECT score, shots, status, autoplay FROM games ORDER BY score DESC, finished_at LIMIT ?", (self.top_scores,))]
+    games, best, shots, clusters, seconds = connection.execute(
+      "SELECT COUNT(*), COALESCE(MAX(score), 0), COALESCE(SUM(shots), 0), COALESCE(SUM(clusters), 0), COALESCE(SUM(duration), 0) FROM games WHERE session_id = ?",
+      (self.session_id,)).fetchone()
+    total, = connection.execute("SELECT COUNT(*) FROM games").fetchone()
+    self.snapshot = {
+      "top": top,
+      "session": {"games": games, "best": best, "shots": shots, "clusters": clusters, "seconds": round(seconds, 1)},
+      "games": total,
+    }
+    self.version += 1
@@ -0,0 +1,79 @@
+import itertools
+import queue
+import threading
+import time
+from instrumentation import time_calls
+
+class ShotWorker:
+  """
+  Rezolvarea loviturilor intr-un fir separat. Firul copiaza motorul (starea si generatorul de culori),
+  trage bula in copie si pune rezultatul intr-o coada; firul Tk doar verifica coada, o data pe cadru, si preia copia.
+  Cat timp o lovitura se rezolva, motorul original nu e modificat, deci poate fi citit (desen, ghid de ochire).
+  """
+  def __init__(self):
+    """
+    Initializarea unui obiect de tip ShotWorker si pornirea firului.
+    """
+    self.jobs = queue.Queue()
+    self.results = queue.Queue()
+    self.counter = itertools.count(1)
+    self.thread = threading.Thread(target=self.run, daemon=True)
+    self.thread.start()
+
+  def submit(self, engine, angle, timed_methods=()):
+    """
+    Trimiterea unei lovituri catre fir. Returneaza id-ul lucrarii.
+    :param engine: Motorul jocului; nu trebuie modificat pana la primirea rezultatului.
+    :param angle: Unghiul de tragere, in radiani.
+    :param timed_methods: Metodele motorului masurate pe copie (de exemplu, cand profiler-ul e pornit).
+    """
+    job_id = next(self.counter)
+    self.jobs.put((job_id, engine, angle, timed_methods))
+    return job_id
+
+  def poll(self, job_id):
+    """
+    Returneaza rezultatul lucrarii, daca e gata, ca tuplu (motorul copiat, lovitura, bulele copiei dupa celula
+    lor de dinaintea loviturii, durata rezolvarii in secunde, duratele metodelor masurate), altfel None.
+    Rezultatele lucrarilor mai vechi sunt aruncate. O eroare din fir e ridicata din nou aici.
+    :param job_id: Id-ul returnat de submit.
+    """
+    while True:
+      try:
+        result_id, result, error = self.results.get_nowait()
+      except queue.Empty:
+        return None
+      if result_id != job_id:
+        continue
+      if error is not None:
+        raise error
+      return result
+
+  def close(self):
+    """
+    Oprirea firului, dupa lucrarile deja trimise, si asteptarea lui.
+    """
+    self.jobs.put(None)
+    self.thread.join()
+
+  def run(self):
+    """
+    Bucla firului: fiecare lovitura e data unei copii a motorului, astfel ca rezultatul e identic cu cel al
+    unei lovituri date direct motorului.
+    """
+    while True:
+      job = self.jobs.get()
+      if job is None:
+        return
+      job_id, engine, angle, timed_methods = job
+      try:
+        start = time.perf_counter()
+        copy = engine.copy()
+        cells = {(bubble.row, bubble.col): bubble for bubble in copy.state.bubbles()}
+        timings = time_calls(copy, timed_methods)
+        shot = copy.shoot(angle)
+        for method in timed_methods:
+          delattr(copy, method)
+        self.results.put((job_id, (copy, shot, cells, time.perf_counter() - start, timings), None))
+      except Exception as error:
+        self.results.put((job_id, None, error))
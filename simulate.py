@@ -0,0 +1,203 @@
+import argparse
+import json
+import math
+import random
+import statistics
+import sys
+import time
+from multiprocessing import Pool
+from engine import *
+from bitboard import BitBoard
+from autoplayer import AutoPlayer
+from levels import LevelPack
+
+CANDIDATE_ANGLES = [-math.pi + 0.1 + index * (math.pi - 0.2) / 63 for index in range(64)]
+
+def random_policy(engine, rng):
+  """
+  Politica de tragere la un unghi aleator, in sus.
+  :param engine: Motorul de joc.
+  :param rng: Generatorul de numere aleatoare al politicii.
+  """
+  return -rng.uniform(0.1, math.pi - 0.1)
+
+def greedy_policy(engine, rng):
+  """
+  Politica ce alege, dintre unghiurile candidate, lovitura care aduce cele mai multe puncte imediat.
+  Celulele de asezare sunt evaluate pe o tabla de biti, fara a modifica starea jocului.
+  :param engine: Motorul de joc.
+  :param rng: Generatorul de numere aleatoare al politicii.
+  """
+  state = engine.state
+  board = state.bitboard or BitBoard.from_table(state.game_table, state.first_row)
+  best_angle, best_value = None, -1
+  seen = dict()
+  for angle in CANDIDATE_ANGLES:
+    trace = engine.trace_shot(angle)
+    if trace is None:
+      continue
+    cell = trace[1:]
+    if cell not in seen:
+      seen[cell] = evaluate_cell(board, cell[0], cell[1], state.current_color, state.color_score)
+    value = seen[cell] + rng.random()
+    if value > best_value:
+      best_angle, best_value = angle, value
+  return best_angle if best_angle is not None else random_policy(engine, rng)
+
+def evaluate_cell(board, row, col, color, color_score):
+  """
+  Punctele obtinute daca bula de culoarea data se aseaza in celula (row, col).
+  :param board: Tabla de biti a starii curente.
+  :param row: Randul celulei.
+  :param col: Coloana celulei.
+  :param color: Culoarea bulei trase.
+  :param color_score: Punctele fiecarei culori.
+  """
+  board = board.copy()
+  board.add(row, col, color)
+  matches = board.find_color_matches(row, col)
+  if board.count(matches) < 3:
+    return 0
+  floating = board.get_target_bubbles(matches) & ~matches
+  points = 15 * board.count(matches)
+  for other_row, other_col in board.cells(floating):
+    points += 3 * color_score.get(board.color_at(other_row, other_col), 0)
+  return points
+
+search_players = dict()
+
+def search_policy(engine, rng):
+  """
+  Politica ce foloseste jucatorul automat, fara limita de timp, ca rezultatele sa nu depinda de viteza masinii.
+  Jucatorul (si cache-ul lui) e pastrat pe toata durata jocului.
+  :param engine: Motorul de joc.
+  :param rng: Generatorul de numere aleatoare al politicii.
+  """
+  player = search_players.get(id(engine))
+  if player is None or player.engine is not engine:
+    search_players.clear()
+    player = search_players[id(engine)] = AutoPlayer(engine, time_budget=None)
+  angle = player.choose_angle()
+  return angle if angle is not None else random_policy(engine, rng)
+
+POLICIES = {"random": random_policy, "greedy": greedy_policy, "search": search_policy}
+
+level_packs = dict()
+
+def open_pack(path):
+  """
+  Returneaza pachetul de niveluri deschis in procesul curent; fiecare proces il deschide o singura data.
+  :param path: Fisierul pachetului.
+  """
+  if path not in level_packs:
+    level_packs[path] = LevelPack(path)
+  return level_packs[path]
+
+def play_game(job):
+  """
+  Jucarea unui joc complet, fara interfata grafica. Returneaza rezultatul ca dictionar.
+  :param job: Tuplu (seed, politica, numarul de lovituri intre coborari, tabla de scor, limita de lovituri, pachetul de niveluri, randuri, coloane).
+  """
+  seed, policy, drop_shots, score_table, max_shots, levels, rows, cols = job
+  start = time.perf_counter()
+  engine = Engine(seed, drop_shots=drop_shots, bitboard=True, score_table=score_table, rows=rows, cols=cols)
+  if levels:
+    pack = open_pack(levels)
+    engine.load_level(pack[seed % len(pack)])
+  else:
+    engine.create_random_table()
+  rng = random.Random(seed ^ 0x5eed)
+  choose_angle = POLICIES[policy]
+  while engine.state.status is None and engine.state.shots < max_shots:
+    engine.shoot(choose_angle(engine, rng))
+  state = engine.state
+  return {
+    "seed": seed,
+    "status": state.status or "timeout",
+    "score": state.score,
+    "shots": state.shots,
+    "first_row": state.first_row,
+    "seconds": round(time.perf_counter() - start, 6),
+  }
+
+def summarize(results, elapsed):
+  """
+  Calcularea statisticilor pentru o serie de jocuri.
+  :param results: Lista cu rezultatele jocurilor.
+  :param elapsed: Durata totala a rularii, in secunde.
+  """
+  scores = sorted(result["score"] for result in results)
+  shots = sum(result["shots"] for result in results)
+  games = len(results)
+  statuses = [result["status"] for result in results]
+  summary = {
+    "games": games,
+    "shots": shots,
+    "seconds": round(elapsed, 3),
+    "games_per_second": round(games / elapsed, 2) if elapsed else None,
+    "shots_per_second": round(shots / elapsed, 2) if elapsed else None,
+    "win_rate": statuses.count("win") / games if games else 0,
+    "lose_rate": statuses.count("lose") / games if games else 0,
+    "timeout_rate": statuses.count("timeout") / games if games else 0,
+  }
+  if scores:
+    deciles = statistics.quantiles(scores, n=10) if games > 1 else [scores[0]] * 9
+    summary["score"] = {
+      "min": scores[0],
+      "max": scores[-1],
+      "mean": round(statistics.fmean(scores), 2),
+      "stdev": round(statistics.pstdev(scores), 2),
+      "p10": deciles[0],
+      "p50": deciles[4],
+      "p90": deciles[8],
+    }
+  return summary
+
+def parse_score_table(text):
+  """
+  Citirea tablei de scor din linia de comanda, de forma "45,30,15".
+  :param text: Textul primit ca argument.
+  """
+  values = tuple(int(value) for value in text.split(","))
+  if len(values) != 3:
+    raise argparse.ArgumentTypeError("expected three comma separated values")
+  return values
+
+def main(argv=None):
+  """
+  Functia main a simulatorului.
+  :param argv: Argumentele din linia de comanda (implicit, sys.argv).
+  """
+  parser = argparse.ArgumentParser(description="Play many seeded BubbleBuster games headless, in parallel.")
+  parser.add_argument("-n", "--games", type=int, default=1000, help="number of games to play")
+  parser.add_argument("--seed", type=int, default=0, help="seed of the first game; game i uses seed + i")
+  parser.add_argument("--policy", choices=sorted(POLICIES), default="random", help="shooting policy")
+  parser.add_argument("--drop-shots", type=int, default=DROP_SHOTS, help="shots between two drops of the table")
+  parser.add_argument("--score-table", type=parse_score_table, default=SCORE_TABLE, help="points for the rarest, second rarest and other colors")
+  parser.add_argument("--max-shots", type=int, default=1000, help="stop a game after this many shots")
+  parser.add_argument("--rows", type=int, default=MAXHEIGHT, help="row at which a game is lost")
+  parser.add_argument("--cols", type=int, default=MAXWIDTH, help="columns of the board")
+  parser.add_argument("--levels", default=None, help="level pack; game with seed s plays level s modulo the pack size")
+  parser.add_argument("-j", "--processes", type=int, default=None, help="worker processes (default: all cores)")
+  parser.add_argument("-o", "--output", default="-", help="file for the JSON lines (default: stdout)")
+  args = parser.parse_args(argv)
+
+  jobs = [(args.seed + index, args.policy, args.drop_shots, args.score_table, args.max_shots, args.levels, args.rows, args.cols) for index in range(args.games)]
+  output = sys.stdout if args.output == "-" else open(args.output, "w")
+  results = []
+  start = time.perf_counter()
+  try:
+    with Pool(args.processes) as pool:
+      for result in pool.imap_unordered(play_game, jobs, chunksize=max(1, min(64, args.games // 64))):
+        results.append(result)
+        output.write(json.dumps(result) + "\n")
+        output.flush()
+    summary = summarize(results, time.perf_counter() - start)
+    summary["config"] = {"policy": args.policy, "drop_shots": args.drop_shots, "score_table": list(args.score_table), "rows": args.rows, "cols": args.cols}
+    output.write(json.dumps({"summary": summary}) + "\n")
+  finally:
+    if output is not sys.stdout:
+      output.close()
+
+if __name__ == "__main__":
+  main()
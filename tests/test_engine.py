@@ -0,0 +1,130 @@
+import math
+import random
+import pytest
+from engine import Engine, Bubble, BoardStats
+
+def random_board(seed, bitboard=False, density=0.65, colors=3):
+  """
+  Returneaza un motor cu o tabla random, fara bule ramase fara legatura cu ancorele.
+  """
+  rng = random.Random(seed)
+  engine = Engine(seed, bitboard=bitboard)
+  state = engine.state
+  state.first_row = rng.randint(0, 3)
+  state.all_colors = set(range(colors))
+  for row in range(state.first_row, engine.rows):
+    for col in range(engine.cols):
+      if (row + state.first_row) % 2 == 1 and col == engine.cols - 1:
+        continue
+      if rng.random() < density:
+        state.game_table[row][col] = Bubble(row, col, rng.randrange(colors), state.first_row)
+  attached = flood_fill(engine, set())
+  for bubble in state.bubbles():
+    if bubble not in attached:
+      state.game_table[bubble.row][bubble.col] = None
+  engine.index_table()
+  return engine
+
+def flood_fill(engine, removed):
+  """
+  Returneaza bulele legate de ancore fara a trece prin cele din removed, printr-o parcurgere completa.
+  """
+  stack = [bubble for bubble in engine.state.bubbles() if engine.is_anchor(bubble) and bubble not in removed]
+  attached = set()
+  while stack:
+    bubble = stack.pop()
+    if bubble in attached:
+      continue
+    attached.add(bubble)
+    stack.extend(neighbor for neighbor in engine.get_neighbor_bubbles(bubble) if neighbor not in removed and neighbor not in attached)
+  return attached
+
+def color_matches(engine, bubble):
+  """
+  Returneaza bulele de aceeasi culoare legate de bula data, inclusiv ea.
+  """
+  matches = set()
+  engine.find_color_matches(matches, bubble)
+  return matches
+
+def cells(bubbles):
+  """
+  Returneaza celulele (row, col) ale unor bule.
+  """
+  return {(bubble.row, bubble.col) for bubble in bubbles}
+
+def signature(engine):
+  """
+  Returneaza bulele, scorul si bulele urmatoare ale unui joc, pentru comparat doua motoare.
+  """
+  state = engine.state
+  return ([[bubble.color if bubble else None for bubble in row] for row in state.game_table], state.score, state.shots,
+          state.first_row, state.drop_counter, state.current_color, state.next_bubble_color, state.status)
+
+def play(engine, seed, shots=300):
+  """
+  Generator ce trage lovituri random pana la sfarsitul jocului si returneaza rezultatul fiecarei lovituri.
+  """
+  rng = random.Random(seed)
+  while engine.state.status is None and engine.state.shots < shots:
+    yield engine.shoot(-rng.uniform(0.1, math.pi - 0.1))
+
+@pytest.mark.parametrize("seed", range(150))
+def test_bitboard_rules_match_list_rules(seed):
+  engine = random_board(seed)
+  bitboard_engine = Engine(seed, bitboard=True)
+  bitboard_engine.state = engine.state.copy()
+  bitboard_engine.index_table()
+  board = bitboard_engine.state.bitboard
+  for bubble in random.Random(seed).sample(engine.state.bubbles(), 5):
+    matches = color_matches(engine, bubble)
+    match_mask = board.find_color_matches(bubble.row, bubble.col)
+    assert set(board.cells(match_mask)) == cells(matches)
+    assert set(board.cells(board.get_target_bubbles(match_mask))) == cells(engine.get_target_bubbles(matches))
+    engine.compute_depths()
+
+@pytest.mark.parametrize("seed", range(20))
+def test_bitboard_games_match_list_games(seed):
+  engines = [Engine(seed), Engine(seed, bitboard=True)]
+  for engine in engines:
+    engine.create_random_table()
+  games = [play(engine, seed) for engine in engines]
+  for list_shot, bitboard_shot in zip(*games):
+    assert (list_shot is None) == (bitboard_shot is None)
+    if list_shot is not None:
+      assert cells(list_shot.target_bubbles) == cells(bitboard_shot.target_bubbles)
+    assert signature(engines[0]) == signature(engines[1])
+
+@pytest.mark.parametrize("seed", range(150))
+def test_incremental_targets_match_flood_fill(seed):
+  engine = random_board(seed)
+  rng = random.Random(seed)
+  for _ in range(8):
+    bubbles = engine.state.bubbles()
+    if not bubbles:
+      break
+    matches = color_matches(engine, rng.choice(bubbles))
+    targets = engine.get_target_bubbles(matches)
+    assert targets == set(bubbles) - flood_fill(engine, matches)
+    engine.disolve_bubbles(targets)
+    assert flood_fill(engine, set()) == set(engine.state.bubbles())
+
+@pytest.mark.parametrize("seed", range(30))
+def test_no_floating_bubbles_after_shots(seed):
+  engine = Engine(seed)
+  engine.create_random_table()
+  for _ in play(engine, seed):
+    assert flood_fill(engine, set()) == set(engine.state.bubbles())
+
+@pytest.mark.parametrize("bitboard", [False, True])
+@pytest.mark.parametrize("rows", [Engine().rows, 20])
+@pytest.mark.parametrize("seed", range(10))
+def test_board_stats_match_recount(seed, rows, bitboard):
+  engine = Engine(seed, bitboard=bitboard, rows=rows)
+  engine.create_random_table(rows=9)
+  for _ in play(engine, seed):
+    stats = engine.state.stats
+    recount = BoardStats.from_table(engine.state.game_table)
+    assert stats.color_counts == recount.color_counts
+    assert stats.total == recount.total
+    assert stats.lowest_row == recount.lowest_row
@@ -0,0 +1,32 @@
+import time
+import pytest
+
+tk = pytest.importorskip("tkinter")
+from game_utils import Game
+
+@pytest.fixture
+def window():
+  try:
+    window = tk.Tk()
+  except tk.TclError:
+    pytest.skip("no display")
+  yield window
+  window.destroy()
+
+def play_until(window, game, shots, timeout=30):
+  deadline = time.perf_counter() + timeout
+  while game.state.shots < shots:
+    assert time.perf_counter() < deadline, f"the game stopped after {game.state.shots} shots"
+    window.update()
+    time.sleep(0.005)
+
+def test_autoplayer_cache_survives_gui_moves(window):
+  game = Game(window, seed=2)
+  game.play_game()
+  game.toggle_autoplay()
+  play_until(window, game, 1)
+  first_move_keys = set(game.autoplayer.cache)
+  play_until(window, game, 2)
+  assert first_move_keys
+  assert first_move_keys <= set(game.autoplayer.cache)
+  assert game.autoplayer.hits > 0
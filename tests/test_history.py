@@ -0,0 +1,85 @@
+import math
+import random
+import pytest
+from engine import Engine
+from history import History
+
+def signature(engine):
+  """
+  Returneaza tot ce descrie starea unui joc: bulele, scorul, statisticile si generatorul de culori.
+  """
+  state = engine.state
+  return ([[bubble.color if bubble else None for bubble in row] for row in state.game_table], state.score, state.shots,
+          state.clusters, state.first_row, state.drop_counter, state.current_color, state.next_bubble_color,
+          sorted(state.all_colors), dict(state.color_score), state.status, state.version, engine.random.getstate(),
+          state.stats.total, state.stats.lowest_row, dict(state.stats.color_counts),
+          state.bitboard.key if state.bitboard is not None else None)
+
+def record_game(engine, history, seed, shots=60):
+  """
+  Jucarea unor lovituri random, cu salvarea fiecarei stari. Returneaza unghiurile si semnaturile starilor, dupa index.
+  """
+  rng = random.Random(seed)
+  angles = []
+  signatures = {history.position: signature(engine)}
+  while engine.state.status is None and len(angles) < shots:
+    angle = -rng.uniform(0.1, math.pi - 0.1)
+    if engine.shoot(angle) is None:
+      continue
+    history.record()
+    angles.append(angle)
+    signatures[history.position] = signature(engine)
+  return angles, signatures
+
+@pytest.mark.parametrize("bitboard", [False, True])
+@pytest.mark.parametrize("seed", range(8))
+def test_undo_and_redo_restore_identical_states(seed, bitboard):
+  engine = Engine(seed, bitboard=bitboard, drop_shots=4)
+  engine.create_random_table()
+  history = History(engine, limit=None)
+  history.reset()
+  angles, signatures = record_game(engine, history, seed)
+  last = history.position
+
+  history.undo(3)
+  assert signature(engine) == signatures[last - 3]
+  history.seek(last)
+  assert signature(engine) == signatures[last]
+  for position in random.Random(seed).sample(sorted(signatures), 10):
+    history.seek(position)
+    assert signature(engine) == signatures[position]
+
+  history.seek(0)
+  for angle in angles[:10]:
+    engine.shoot(angle)
+    history.record()
+    assert signature(engine) == signatures[history.position]
+
+def test_undo_then_new_shot_drops_undone_states():
+  engine = Engine(1)
+  engine.create_random_table()
+  history = History(engine, limit=None)
+  history.reset()
+  angles, signatures = record_game(engine, history, 1, shots=10)
+  history.undo(4)
+  assert history.can_undo(history.position)
+  engine.shoot(angles[-4])
+  assert history.record() == 4
+  assert history.last == history.position
+  assert signature(engine) == signatures[history.position]
+
+@pytest.mark.parametrize("bitboard", [False, True])
+def test_evicted_history_keeps_identical_states(bitboard):
+  engine = Engine(4, bitboard=bitboard, rows=20)
+  engine.create_random_table(rows=8)
+  history = History(engine, limit=40000)
+  history.reset()
+  _, signatures = record_game(engine, history, 4, shots=300)
+  assert history.first > 0
+  assert history.memory == sum(snapshot.size for snapshot in history.snapshots.values())
+  assert not history.can_undo(history.position - history.first + 1)
+  for position in range(history.first, history.last + 1):
+    history.seek(position)
+    assert signature(engine) == signatures[position]
+  with pytest.raises(IndexError):
+    history.seek(history.first - 1)
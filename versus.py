@@ -0,0 +1,664 @@
+import argparse
+import asyncio
+import json
+import queue
+import random
+import statistics
+import sys
+import threading
+import time
+import tkinter as tk
+from engine import *
+from replay import write_varint, read_varint
+from levels import Level, pack_level
+from renderer import BoardRenderer
+from simulate import POLICIES
+from game_utils import Game
+
+DEFAULT_PORT = 7717
+POLL_INTERVAL = 10
+BUBBLES_PER_GARBAGE_ROW = 6
+MAX_GARBAGE_ROWS = 2
+JOIN = 0
+START = 1
+SHOT = 2
+GARBAGE = 3
+ACK = 4
+END = 5
+
+def encode(kind, values=()):
+  """
+  Codificarea unui mesaj: lungimea (varint), tipul (un octet), apoi valorile, ca varint-uri.
+  :param kind: Tipul mesajului.
+  :param values: Numerele naturale din mesaj.
+  """
+  payload = bytearray([kind])
+  for value in values:
+    write_varint(payload, value)
+  message = bytearray()
+  write_varint(message, len(payload))
+  return bytes(message + payload)
+
+def decode(payload):
+  """
+  Decodificarea unui mesaj fara lungime. Returneaza (tipul, lista de valori).
+  :param payload: Octetii mesajului.
+  """
+  values = []
+  position = 1
+  while position < len(payload):
+    value, position = read_varint(payload, position)
+    values.append(value)
+  return payload[0], values
+
+async def read_frame(reader):
+  """
+  Citirea unui mesaj dintr-un stream asyncio. Returneaza octetii mesajului, fara lungime.
+  :param reader: Stream-ul citit.
+  """
+  length = 0
+  shift = 0
+  while True:
+    byte = (await reader.readexactly(1))[0]
+    length |= (byte & 0x7f) << shift
+    if byte < 0x80:
+      break
+    shift += 7
+  return await reader.readexactly(length)
+
+def garbage_rows(popped):
+  """
+  Returneaza numarul de randuri de gunoi trimise adversarului pentru o lovitura.
+  :param popped: Numarul de bule sterse de lovitura.
+  """
+  return min(popped // BUBBLES_PER_GARBAGE_ROW, MAX_GARBAGE_ROWS)
+
+class ShotDelta:
+  """
+  Modificarea tablei facuta de o lovitura: celula si culoarea bulei asezate, celulele golite, coborarea si scorul.
+  Celulele golite sunt trimise sortate, ca diferente intre indexuri, deci o lovitura ocupa de obicei in jur de 10 octeti.
+  """
+  def __init__(self, sequence, row, col, color, popped, dropped, score):
+    """
+    Initializarea unui obiect de tip ShotDelta.
+    :param sequence: Numarul loviturii, confirmat de adversar.
+    :param row: Randul bulei asezate (inainte de o eventuala coborare).
+    :param col: Coloana bulei asezate.
+    :param color: Culoarea bulei asezate.
+    :param popped: Lista de celule (row, col) golite de lovitura.
+    :param dropped: Daca tabla a coborat dupa lovitura.
+    :param score: Scorul dupa lovitura.
+    """
+    self.sequence = sequence
+    self.row = row
+    self.col = col
+    self.color = color
+    self.popped = popped
+    self.dropped = dropped
+    self.score = score
+
+  @classmethod
+  def from_shot(cls, sequence, shot, score):
+    """
+    Crearea modificarii din rezultatul unei lovituri rezolvate de motor.
+    :param sequence: Numarul loviturii.
+    :param shot: Rezultatul loviturii.
+    :param score: Scorul dupa lovitura.
+    """
+    row, col = shot.cell
+    popped = [(bubble.row, bubble.col) for bubble in shot.target_bubbles]
+    return cls(sequence, row, col, shot.bubble.color, popped, shot.dropped, score)
+
+  def values(self, cols):
+    """
+    Returneaza valorile mesajului SHOT.
+    :param cols: Numarul de coloane al tablei.
+    """
+    values = [self.sequence, (self.row * cols + self.col) << 4 | self.color, len(self.popped) << 1 | self.dropped]
+    previous = 0
+    for cell in sorted(row * cols + col for row, col in self.popped):
+      values.append(cell - previous)
+      previous = cell
+    values.append(self.score)
+    return values
+
+  @classmethod
+  def from_values(cls, values, cols):
+    """
+    Crearea modificarii din valorile unui mesaj SHOT.
+    :param values: Valorile mesajului.
+    :param cols: Numarul de coloane al tablei.
+    """
+    sequence, placed, popped_count = values[:3]
+    popped = []
+    cell = 0
+    for difference in values[3:3 + (popped_count >> 1)]:
+      cell += difference
+      popped.append(divmod(cell, cols))
+    row, col = divmod(placed >> 4, cols)
+    return cls(sequence, row, col, placed & 0xf, popped, bool(popped_count & 1), values[-1])
+
+class VersusServer:
+  """
+  Serverul modului versus: jucatorii sunt grupati cate doi; fiecare pereche primeste un seed comun si
+  dimensiunile tablei, apoi fiecare mesaj e trimis, neschimbat, celuilalt jucator.
+  """
+  def __init__(self, seed=None, rows=MAXHEIGHT, cols=MAXWIDTH):
+    """
+    Initializarea unui obiect de tip VersusServer.
+    :param seed: Seed-ul tablelor (None pentru unul nou la fiecare meci).
+    :param rows: Randul pe care, daca ajunge o bula, jocul e pierdut.
+    :param cols: Numarul de coloane al tablei.
+    """
+    self.seed = seed
+    self.rows = rows
+    self.cols = cols
+    self.random = random.Random()
+    self.waiting = None
+    self.relayed_bytes = 0
+
+  async def start(self, host, port):
+    """
+    Pornirea serverului. Returneaza serverul asyncio.
+    :param host: Adresa pe care asculta serverul.
+    :param port: Portul (0 pentru unul liber).
+    """
+    return await asyncio.start_server(self.handle, host, port)
+
+  async def handle(self, reader, writer):
+    """
+    Tratarea unui jucator: asteptarea adversarului, trimiterea mesajului START si transmiterea mesajelor.
+    :param reader: Stream-ul din care se citeste.
+    :param writer: Stream-ul in care se scrie.
+    """
+    try:
+      await read_frame(reader)
+    except (asyncio.IncompleteReadError, ConnectionError):
+      writer.close()
+      return
+    if self.waiting is None:
+      match = {"writers": [writer], "ready": asyncio.Event()}
+      self.waiting = match
+      player = 0
+    else:
+      match = self.waiting
+      self.waiting = None
+      match["writers"].append(writer)
+      player = 1
+      seed = self.seed if self.seed is not None else self.random.getrandbits(63)
+      for index, other in enumerate(match["writers"]):
+        other.write(encode(START, (index, seed, self.rows, self.cols)))
+      match["ready"].set()
+    await match["ready"].wait()
+    opponent = match["writers"][1 - player]
+    try:
+      while True:
+        payload = await read_frame(reader)
+        message = bytearray()
+        write_varint(message, len(payload))
+        opponent.write(bytes(message) + payload)
+        self.relayed_bytes += len(message) + len(payload)
+    except (asyncio.IncompleteReadError, ConnectionError):
+      pass
+    finally:
+      if self.waiting is match:
+        self.waiting = None
+      writer.close()
+      opponent.close()
+
+class VersusConnection:
+  """
+  Legatura unui jucator cu serverul, peste stream-uri asyncio.
+  """
+  def __init__(self, reader, writer):
+    """
+    Initializarea unui obiect de tip VersusConnection.
+    :param reader: Stream-ul din care se citeste.
+    :param writer: Stream-ul in care se scrie.
+    """
+    self.reader = reader
+    self.writer = writer
+    self.player = None
+    self.seed = None
+    self.rows = MAXHEIGHT
+    self.cols = MAXWIDTH
+
+  @classmethod
+  async def open(cls, host, port):
+    """
+    Conectarea la server si asteptarea adversarului. Returneaza legatura, cu seed-ul si dimensiunile meciului.
+    :param host: Adresa serverului.
+    :param port: Portul serverului.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    connection = cls(reader, writer)
+    connection.send(encode(JOIN))
+    kind, values = await connection.receive()
+    if kind != START:
+      raise ConnectionError("unexpected message from the versus server")
+    connection.player, connection.seed, connection.rows, connection.cols = values
+    return connection
+
+  def send(self, data):
+    """
+    Trimiterea unui mesaj deja codificat.
+    :param data: Octetii mesajului.
+    """
+    self.writer.write(data)
+
+  async def receive(self):
+    """
+    Asteptarea urmatorului mesaj. Returneaza (tipul, lista de valori).
+    """
+    return decode(await read_frame(self.reader))
+
+  def close(self):
+    """
+    Inchiderea legaturii.
+    """
+    self.writer.close()
+
+class VersusSession:
+  """
+  Partea de joc a modului versus pentru un jucator, fara retea si fara interfata: trimite modificarile
+  facute de propriile lovituri, reface tabla adversarului din modificarile primite, tine randurile
+  de gunoi primite si masoara timpul pana la confirmarea fiecarei lovituri.
+  """
+  def __init__(self, engine, player, seed, send):
+    """
+    Initializarea unui obiect de tip VersusSession.
+    :param engine: Motorul jocului propriu, cu tabla creata din seed-ul meciului.
+    :param player: Indexul jucatorului in meci (0 sau 1).
+    :param seed: Seed-ul meciului, din care se creeaza si tabla adversarului.
+    :param send: Functia care trimite un mesaj codificat.
+    """
+    self.engine = engine
+    self.player = player
+    self.send = send
+    self.mirror = Engine(rows=engine.rows, cols=engine.cols)
+    self.mirror.create_random_table(seed=seed)
+    self.garbage_random = random.Random(seed * 2 + player)
+    self.sequence = 0
+    self.sent_at = dict()
+    self.round_trips = []
+    self.shot_bytes = []
+    self.garbage_bytes = 0
+    self.pending_garbage = 0
+    self.finished = False
+
+  def shot(self, shot):
+    """
+    Trimiterea modificarii facute de o lovitura proprie.
+    :param shot: Rezultatul loviturii, rezolvat de motor.
+    """
+    if shot is None:
+      return
+    self.sequence += 1
+    delta = ShotDelta.from_shot(self.sequence, shot, self.engine.state.score)
+    data = encode(SHOT, delta.values(self.engine.cols))
+    self.shot_bytes.append(len(data))
+    self.sent_at[self.sequence] = time.perf_counter()
+    self.send(data)
+
+  def end(self, status):
+    """
+    Anuntarea sfarsitului jocului propriu. Adversarul primeste rezultatul opus.
+    :param status: "win" sau "lose".
+    """
+    if self.finished:
+      return
+    self.finished = True
+    self.send(encode(END, (1 if status == "win" else 0,)))
+
+  def receive(self, kind, values):
+    """
+    Tratarea unui mesaj de la adversar. Returneaza modificarea tablei adversarului, pentru desenare:
+    ("shot", bula asezata, bulele sterse, coborare), ("garbage", bulele lipite) sau None.
+    :param kind: Tipul mesajului.
+    :param values: Valorile mesajului.
+    """
+    cols = self.mirror.cols
+    if kind == SHOT:
+      delta = ShotDelta.from_values(values, cols)
+      self.send(encode(ACK, (delta.sequence,)))
+      bubble, _ = self.mirror.put_bubble(delta.row, delta.col, delta.color)
+      game_table = self.mirror.state.game_table
+      removed = {game_table[row][col] for row, col in delta.popped}
+      self.mirror.disolve_bubbles(removed)
+      if delta.dropped:
+        self.mirror.drop_bubbles()
+      self.mirror.state.score = delta.score
+      self.pending_garbage += garbage_rows(len(delta.popped))
+      return ("shot", bubble, removed, delta.dropped)
+    if kind == GARBAGE:
+      bubbles = []
+      for value in values:
+        row, col = divmod(value >> 4, cols)
+        bubbles.append(self.mirror.put_bubble(row, col, value & 0xf)[0])
+      return ("garbage", bubbles)
+    if kind == ACK:
+      sent_at = self.sent_at.pop(values[0], None)
+      if sent_at is not None:
+        self.round_trips.append((time.perf_counter() - sent_at) * 1000)
+    elif kind == END:
+      self.finished = True
+      if self.engine.state.status is None:
+        self.engine.state.status = "lose" if values[0] else "win"
+    return None
+
+  def apply_garbage(self):
+    """
+    Lipirea randurilor de gunoi primite: cate o bula sub fiecare coloana, pentru fiecare rand.
+    Celulele ocupate sunt trimise adversarului. Returneaza bulele lipite.
+    """
+    state = self.engine.state
+    if not self.pending_garbage or state.status or not state.all_colors:
+      return []
+    colors = sorted(state.all_colors)
+    bubbles = []
+    for _ in range(self.pending_garbage):
+      bubbles += self.engine.attach_garbage([(col, self.garbage_random.choice(colors)) for col in range(self.engine.cols - 1)])
+    self.pending_garbage = 0
+    cols = self.engine.cols
+    data = encode(GARBAGE, [(bubble.row * cols + bubble.col) << 4 | bubble.color for bubble in bubbles])
+    self.garbage_bytes += len(data)
+    self.send(data)
+    self.engine.check_game_status()
+    return bubbles
+
+  def report(self):
+    """
+    Returneaza statisticile retelei pentru acest jucator, ca dictionar.
+    """
+    round_trips = sorted(self.round_trips)
+    return {
+      "shots": len(self.shot_bytes),
+      "bytes_per_shot": round(statistics.fmean(self.shot_bytes), 2) if self.shot_bytes else 0,
+      "max_bytes_per_shot": max(self.shot_bytes, default=0),
+      "garbage_bytes": self.garbage_bytes,
+      "rtt_ms_p50": round(statistics.median(round_trips), 3) if round_trips else None,
+      "rtt_ms_p95": round(round_trips[int(0.95 * (len(round_trips) - 1))], 3) if round_trips else None,
+      "rtt_ms_max": round(round_trips[-1], 3) if round_trips else None,
+    }
+
+class VersusLink:
+  """
+  Legatura cu serverul pentru interfata grafica: conexiunea ruleaza intr-un fir separat, cu propria bucla
+  asyncio. Mesajele primite ajung intr-o coada citita de joc prin planificator, iar cele trimise sunt
+  predate buclei cu call_soon_threadsafe, deci firul Tk nu asteapta niciodata reteaua.
+  """
+  def __init__(self, host, port):
+    """
+    Initializarea unui obiect de tip VersusLink si pornirea conexiunii.
+    :param host: Adresa serverului.
+    :param port: Portul serverului.
+    """
+    self.messages = queue.Queue()
+    self.loop = asyncio.new_event_loop()
+    self.connection = None
+    self.thread = threading.Thread(target=self.loop.run_until_complete, args=(self.listen(host, port),), daemon=True)
+    self.thread.start()
+
+  async def listen(self, host, port):
+    """
+    Conectarea la server si punerea in coada a fiecarui mesaj primit. La deconectare, in coada se pune (None, None).
+    :param host: Adresa serverului.
+    :param port: Portul serverului.
+    """
+    try:
+      self.connection = await VersusConnection.open(host, port)
+      connection = self.connection
+      self.messages.put((START, [connection.player, connection.seed, connection.rows, connection.cols]))
+      while True:
+        self.messages.put(await connection.receive())
+    except (OSError, asyncio.IncompleteReadError):
+      self.messages.put((None, None))
+
+  def wait_start(self):
+    """
+    Asteptarea adversarului. Returneaza (jucatorul, seed-ul, randurile, coloanele) sau None daca serverul nu raspunde.
+    """
+    kind, values = self.messages.get()
+    return values if kind == START else None
+
+  def send(self, data):
+    """
+    Trimiterea unui mesaj codificat, din firul Tk.
+    :param data: Octetii mesajului.
+    """
+    self.loop.call_soon_threadsafe(self.connection.send, data)
+
+class MirrorView:
+  """
+  Desenarea tablei adversarului, refacuta din modificarile primite.
+  """
+  def __init__(self, parent, session):
+    """
+    Initializarea unui obiect de tip MirrorView.
+    :param parent: Widget-ul in care se afiseaza tabla adversarului.
+    :param session: Sesiunea versus a jucatorului.
+    """
+    self.session = session
+    engine = session.mirror
+    width = engine.cols * BUBBLESIZE
+    world_height = HEIGHT + (engine.rows - MAXHEIGHT) * ROW_HEIGHT
+    view_height = min(HEIGHT, world_height)
+    self.score_text = tk.StringVar()
+    tk.Label(parent, textvariable=self.score_text, font=('Arial', 12, 'bold'), bg='#7700a6', fg='#defe47').pack(pady=5)
+    self.canvas = tk.Canvas(parent, width=width, height=view_height, bg='#092067', highlightbackground='#fe00fe', highlightthickness=1,
+                            scrollregion=(0, 0, width, world_height), yscrollincrement=1)
+    self.canvas.pack(pady=10)
+    self.renderer = BoardRenderer(self.canvas, None, width, world_height, view_height)
+    self.renderer.view_bottom()
+    self.renderer.draw_table(engine.state)
+    self.update(None)
+
+  def update(self, change):
+    """
+    Desenarea unei modificari a tablei adversarului.
+    :param change: Modificarea returnata de VersusSession.receive.
+    """
+    if change is not None and change[0] == "shot":
+      _, bubble, removed, dropped = change
+      for other in removed:
+        self.renderer.remove_bubble(other)
+      if dropped:
+        self.renderer.drop_table(self.session.mirror.state.first_row)
+      if bubble not in removed:
+        self.renderer.draw_bubble(bubble)
+    elif change is not None:
+      for bubble in change[1]:
+        self.renderer.draw_bubble(bubble)
+    self.score_text.set(f"Opponent: {self.session.mirror.state.score}")
+    self.renderer.flush()
+
+def attach(game, link, player, seed, view=None):
+  """
+  Legarea unui joc de un meci versus: jocul porneste cu tabla meciului, iar mesajele din coada legaturii
+  sunt citite la fiecare POLL_INTERVAL milisecunde.
+  :param game: Jocul legat.
+  :param link: Legatura cu serverul.
+  :param player: Indexul jucatorului in meci.
+  :param seed: Seed-ul meciului.
+  :param view: Desenarea tablei adversarului (None daca nu se afiseaza).
+  """
+  game.seed = seed
+  game.play_game()
+  session = VersusSession(game.engine, player, seed, link.send)
+  game.versus = session
+  if view is not None:
+    view = view(session)
+
+  def poll():
+    if game.versus is not session:
+      return
+    while True:
+      try:
+        kind, values = link.messages.get_nowait()
+      except queue.Empty:
+        break
+      if kind is None:
+        session.finished = True
+        game.versus = None
+        return
+      change = session.receive(kind, values)
+      if view is not None and change is not None:
+        view.update(change)
+    if not game.shooting and not game.game_over:
+      for bubble in session.apply_garbage():
+        game.renderer.draw_bubble(bubble)
+      game.aim_guide.refresh()
+    game.check_game_status()
+    game.render()
+    game.scheduler.call_later(POLL_INTERVAL, poll)
+  poll()
+  return session
+
+async def run_bench(shots, seed, policy, rows, cols):
+  """
+  Un meci intre doi jucatori automati, prin server, pe localhost. Fiecare jucator trage doar dupa ce
+  lovitura anterioara a fost confirmata de adversar. Returneaza statisticile, ca dictionar.
+  :param shots: Numarul maxim de lovituri ale fiecarui jucator.
+  :param seed: Seed-ul meciului.
+  :param policy: Politica de tragere a jucatorilor (din simulate.POLICIES).
+  :param rows: Randul pe care, daca ajunge o bula, jocul e pierdut.
+  :param cols: Numarul de coloane al tablei.
+  """
+  server = VersusServer(seed, rows, cols)
+  tcp_server = await server.start("127.0.0.1", 0)
+  port = tcp_server.sockets[0].getsockname()[1]
+  connections = await asyncio.gather(VersusConnection.open("127.0.0.1", port), VersusConnection.open("127.0.0.1", port))
+  sessions = []
+  for connection in connections:
+    engine = Engine(bitboard=True, rows=connection.rows, cols=connection.cols)
+    engine.create_random_table(seed=connection.seed)
+    sessions.append(VersusSession(engine, connection.player, connection.seed, connection.send))
+  snapshot_bytes = []
+
+  async def listen(session, connection, acked):
+    while True:
+      kind, values = await connection.receive()
+      session.receive(kind, values)
+      if kind == ACK or kind == END:
+        acked.set()
+
+  async def play(session, acked):
+    rng = random.Random(seed ^ session.player)
+    choose_angle = POLICIES[policy]
+    engine = session.engine
+    while engine.state.shots < shots and not session.finished:
+      session.apply_garbage()
+      if engine.check_game_status():
+        session.end(engine.state.status)
+        break
+      acked.clear()
+      shot = engine.shoot(choose_angle(engine, rng))
+      session.shot(shot)
+      snapshot_bytes.append(len(pack_level(Level.from_state(engine.state))))
+      if shot is not None and shot.status:
+        session.end(shot.status)
+      if shot is not None:
+        await acked.wait()
+
+  events = [asyncio.Event() for _ in sessions]
+  listeners = [asyncio.ensure_future(listen(session, connection, acked)) for session, connection, acked in zip(sessions, connections, events)]
+  start = time.perf_counter()
+  await asyncio.gather(*(play(session, acked) for session, acked in zip(sessions, events)))
+  elapsed = time.perf_counter() - start
+  await asyncio.sleep(0.05)
+  for listener in listeners:
+    listener.cancel()
+  for connection in connections:
+    connection.close()
+  await asyncio.sleep(0.05)
+  tcp_server.close()
+  await tcp_server.wait_closed()
+
+  in_sync = all(sorted((b.row, b.col, b.color) for b in mine.mirror.state.bubbles()) == sorted((b.row, b.col, b.color) for b in other.engine.state.bubbles())
+                for mine, other in ((sessions[0], sessions[1]), (sessions[1], sessions[0])))
+  return {
+    "seed": connections[0].seed,
+    "seconds": round(elapsed, 3),
+    "status": [session.engine.state.status or "timeout" for session in sessions],
+    "scores": [session.engine.state.score for session in sessions],
+    "mirrors_in_sync": in_sync,
+    "snapshot_bytes_per_shot": round(statistics.fmean(snapshot_bytes), 2) if snapshot_bytes else 0,
+    "relayed_bytes": server.relayed_bytes,
+    "players": [session.report() for session in sessions],
+  }
+
+def main(argv=None):
+  """
+  Functia main a modului versus.
+  :param argv: Argumentele din linia de comanda (implicit, sys.argv).
+  """
+  parser = argparse.ArgumentParser(description="Two-player BubbleBuster over a local socket server.")
+  commands = parser.add_subparsers(dest="command", required=True)
+  serve = commands.add_parser("serve", help="run the relay server")
+  play = commands.add_parser("play", help="join a match, showing the opponent's board next to yours")
+  local = commands.add_parser("local", help="run a server and two side-by-side games in one window")
+  bench = commands.add_parser("bench", help="play two automatic players over localhost and report latency and bandwidth")
+  for command in (serve, play, local):
+    command.add_argument("--port", type=int, default=DEFAULT_PORT, help="server port")
+  play.add_argument("--host", default="127.0.0.1", help="server address")
+  serve.add_argument("--host", default="127.0.0.1", help="address to listen on; the relay has no authentication, so only use 0.0.0.0 on a trusted network")
+  for command in (serve, local, bench):
+    command.add_argument("--seed", type=int, default=None, help="seed of the boards (default: random per match)")
+    command.add_argument("--rows", type=int, default=MAXHEIGHT, help="row at which a game is lost")
+    command.add_argument("--cols", type=int, default=MAXWIDTH, help="columns of the board")
+  bench.add_argument("--shots", type=int, default=200, help="maximum shots per player")
+  bench.add_argument("--policy", choices=sorted(POLICIES), default="random", help="shooting policy of both players; both share one event loop, so a slow policy adds its thinking time to the measured round trips")
+  args = parser.parse_args(argv)
+
+  if args.command == "serve":
+    async def serve_forever():
+      tcp_server = await VersusServer(args.seed, args.rows, args.cols).start(args.host, args.port)
+      print(f"versus server listening on {args.host}:{args.port}")
+      async with tcp_server:
+        await tcp_server.serve_forever()
+    try:
+      asyncio.run(serve_forever())
+    except KeyboardInterrupt:
+      pass
+    return 0
+
+  if args.command == "bench":
+    seed = args.seed if args.seed is not None else random.getrandbits(63)
+    print(json.dumps(asyncio.run(run_bench(args.shots, seed, args.policy, args.rows, args.cols))))
+    return 0
+
+  if args.command == "local":
+    server_loop = asyncio.new_event_loop()
+    tcp_server = server_loop.run_until_complete(VersusServer(args.seed, args.rows, args.cols).start("127.0.0.1", args.port))
+    threading.Thread(target=server_loop.run_forever, daemon=True).start()
+    links = [VersusLink("127.0.0.1", args.port) for _ in range(2)]
+  else:
+    links = [VersusLink(args.host, args.port)]
+  starts = [link.wait_start() for link in links]
+  if None in starts:
+    print("could not join a versus match", file=sys.stderr)
+    return 1
+
+  window = tk.Tk()
+  window.title("BubbleBuster versus")
+  window.geometry("1040x700+200+50")
+  window.configure(bg='#7700a6')
+  games = []
+  for link, (player, seed, rows, cols) in zip(links, starts):
+    frame = tk.Frame(window, bg='#7700a6')
+    frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+    game = Game(frame, rows=rows, cols=cols)
+    games.append(game)
+    view = None
+    if args.command == "play":
+      opponent_frame = tk.Frame(window, bg='#7700a6')
+      opponent_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+      view = lambda session: MirrorView(opponent_frame, session)
+    attach(game, link, player, seed, view)
+  window.mainloop()
+  for game in games:
+    game.worker.close()
+  return 0
+
+if __name__ == "__main__":
+  sys.exit(main())